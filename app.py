@@ -4,11 +4,17 @@ Frontend principal usando Streamlit
 """
 
 import streamlit as st
-import tempfile
-import time
-from pathlib import Path
+import base64
+import html
 import os
 import concurrent.futures
+import datetime
+import re
+import threading
+from collections import defaultdict
+
+import orjson
+import xxhash
 
 from src.logger import get_logger
 
@@ -18,7 +24,7 @@ logger = get_logger("frontend")
 # Importar módulos del backend
 from src.cv_parser import CVParser
 from src.job_analyzer import JobAnalyzer
-from src.gap_analyzer import GapAnalyzer
+from src.gap_analyzer import GapAnalyzer, GapAnalysisResult
 from src.question_generator import QuestionGenerator, Language
 from src.experience_rewriter import ExperienceRewriter
 from src.yaml_generator import (
@@ -32,7 +38,11 @@ from src.pdf_renderer import PDFRenderer
 from src.database import CVDatabase
 from src.ai_backend import GeminiClient
 from src.prompts import PromptManager
-from src.ai_proxy import InterviewProxy
+from src.ai_proxy import (
+    InterviewProxy,
+    INTERVIEW_CACHE_HIT_THRESHOLD,
+    INTERVIEW_CACHE_VERIFY_THRESHOLD,
+)
 from src.auth import AuthManager
 from src.token_tracker import TokenTracker, USER_LIMIT_COP as TOKEN_TRACKER_LIMIT
 
@@ -48,10 +58,8 @@ st.set_page_config(
 # Autenticacion: Login / Registro
 # ============================================================
 # Inicializar estado de autenticacion
-if "auth_user" not in st.session_state:
-    st.session_state.auth_user = None  # dict con id, email
-if "auth_page" not in st.session_state:
-    st.session_state.auth_page = "login"  # "login" o "register"
+st.session_state.setdefault("auth_user", None)  # dict con id, email
+st.session_state.setdefault("auth_page", "login")  # "login" o "register"
 
 
 def _show_auth_page() -> bool:
@@ -152,8 +160,7 @@ def _show_register_form() -> None:
             result = auth.sign_up(email, password)
             if result.success and result.user:
                 st.session_state.auth_user = result.user
-                st.success("Cuenta creada exitosamente.")
-                time.sleep(1)
+                st.toast("Cuenta creada exitosamente.")
                 st.rerun()
             else:
                 st.error(result.error or "Error al crear la cuenta.")
@@ -170,11 +177,134 @@ if not _show_auth_page():
     st.stop()
 
 
+def _reset_app_state() -> None:
+    """Limpia el estado de la app conservando la sesion de autenticacion."""
+    auth_state = {
+        key: st.session_state[key] for key in ("auth_user", "auth_page") if key in st.session_state
+    }
+    st.session_state.clear()
+    st.session_state.update(auth_state)
+
+
 def _get_user_id() -> str:
     """Obtiene el user_id del usuario autenticado."""
     return st.session_state.auth_user["id"]
 
 
+@st.cache_resource(max_entries=100)
+def _get_gemini_client(user_id: str) -> GeminiClient:
+    """Retorna el GeminiClient del usuario, reutilizado entre reruns.
+
+    Se cachea por usuario (no por proceso) para que ``drain_usage`` solo
+    devuelva los tokens consumidos por ese usuario.
+    """
+    return GeminiClient()
+
+
+@st.cache_resource(max_entries=100)
+def _get_interview_proxy(user_id: str) -> InterviewProxy:
+    """Retorna el InterviewProxy del usuario para conservar su cache de respuestas.
+
+    Si existe INTERVIEW_SEMANTIC_CACHE se activa además el cache semántico de
+    preguntas (requiere sentence-transformers), persistido en esa ruta.
+    """
+    semantic_cache = None
+    semantic_path = os.getenv("INTERVIEW_SEMANTIC_CACHE")
+    if semantic_path:
+        from src.semantic_cache import SemanticCache
+
+        try:
+            semantic_cache = SemanticCache(
+                hit_threshold=INTERVIEW_CACHE_HIT_THRESHOLD,
+                verify_threshold=INTERVIEW_CACHE_VERIFY_THRESHOLD,
+                persist_path=os.path.join(semantic_path, user_id),
+            )
+        except ImportError as e:
+            logger.warning(f"Cache semántico de entrevistas desactivado: {e}")
+    return InterviewProxy(_get_gemini_client(user_id), CVDatabase(), semantic_cache=semantic_cache)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_cv_history(user_id: str) -> list[dict]:
+    """Lista del historial de CVs para el sidebar, sin consultar Supabase en cada rerun.
+
+    Se invalida con ``_load_cv_history.clear()`` tras guardar o borrar CVs.
+    """
+    return CVDatabase().get_all_cvs(user_id=user_id)
+
+
+@st.cache_resource
+def _get_cv_parser() -> CVParser:
+    """Retorna un CVParser compartido (no guarda estado entre llamadas)."""
+    return CVParser()
+
+
+@st.cache_resource
+def _get_yaml_generator() -> YAMLGenerator:
+    """Retorna un YAMLGenerator compartido (no guarda estado entre llamadas)."""
+    return YAMLGenerator()
+
+
+@st.cache_resource
+def _get_pdf_renderer() -> tuple[PDFRenderer, threading.Lock]:
+    """Retorna el PDFRenderer compartido y el lock que serializa sus renders.
+
+    Dos renders simultáneos del mismo YAML escribirían el mismo archivo
+    (el nombre es el hash del contenido), así que se hacen de a uno.
+    """
+    return PDFRenderer(output_dir="outputs"), threading.Lock()
+
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def _hash_upload(uploaded_file) -> int:
+    """xxh3 del archivo subido, leído por bloques (sin copiar todo el buffer)."""
+    hasher = xxhash.xxh3_64()
+    uploaded_file.seek(0)
+    while chunk := uploaded_file.read(UPLOAD_CHUNK_SIZE):
+        hasher.update(chunk)
+    uploaded_file.seek(0)
+    return hasher.intdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _extract_cv_text(file_hash: int, _uploaded_file) -> str:
+    """Extrae el texto de un CV en PDF, cacheado por el hash de su contenido.
+
+    ``_uploaded_file`` no forma parte de la key (prefijo ``_``), así el cache
+    no vuelve a hashear el archivo completo en cada llamada.
+    """
+    # PDFium lee directamente del stream subido: sin archivo temporal ni copia a bytes
+    _uploaded_file.seek(0)
+    return _get_cv_parser().parse_pdf(file_obj=_uploaded_file).raw_text
+
+
+def _text_cache_key(text: str) -> bytes | int:
+    """Key de cache para textos: los largos (CV, vacante) se resumen con xxh3.
+
+    Devuelve bytes/int y nunca ``str``: Streamlit vuelve a hashear la salida y
+    un ``str`` reentraría en este mismo ``hash_func``.
+    """
+    data = text.encode()
+    return xxhash.xxh3_128_intdigest(data) if len(data) > 1024 else data
+
+
+# hash_funcs para st.cache_data con argumentos de texto largo
+_TEXT_HASH_FUNCS = {str: _text_cache_key}
+
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=64, hash_funcs=_TEXT_HASH_FUNCS)
+def _run_gap_analysis(
+    cv_text: str, job_description: str, _gap_analyzer: GapAnalyzer
+) -> GapAnalysisResult:
+    """Ejecuta el Gap Analysis, cacheado entre sesiones para inputs idénticos.
+
+    ``_gap_analyzer`` no forma parte de la key del cache (prefijo ``_``).
+    """
+    return _gap_analyzer.analyze(cv_text=cv_text, job_description=job_description)
+
+
 def _is_user_blocked() -> bool:
     """Verifica si el usuario excedio su limite de tokens."""
     try:
@@ -204,6 +334,515 @@ def _record_token_usage(
         logger.error(f"Error registrando token usage ({operation}): {e}")
 
 
+def _badge_grid_html(badges: list[tuple[str, str]], columns: int) -> str:
+    """Construye un grid CSS de badges ``(texto, clase)`` para un único ``st.markdown``.
+
+    Un solo elemento reemplaza a un ``st.columns`` + widget por celda.
+    """
+    cells = "".join(f'<div class="badge {css_class}">{text}</div>' for text, css_class in badges)
+    return (
+        f'<div class="badge-grid" style="grid-template-columns: repeat({columns}, 1fr)">'
+        f"{cells}</div>"
+    )
+
+
+LANGUAGE_CODES = {"Español": "es", "English": "en", "Português": "pt", "Français": "fr"}
+LANGUAGES = tuple(LANGUAGE_CODES)
+LANGUAGE_INDEX = {language: i for i, language in enumerate(LANGUAGES)}
+
+# Temas de RenderCV disponibles y su descripción en el selector
+THEME_DESCRIPTIONS = {
+    "classic": "📘 Classic - Diseño limpio y profesional, ideal para la mayoría de industrias",
+    "sb2nov": "💼 Sb2nov - Diseño moderno de dos columnas, perfecto para tech/startups",
+    "moderncv": "🎨 ModernCV - Estilo elegante con sidebar, ideal para creativos",
+    "engineeringresumes": "⚙️ Engineering - Diseño técnico optimizado para ingenieros",
+}
+THEMES = tuple(THEME_DESCRIPTIONS)
+THEME_INDEX = {theme: i for i, theme in enumerate(THEMES)}
+
+CV_GENERATION_TIMEOUT = 300  # segundos
+
+# Bloque de código markdown (```json ... ``` o ``` ... ```) en respuestas de Gemini
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+
+# Viñetas al inicio de una línea ("- ", "• ", "* " y combinaciones)
+_BULLET_RE = re.compile(r"^[\s\-•*]+")
+
+
+def _strip_fence(text: str) -> str:
+    """Extrae el contenido de un bloque ``` si existe, en una sola pasada."""
+    match = _FENCE_RE.search(text)
+    return (match.group(1) if match else text).strip()
+
+
+def _profile_summaries(structured_data: dict) -> tuple[str, str, str]:
+    """Resúmenes de educación, experiencia y skills del CV estructurado.
+
+    Returns:
+        Tupla (education_summary, experience_summary, skills_summary).
+    """
+    education = structured_data.get("education", [])
+    experience = structured_data.get("experience", [])
+    skills = structured_data.get("skills", [])
+    return (
+        ", ".join(f"{e.get('degree', 'N/A')} en {e.get('institution', 'N/A')}" for e in education),
+        ", ".join(f"{e.get('position', 'N/A')} en {e.get('company', 'N/A')}" for e in experience),
+        ", ".join(s.get("details", "") for s in skills),
+    )
+
+
+# Respuestas que declaran no tener experiencia (idiomas soportados: es, en, pt, fr)
+_NO_EXPERIENCE_RE = re.compile(
+    r"no\s+teng[oa]\s+experiencia"
+    r"|i\s+don'?t\s+have\s+(?:any\s+)?experience"
+    r"|n[ãa]o\s+tenho\s+experi[êe]ncia"
+    r"|je\s+n'?ai\s+pas\s+d'?exp[ée]rience",
+    re.IGNORECASE,
+)
+
+
+# Generación del CV en segundo plano (hilo aparte del script de Streamlit)
+@st.cache_resource
+def _get_background_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Executor compartido por el proceso para la generación anticipada de CVs."""
+    return concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="cv-gen")
+
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=32, hash_funcs=_TEXT_HASH_FUNCS)
+def _structure_cv_and_classify(
+    cv_text: str,
+    language_name: str,
+    answers: tuple[tuple[str, str], ...],
+    _gemini_client: GeminiClient,
+) -> tuple[dict, list[dict]]:
+    """Estructura el CV y clasifica las respuestas del usuario en una sola llamada.
+
+    Cacheado por (cv_text, idioma, respuestas): regenerar con otro tema o tras
+    un error de renderizado no vuelve a llamar a Gemini. ``_gemini_client`` no
+    forma parte de la key del cache (prefijo ``_``).
+
+    Returns:
+        Tupla (structured_data, classifications).
+    """
+    answers_list = [{"skill": skill, "answer": answer} for skill, answer in answers]
+
+    # Estructurar Datos del CV (Contacto, Educación, Experiencia, Skills) y, si hay
+    # respuestas, clasificarlas en la MISMA llamada (evita un round-trip extra a Gemini)
+    if answers_list:
+        logger.info("Estructurando CV y clasificando respuestas del usuario en una llamada...")
+        prompt = PromptManager.get_combined_structuring_and_classification_prompt(
+            cv_text, answers_list, language=language_name
+        )
+    else:
+        logger.info("Estructurando información del CV...")
+        prompt = PromptManager.get_data_structuring_prompt(cv_text, language=language_name)
+
+    response = _gemini_client.generate(prompt)
+
+    # Limpiar JSON
+    json_str = _strip_fence(response.text)
+
+    parsed = orjson.loads(json_str)
+    if answers_list and "structured" in parsed:
+        return parsed["structured"], parsed.get("classifications") or []
+    return parsed, []
+
+
+def _generate_cv_pipeline(
+    gemini_client: GeminiClient,
+    cv_text: str,
+    job_description: str,
+    selected_language: str,
+    selected_theme: str,
+    gap_analysis_result: dict,
+    user_answers: dict[str, str],
+) -> tuple[str, str]:
+    """Genera el YAML y el PDF del CV optimizado.
+
+    No usa ``st.*`` para poder ejecutarse en segundo plano (ver
+    ``_start_background_cv_generation``); el registro de tokens y el guardado
+    en historial los hace quien consume el resultado.
+
+    Returns:
+        Tupla (yaml_content, pdf_path).
+    """
+    # Mapeo de idioma (definir temprano para usar en todos los prompts)
+    lang_code = LANGUAGE_CODES.get(selected_language, "es")
+
+    language_name = "English" if lang_code == "en" else "Español"
+
+    gap_result = gap_analysis_result["gap_analysis"]
+
+    # Respuestas válidas para clasificar (tupla de pares: hasheable para el cache)
+    valid_answers = tuple(
+        (skill, answer)
+        for skill, answer in user_answers.items()
+        if not _NO_EXPERIENCE_RE.search(answer)
+    )
+
+    # 1. Estructurar Datos del CV y clasificar las respuestas (cacheado)
+    structured_data, classifications = _structure_cv_and_classify(
+        cv_text, language_name, valid_answers, gemini_client
+    )
+    logger.info(
+        f"Datos estructurados: {len(structured_data.get('experience', []))} experiencias encontradas"
+    )
+
+    # 2. Procesar Clasificaciones de Respuestas del Usuario
+    experience_enrichments = []  # Para enriquecer experiencia laboral existente
+    projects_to_create = []  # Para crear sección de proyectos
+
+    for classification in classifications:
+        # Un elemento mal formado del modelo se omite sin abortar todo el CV
+        if not isinstance(classification, dict):
+            logger.warning(f"Clasificación ignorada (no es un objeto): {classification!r}")
+            continue
+        skill_name = classification.get("skill")
+        category = classification.get("classification")
+
+        if category == "EXPERIENCIA_LABORAL":
+            experience_enrichments.append(
+                {
+                    "skill": skill_name,
+                    "company": classification.get("company_name"),
+                    "description": classification.get("description"),
+                }
+            )
+            logger.info(
+                f"{skill_name} clasificado como EXPERIENCIA_LABORAL en {classification.get('company_name')}"
+            )
+
+        elif category in ["PROYECTO_ACADEMICO", "PROYECTO_PERSONAL"]:
+            projects_to_create.append(
+                {
+                    "skill": skill_name,
+                    "project_name": classification.get("project_name"),
+                    "project_type": category,
+                    "description": classification.get("description"),
+                }
+            )
+            logger.info(
+                f"{skill_name} clasificado como {category}: {classification.get('project_name')}"
+            )
+
+    # GENERACIÓN DE CONTENIDO EN UN SOLO LOTE
+    # Todas las tareas son independientes: se recolectan sus prompts y se envían
+    # juntos con ``generate_batch``; luego cada respuesta vuelve a su tarea.
+    tasks: list[tuple[dict, str]] = []
+
+    # 1. Tarea de Resumen Profesional (sin datos de perfil no hay nada que resumir)
+    has_profile = any(structured_data.get(key) for key in ("education", "experience", "skills"))
+    if has_profile:
+        # Preparar datos
+        education_summary, experience_summary, skills_summary = _profile_summaries(structured_data)
+
+        years_exp = "2-3 años"
+        if structured_data.get("experience"):
+            start = str(structured_data["experience"][0].get("start_date") or "")
+            if start[:4].isdigit():
+                years_exp = f"{datetime.date.today().year - int(start[:4])} años"
+
+        must_haves_list = gap_analysis_result.get("must_haves", [])
+        must_haves = "\n".join([f"- {s}" for s in must_haves_list])
+
+        # 2. Priorización de Skills: va en el mismo prompt que el resumen, así la
+        # vacante y el perfil se envían una sola vez
+        current_skills_text = orjson.dumps(
+            structured_data.get("skills", []), option=orjson.OPT_INDENT_2
+        ).decode()
+        job_title = "Desarrollador"  # TODO: Improve extraction
+
+        summary_prompt = PromptManager.get_summary_and_skill_prioritization_prompt(
+            job_description=job_description,
+            education_summary=education_summary,
+            experience_summary=experience_summary,
+            skills_summary=skills_summary,
+            years_experience=years_exp,
+            must_have_skills=must_haves,
+            current_skills=current_skills_text,
+            job_title=job_title,
+            language=language_name,
+        )
+        tasks.append(({"type": "summary_and_skills"}, summary_prompt))
+
+    # 3. Tareas de Enriquecimiento de Experiencia
+    if experience_enrichments and structured_data.get("experience"):
+        # Agrupar enriquecimientos por empresa
+        enrichments_by_company = defaultdict(list)
+        for enrichment in experience_enrichments:
+            enrichments_by_company[enrichment["company"]].append(enrichment)
+
+        # Obtener keywords de la vacante
+        job_keywords = [s.name for s in gap_result.job_requirements.get_must_haves()]
+
+        for i, exp in enumerate(structured_data["experience"]):
+            company_name = exp.get("company", "")
+            if company_name in enrichments_by_company:
+                # Preparar prompt
+                current_highlights = "\n".join([f"- {h}" for h in exp.get("highlights", [])])
+                skills_to_add = "\n".join(
+                    [
+                        f"- {e['skill']}: {e['description']}"
+                        for e in enrichments_by_company[company_name]
+                    ]
+                )
+
+                prompt = PromptManager.get_experience_enrichment_prompt(
+                    position=exp.get("position", ""),
+                    company=company_name,
+                    duration=f"{exp.get('start_date', '')} - {exp.get('end_date', '')}",
+                    current_highlights=current_highlights,
+                    user_confirmed_skills=skills_to_add,
+                    job_keywords=job_keywords,
+                    language=language_name,
+                )
+                tasks.append(({"type": "enrichment", "index": i, "company": company_name}, prompt))
+
+    # 4. Tareas de Creación de Proyectos
+    if projects_to_create:
+        for project_data in projects_to_create:
+            prompt = PromptManager.get_project_entry_generation_prompt(
+                project_name=project_data["project_name"],
+                project_type="académico"
+                if "ACADEMICO" in project_data["project_type"]
+                else "personal",
+                main_skill=project_data["skill"],
+                user_description=project_data["description"],
+                language=language_name,
+            )
+            tasks.append(({"type": "project", "data": project_data}, prompt))
+
+    if tasks:
+        responses = gemini_client.generate_batch([prompt for _, prompt in tasks])
+    else:
+        logger.info("Sin tareas de generación: se omite la llamada a Gemini")
+        responses = []
+
+    # PROCESAR RESULTADOS DEL LOTE
+    new_projects = []
+
+    for (task_info, _), response in zip(tasks, responses, strict=True):
+        try:
+            # Limpiar marcadores JSON si existen
+            text = _strip_fence(response.text)
+
+            if task_info["type"] == "enrichment":
+                # Procesar texto enriquecido (bullet points)
+                enriched_highlights = [
+                    _BULLET_RE.sub("", line).strip()
+                    for line in text.splitlines()
+                    if line.strip() and not line.lstrip().startswith("#")
+                ]
+                structured_data["experience"][task_info["index"]]["highlights"] = (
+                    enriched_highlights
+                )
+                logger.info(f"Experiencia enriquecida (lote): {task_info['company']}")
+
+            elif task_info["type"] == "project":
+                project_entry = orjson.loads(text)
+                new_projects.append(
+                    {
+                        "name": task_info["data"]["project_name"],
+                        "summary": project_entry.get("summary"),
+                        "start_date": None,
+                        "end_date": None,
+                        "highlights": project_entry.get("highlights", []),
+                    }
+                )
+                logger.info(f"Proyecto creado (lote): {task_info['data']['project_name']}")
+
+            elif task_info["type"] == "summary_and_skills":
+                summary_and_skills = orjson.loads(text)
+                if summary_and_skills.get("summary"):
+                    structured_data["summary"] = summary_and_skills["summary"].strip()
+                    logger.info("Resumen generado (lote)")
+                if summary_and_skills.get("skills"):
+                    structured_data["skills"] = summary_and_skills["skills"]
+                    logger.info("Skills priorizadas (lote)")
+
+        except Exception as e:
+            logger.error(f"Error en tarea {task_info['type']}: {e}")
+
+    # Agregar proyectos generados
+    if new_projects:
+        structured_data["projects"] = new_projects
+
+    # 3. Generar YAML
+    logger.info("Generando YAML...")
+    yaml_content = _get_yaml_generator().parse_and_generate(
+        structured_data=structured_data,
+        theme=selected_theme,
+        language=lang_code,
+    )
+
+    # 4. Renderizar PDF
+    logger.info("Renderizando PDF...")
+    pdf_renderer, render_lock = _get_pdf_renderer()
+    with render_lock:
+        pdf_path = pdf_renderer.render_from_string_cached(yaml_content)
+
+    return yaml_content, pdf_path
+
+
+def _cv_pipeline_inputs() -> dict:
+    """Captura desde session_state los argumentos de ``_generate_cv_pipeline``."""
+    return {
+        "cv_text": st.session_state.cv_text,
+        "job_description": st.session_state.job_description,
+        "selected_language": st.session_state.selected_language,
+        "selected_theme": st.session_state.selected_theme,
+        "gap_analysis_result": st.session_state.gap_analysis_result,
+        "user_answers": dict(st.session_state.user_answers),
+    }
+
+
+def _start_background_cv_generation() -> None:
+    """Lanza la generación del CV en cuanto se responde la última pregunta.
+
+    Guarda ``(inputs, future)`` en ``st.session_state.cv_future``; el paso 3
+    solo reutiliza el future si los inputs no cambiaron desde entonces.
+    """
+    if _is_user_blocked():
+        return
+    try:
+        pipeline_inputs = _cv_pipeline_inputs()
+        future = _get_background_executor().submit(
+            _generate_cv_pipeline, _get_gemini_client(_get_user_id()), **pipeline_inputs
+        )
+        st.session_state.cv_future = (pipeline_inputs, future)
+        logger.info("Generación de CV iniciada en segundo plano")
+    except Exception as e:
+        logger.error(f"No se pudo iniciar la generación en segundo plano: {e}")
+
+
+def _save_cv_to_history(**save_kwargs) -> None:
+    """Guarda el CV generado en el historial y refresca la lista del sidebar.
+
+    Corre en ``_get_background_executor`` para no bloquear el resultado en la
+    escritura a Supabase; los errores solo se registran en el log.
+    """
+    try:
+        CVDatabase().save_cv(**save_kwargs)
+        _load_cv_history.clear()
+        logger.info("CV guardado en historial")
+    except Exception as e:
+        logger.error(f"Error guardando el CV en historial: {e}", exc_info=True)
+
+
+def _submit_chat_answer(idx: int, skipped: bool) -> None:
+    """Callback del formulario del chat: registra la respuesta y avanza de pregunta.
+
+    Se ejecuta antes del rerun del fragmento, así el historial ya sale
+    actualizado sin necesidad de un ``st.rerun()`` adicional.
+    """
+    current_q = st.session_state.generated_questions[idx]
+    user_response = st.session_state.get(f"chat_answer_{idx}", "")
+
+    # Guardar respuesta
+    answer_text = (
+        user_response if not skipped and user_response else "No tengo experiencia en esto."
+    )
+
+    # Guardar en diccionario de respuestas
+    skill_name = current_q.gap.skill_name
+    st.session_state.user_answers[skill_name] = answer_text
+
+    # NUEVO: Guardar en memoria persistente si es una respuesta válida (no skip vacío o negativa default)
+    # Nota: Si el usuario confirma "No tengo experiencia", también podríamos querer guardarlo para no preguntar de nuevo?
+    # Por ahora guardamos todo lo que el usuario envía explícitamente.
+    if not skipped and user_response:
+        db = CVDatabase()
+        db.save_skill_answer(skill_name, answer_text)
+
+    # Agregar a historial
+    st.session_state.conversation_history.append({"role": "user", "text": answer_text})
+
+    # Avanzar
+    next_idx = idx + 1
+    st.session_state.current_question_index = next_idx
+
+    if next_idx < len(st.session_state.generated_questions):
+        next_q = st.session_state.generated_questions[next_idx]
+        st.session_state.conversation_history.append(
+            {"role": "ai", "text": next_q.text, "question_idx": next_idx}
+        )
+    else:
+        st.session_state.questions_completed = True
+        st.session_state.interview_just_finished = True
+        _start_background_cv_generation()
+        st.session_state.conversation_history.append(
+            {
+                "role": "ai",
+                "text": "✅ ¡Gracias! He recopilado toda la información necesaria. Generando tu CV automáticamente...",
+            }
+        )
+
+
+@st.fragment
+def _chat_panel() -> None:
+    """Historial del chat y formulario de respuesta del paso 2.
+
+    Al ser un fragmento, enviar o saltar una respuesta solo re-ejecuta este
+    panel; el resto del script se re-ejecuta únicamente al terminar la entrevista.
+    """
+    # La última respuesta requiere un rerun completo para que el flujo principal avance
+    if st.session_state.pop("interview_just_finished", False):
+        st.rerun()
+
+    # Historial de chat
+    for msg in st.session_state.conversation_history:
+        if msg["role"] == "ai":
+            with st.chat_message("assistant"):
+                st.markdown(msg["text"])
+        else:
+            with st.chat_message("user"):
+                st.markdown(msg["text"])
+
+    # Input area
+    if not st.session_state.questions_completed and st.session_state.generated_questions:
+        idx = st.session_state.current_question_index
+
+        if idx < len(st.session_state.generated_questions):
+            current_q = st.session_state.generated_questions[idx]
+
+            # Usar form para enviar con Enter
+            with st.form(key=f"question_form_{idx}"):
+                # Verificar si hay respuesta pre-cargada
+                skill_name_current = current_q.gap.skill_name
+                default_answer = st.session_state.prefilled_answers.get(skill_name_current, "")
+
+                label_text = "Tu respuesta:"
+                if default_answer:
+                    label_text = "💡 Respuesta recuperada de tu historial (puedes editarla):"
+
+                st.text_area(
+                    label_text,
+                    value=default_answer,
+                    height=100,
+                    placeholder="Ej: Sí, he usado esta tecnología en el proyecto X para...",
+                    key=f"chat_answer_{idx}",
+                )
+
+                col1, col2 = st.columns([1, 1])
+                with col1:
+                    st.form_submit_button(
+                        "📤 Enviar Respuesta",
+                        type="primary",
+                        use_container_width=True,
+                        on_click=_submit_chat_answer,
+                        args=(idx, False),
+                    )
+                with col2:
+                    st.form_submit_button(
+                        "⏭️ Saltar / No tengo experiencia",
+                        type="secondary",
+                        use_container_width=True,
+                        on_click=_submit_chat_answer,
+                        args=(idx, True),
+                    )
+
+
 # Inicializar session_state
 if "cv_text" not in st.session_state:
     st.session_state.cv_text = ""
@@ -217,42 +856,30 @@ if "cv_text" not in st.session_state:
     except Exception as e:
         logger.error(f"Error cargando CV base: {e}")
 
-if "job_description" not in st.session_state:
-    st.session_state.job_description = ""
-if "selected_language" not in st.session_state:
-    st.session_state.selected_language = "Español"
-if "selected_theme" not in st.session_state:
-    st.session_state.selected_theme = "classic"
-if "gap_analysis_done" not in st.session_state:
-    st.session_state.gap_analysis_done = False
-if "gap_analysis_result" not in st.session_state:
-    st.session_state.gap_analysis_result = None
-if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = []
-if "generated_questions" not in st.session_state:
-    st.session_state.generated_questions = []
-if "current_question_index" not in st.session_state:
-    st.session_state.current_question_index = 0
-if "user_answers" not in st.session_state:
-    st.session_state.user_answers = {}
-if "questions_completed" not in st.session_state:
-    st.session_state.questions_completed = False
-if "prefilled_answers" not in st.session_state:
-    st.session_state.prefilled_answers = {}
-if "yaml_generated" not in st.session_state:
-    st.session_state.yaml_generated = None
-if "pdf_path" not in st.session_state:
-    st.session_state.pdf_path = None
-
-# NUEVO: Sistema de navegación automática por pasos
-if "current_step" not in st.session_state:
-    st.session_state.current_step = 0  # 0=Inputs, 1=Análisis, 2=Preguntas, 3=Resultado
-if "last_uploaded_file_hash" not in st.session_state:
-    st.session_state.last_uploaded_file_hash = None
-if "auto_analysis_triggered" not in st.session_state:
-    st.session_state.auto_analysis_triggered = False
-if "auto_cv_generation_triggered" not in st.session_state:
-    st.session_state.auto_cv_generation_triggered = False
+# Valores por defecto del estado de la app (un solo setdefault por key)
+_SESSION_DEFAULTS = {
+    "job_description": "",
+    "selected_language": "Español",
+    "selected_theme": "classic",
+    "gap_analysis_done": False,
+    "gap_analysis_result": None,
+    "conversation_history": [],
+    "generated_questions": [],
+    "current_question_index": 0,
+    "user_answers": {},
+    "questions_completed": False,
+    "prefilled_answers": {},
+    "yaml_generated": None,
+    "pdf_path": None,
+    "pdf_preview": None,  # (pdf_path, pdf_bytes, pdf_base64) del PDF mostrado
+    # Sistema de navegación automática por pasos
+    "current_step": 0,  # 0=Inputs, 1=Análisis, 2=Preguntas, 3=Resultado, 4=Asistente
+    "last_uploaded_file_hash": None,
+    "auto_analysis_triggered": False,
+    "auto_cv_generation_triggered": False,
+}
+for _key, _value in _SESSION_DEFAULTS.items():
+    st.session_state.setdefault(_key, _value)
 
 # Estilos CSS personalizados
 st.markdown(
@@ -277,6 +904,23 @@ st.markdown(
         height: 3rem;
         padding: 0 2rem;
     }
+    .badge-grid {
+        display: grid;
+        gap: 0.5rem;
+        margin-bottom: 1rem;
+    }
+    .badge {
+        padding: 0.5rem 0.75rem;
+        border-radius: 0.25rem;
+    }
+    .badge-ok {
+        background: #d4edda;
+        color: #155724;
+    }
+    .badge-missing {
+        background: #f8d7da;
+        color: #721c24;
+    }
 </style>
 """,
     unsafe_allow_html=True,
@@ -291,33 +935,29 @@ st.markdown(
 
 # NUEVO: Barra de progreso global
 steps_names = ["📝 Inputs", "🔍 Análisis", "💬 Preguntas", "✅ Resultado", "🤖 Asistente"]
-current_step_name = steps_names[st.session_state.current_step]
-progress_value = (st.session_state.current_step + 1) / len(steps_names)
-
-# Mostrar barra de progreso
-st.progress(progress_value)
-
-# Mostrar paso actual con emojis de completado y permitir navegación
-progress_cols = st.columns(len(steps_names))
-for idx, step_name in enumerate(steps_names):
-    with progress_cols[idx]:
-        # Determinar etiqueta y estilo
-        if idx < st.session_state.current_step:
-            label = f"✅ {step_name}"
-            type_btn = "secondary"
-        elif idx == st.session_state.current_step:
-            label = f"🔵 {step_name}"
-            type_btn = "primary"
-        else:
-            label = f"⚪ {step_name}"
-            type_btn = "secondary"
-
-        # Usar botones para navegación
-        # Permitimos navegar a pasos anteriores o si ya se completó el flujo (ej. carga de CV)
-        # O simplemente permitimos navegación libre (usuario pide "habilita la opción")
-        if st.button(label, key=f"nav_step_{idx}", use_container_width=True, type=type_btn):
-            st.session_state.current_step = idx
-            st.rerun()
+current_step = st.session_state.current_step
+current_step_name = steps_names[current_step]
+progress_value = (current_step + 1) / len(steps_names)
+
+# Mostrar barra de progreso con el estado de cada paso en un solo widget
+progress_text = " ".join(
+    f"{'✅' if idx < current_step else '🔵' if idx == current_step else '⚪'} {step_name}"
+    for idx, step_name in enumerate(steps_names)
+)
+st.progress(progress_value, text=progress_text)
+
+# Navegación libre entre pasos con un único widget (sin key para que siga a current_step)
+selected_step = st.radio(
+    "Ir al paso",
+    range(len(steps_names)),
+    index=current_step,
+    format_func=steps_names.__getitem__,
+    horizontal=True,
+    label_visibility="collapsed",
+)
+if selected_step != current_step:
+    st.session_state.current_step = selected_step
+    st.rerun()
 
 st.divider()
 
@@ -333,10 +973,7 @@ with st.sidebar:
         except Exception:
             pass
         st.session_state.auth_user = None
-        # Limpiar estado de la app
-        for key in list(st.session_state.keys()):
-            if key not in ("auth_user", "auth_page"):
-                del st.session_state[key]
+        _reset_app_state()
         st.rerun()
     st.divider()
 
@@ -403,7 +1040,7 @@ with st.sidebar:
     # Inicializar DB
     db = CVDatabase()
     try:
-        history = db.get_all_cvs(user_id=_get_user_id())
+        history = _load_cv_history(_get_user_id())
     except Exception as e:
         st.error(f"Error leyendo historial: {e}")
         history = []
@@ -415,22 +1052,17 @@ with st.sidebar:
 
         if st.button("🗑️ Limpiar Historial", type="secondary", use_container_width=True):
             db.clear_all(user_id=_get_user_id())
+            _load_cv_history.clear()
             st.rerun()
 
         st.divider()
 
         # Mostrar lista inversa (más recientes arriba) - get_all_cvs ya los trae ordenados
         for cv_item in history:
-            # Formatear fecha
+            # Formatear fecha: Supabase entrega ISO 8601 (YYYY-MM-DDTHH:MM:SS...),
+            # basta un slice por fila (sin split ni excepción como control de flujo)
             date_str = cv_item["created_at"]
-            try:
-                # Intentar parsear fecha para mostrarla más bonita
-                # Formato DB: YYYY-MM-DD HH:MM:SS
-                date_obj = date_str.split(" ")[0]
-                time_obj = date_str.split(" ")[1][:5]
-                display_date = f"{date_obj} {time_obj}"
-            except:
-                display_date = date_str
+            display_date = date_str[:16].replace("T", " ") if date_str else "N/A"
 
             with st.expander(f"📄 {cv_item['job_title']} ({display_date})"):
                 st.caption(f"**Empresa:** {cv_item.get('company', 'N/A')}")
@@ -470,6 +1102,7 @@ with st.sidebar:
                         use_container_width=True,
                     ):
                         db.delete_cv(cv_item["id"])
+                        _load_cv_history.clear()
                         st.rerun()
 
     st.divider()
@@ -510,8 +1143,7 @@ with st.sidebar:
                         "💾 Guardar", key=f"save_skill_{selected_skill}", use_container_width=True
                     ):
                         db.save_skill_answer(selected_skill, new_answer)
-                        st.success("✅ Actualizado!")
-                        time.sleep(0.5)
+                        st.toast("✅ Actualizado!")
                         st.rerun()
 
                 with col_del:
@@ -522,8 +1154,7 @@ with st.sidebar:
                         use_container_width=True,
                     ):
                         db.delete_skill_answer(selected_skill)
-                        st.warning(f"❌ {selected_skill} eliminado de memoria.")
-                        time.sleep(0.5)
+                        st.toast(f"❌ {selected_skill} eliminado de memoria.")
                         st.rerun()
 
     st.divider()
@@ -540,9 +1171,7 @@ with st.sidebar:
     st.divider()
 
     if st.button("🔄 Reiniciar Proceso", type="secondary", use_container_width=True):
-        # Resetear todo el estado
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        _reset_app_state()
         st.rerun()
 
 # RENDERIZAR CONTENIDO SEGÚN EL PASO ACTUAL
@@ -556,170 +1185,154 @@ if st.session_state.current_step == 0:
         "💡 **Tip:** Cuanto más detallado sea tu CV, mejor será el análisis y las recomendaciones."
     )
 
-    col1, col2 = st.columns(2)
+    # El método de entrada y el cargador de PDF quedan fuera del formulario porque
+    # usan st.button/st.rerun, que no están permitidos dentro de st.form
+    cv_input_method = st.radio(
+        "¿Cómo quieres proporcionar tu CV?", ["Pegar texto", "Subir PDF"], horizontal=True
+    )
 
-    with col1:
-        st.subheader("Tu CV Actual")
-        cv_input_method = st.radio(
-            "¿Cómo quieres proporcionar tu CV?", ["Pegar texto", "Subir PDF"], horizontal=True
+    if cv_input_method == "Subir PDF":
+        uploaded_file = st.file_uploader(
+            "Sube tu CV en PDF",
+            type=["pdf"],
+            help="El PDF debe tener texto seleccionable (no escaneos)",
         )
 
-        if cv_input_method == "Pegar texto":
-            st.session_state.cv_text = st.text_area(
-                "Pega aquí el contenido de tu CV actual",
-                value=st.session_state.cv_text,
-                height=300,
-                placeholder="Ejemplo:\n\nJuan Pérez\nSoftware Engineer\njuan@example.com\n\nExperiencia:\n- Company XYZ (2020-2023)\n  Desarrollé aplicaciones web...\n\nEducación:\n- Universidad ABC\n  Ingeniería en Sistemas\n\nHabilidades:\nPython, JavaScript, SQL...",
-            )
+        if uploaded_file:
+            # Detectar cambio de archivo (xxh3: más rápido que hash() y estable entre procesos)
+            file_hash = _hash_upload(uploaded_file)
 
-            if st.session_state.cv_text:
-                word_count = len(st.session_state.cv_text.split())
-                st.caption(f"📊 {word_count} palabras | {len(st.session_state.cv_text)} caracteres")
-
-            # Botón para guardar como CV Base
-            if st.button(
-                "💾 Guardar como mi CV Base",
-                help="Guarda este texto como tu CV predeterminado para futuras sesiones",
+            # Si es un archivo nuevo o no hay texto extraído, extraer automáticamente
+            if (
+                st.session_state.last_uploaded_file_hash != file_hash
+                or not st.session_state.cv_text
             ):
-                if len(st.session_state.cv_text.strip()) > 50:
+                with st.spinner("📄 Extrayendo texto del PDF automáticamente..."):
                     try:
-                        db = CVDatabase()
-                        db.save_base_cv(st.session_state.cv_text, user_id=_get_user_id())
-                        st.success("✅ CV Base actualizado correctamente")
-                        time.sleep(1)
+                        # Extraer texto (cacheado por contenido del archivo)
+                        st.session_state.cv_text = _extract_cv_text(file_hash, uploaded_file)
+                        st.session_state.last_uploaded_file_hash = file_hash
+
+                        st.success("✅ Texto extraído correctamente!")
                         st.rerun()
+
                     except Exception as e:
-                        st.error(f"Error guardando CV base: {e}")
-                else:
-                    st.warning("⚠️ El texto es muy corto para guardarlo como base")
-        else:
-            uploaded_file = st.file_uploader(
-                "Sube tu CV en PDF",
-                type=["pdf"],
-                help="El PDF debe tener texto seleccionable (no escaneos)",
-            )
+                        st.error(f"❌ Error al extraer texto del PDF: {str(e)}")
+                        st.info("💡 Intenta copiar y pegar el texto manualmente")
 
-            if uploaded_file:
-                # Detectar cambio de archivo
-                file_hash = hash(uploaded_file.getvalue())
+            # Mostrar preview del texto extraído
+            if st.session_state.cv_text:
+                with st.expander("👁️ Ver texto extraído", expanded=False):
+                    st.text_area(
+                        "Texto extraído del PDF:",
+                        value=st.session_state.cv_text,
+                        height=200,
+                        disabled=True,
+                    )
 
-                # Si es un archivo nuevo o no hay texto extraído, extraer automáticamente
-                if (
-                    st.session_state.last_uploaded_file_hash != file_hash
-                    or not st.session_state.cv_text
+                # Botón para guardar como CV Base (versión PDF)
+                if st.button(
+                    "💾 Guardar como mi CV Base",
+                    key="save_base_cv_pdf",
+                    help="Guarda este texto como tu CV predeterminado para futuras sesiones",
                 ):
-                    with st.spinner("📄 Extrayendo texto del PDF automáticamente..."):
+                    if len(st.session_state.cv_text.strip()) > 50:
                         try:
-                            # Guardar archivo temporalmente
-                            with tempfile.NamedTemporaryFile(
-                                delete=False, suffix=".pdf"
-                            ) as tmp_file:
-                                tmp_file.write(uploaded_file.getvalue())
-                                tmp_path = tmp_file.name
-
-                            # Usar CVParser para extraer texto
-                            parser = CVParser()
-                            cv_data = parser.parse_pdf(tmp_path)
-
-                            # Guardar el texto extraído
-                            st.session_state.cv_text = cv_data.raw_text
-                            st.session_state.last_uploaded_file_hash = file_hash
-
-                            # Limpiar archivo temporal
-                            Path(tmp_path).unlink()
-
-                            st.success("✅ Texto extraído correctamente!")
+                            db = CVDatabase()
+                            db.save_base_cv(st.session_state.cv_text, user_id=_get_user_id())
+                            st.toast("✅ CV Base actualizado correctamente")
                             st.rerun()
-
                         except Exception as e:
-                            st.error(f"❌ Error al extraer texto del PDF: {str(e)}")
-                            st.info("💡 Intenta copiar y pegar el texto manualmente")
-
-                # Mostrar preview del texto extraído
-                if st.session_state.cv_text:
-                    with st.expander("👁️ Ver texto extraído", expanded=False):
-                        st.text_area(
-                            "Texto extraído del PDF:",
-                            value=st.session_state.cv_text,
-                            height=200,
-                            disabled=True,
-                        )
+                            st.error(f"Error guardando CV base: {e}")
+    # Formulario: textos y configuración se envían juntos al pulsar un botón, así
+    # editar no dispara un rerun completo del script (ni recalcula los contadores)
+    with st.form("inputs_form", clear_on_submit=False):
+        col1, col2 = st.columns(2)
 
-                    # Botón para guardar como CV Base (versión PDF)
-                    if st.button(
-                        "💾 Guardar como mi CV Base",
-                        key="save_base_cv_pdf",
-                        help="Guarda este texto como tu CV predeterminado para futuras sesiones",
-                    ):
-                        if len(st.session_state.cv_text.strip()) > 50:
-                            try:
-                                db = CVDatabase()
-                                db.save_base_cv(st.session_state.cv_text, user_id=_get_user_id())
-                                st.success("✅ CV Base actualizado correctamente")
-                                time.sleep(1)
-                                st.rerun()
-                            except Exception as e:
-                                st.error(f"Error guardando CV base: {e}")
-
-    with col2:
-        st.subheader("Descripción de la Vacante")
-        st.session_state.job_description = st.text_area(
-            "Pega aquí la descripción completa de la vacante",
-            value=st.session_state.job_description,
-            height=300,
-            placeholder="Ejemplo:\n\nSenior Python Developer\n\nRequisitos:\n- 5+ años de experiencia con Python\n- Django, Flask\n- PostgreSQL, MongoDB\n- Docker, Kubernetes\n- Liderazgo de equipos\n\nResponsabilidades:\n- Diseñar arquitecturas escalables\n- Mentoría a desarrolladores junior\n- Code reviews...",
-        )
+        with col1:
+            st.subheader("Tu CV Actual")
+            if cv_input_method == "Pegar texto":
+                st.session_state.cv_text = st.text_area(
+                    "Pega aquí el contenido de tu CV actual",
+                    value=st.session_state.cv_text,
+                    height=300,
+                    placeholder="Ejemplo:\n\nJuan Pérez\nSoftware Engineer\njuan@example.com\n\nExperiencia:\n- Company XYZ (2020-2023)\n  Desarrollé aplicaciones web...\n\nEducación:\n- Universidad ABC\n  Ingeniería en Sistemas\n\nHabilidades:\nPython, JavaScript, SQL...",
+                )
+            else:
+                st.caption("📄 El texto del CV se toma del PDF subido.")
+
+            if st.session_state.cv_text:
+                word_count = len(st.session_state.cv_text.split())
+                st.caption(f"📊 {word_count} palabras | {len(st.session_state.cv_text)} caracteres")
 
-        if st.session_state.job_description:
-            word_count = len(st.session_state.job_description.split())
-            st.caption(
-                f"📊 {word_count} palabras | {len(st.session_state.job_description)} caracteres"
+        with col2:
+            st.subheader("Descripción de la Vacante")
+            st.session_state.job_description = st.text_area(
+                "Pega aquí la descripción completa de la vacante",
+                value=st.session_state.job_description,
+                height=300,
+                placeholder="Ejemplo:\n\nSenior Python Developer\n\nRequisitos:\n- 5+ años de experiencia con Python\n- Django, Flask\n- PostgreSQL, MongoDB\n- Docker, Kubernetes\n- Liderazgo de equipos\n\nResponsabilidades:\n- Diseñar arquitecturas escalables\n- Mentoría a desarrolladores junior\n- Code reviews...",
             )
 
-    st.divider()
+            if st.session_state.job_description:
+                word_count = len(st.session_state.job_description.split())
+                st.caption(
+                    f"📊 {word_count} palabras | {len(st.session_state.job_description)} caracteres"
+                )
 
-    # Configuración adicional
-    st.subheader("⚙️ Configuración del CV")
+        st.divider()
 
-    col3, col4 = st.columns(2)
+        # Configuración adicional
+        st.subheader("⚙️ Configuración del CV")
 
-    with col3:
-        # Mapeo de idiomas a códigos
-        language_map = {"Español": "es", "English": "en", "Português": "pt", "Français": "fr"}
+        col3, col4 = st.columns(2)
 
-        selected_lang_display = st.selectbox(
-            "🌐 Idioma del CV a generar",
-            ["Español", "English", "Português", "Français"],
-            index=["Español", "English", "Português", "Français"].index(
-                st.session_state.selected_language
-            ),
-            help="El CV final se generará en este idioma",
-        )
-        st.session_state.selected_language = selected_lang_display
-
-    with col4:
-        # Descripciones de temas
-        theme_descriptions = {
-            "classic": "📘 Classic - Diseño limpio y profesional, ideal para la mayoría de industrias",
-            "sb2nov": "💼 Sb2nov - Diseño moderno de dos columnas, perfecto para tech/startups",
-            "moderncv": "🎨 ModernCV - Estilo elegante con sidebar, ideal para creativos",
-            "engineeringresumes": "⚙️ Engineering - Diseño técnico optimizado para ingenieros",
-        }
-
-        selected_theme = st.selectbox(
-            "🎨 Tema de RenderCV",
-            ["classic", "sb2nov", "moderncv", "engineeringresumes"],
-            index=["classic", "sb2nov", "moderncv", "engineeringresumes"].index(
-                st.session_state.selected_theme
-            ),
-            format_func=lambda x: theme_descriptions[x],
-            help="El tema define el estilo visual de tu CV",
-        )
-        st.session_state.selected_theme = selected_theme
+        with col3:
+            selected_lang_display = st.selectbox(
+                "🌐 Idioma del CV a generar",
+                LANGUAGES,
+                index=LANGUAGE_INDEX.get(st.session_state.selected_language, 0),
+                help="El CV final se generará en este idioma",
+            )
+            st.session_state.selected_language = selected_lang_display
+
+        with col4:
+            selected_theme = st.selectbox(
+                "🎨 Tema de RenderCV",
+                THEMES,
+                index=THEME_INDEX.get(st.session_state.selected_theme, 0),
+                format_func=THEME_DESCRIPTIONS.__getitem__,
+                help="El tema define el estilo visual de tu CV",
+            )
+            st.session_state.selected_theme = selected_theme
+
+        col_update, col_start = st.columns(2)
+        with col_update:
+            st.form_submit_button("🔄 Actualizar", use_container_width=True)
+        with col_start:
+            start_analysis = st.form_submit_button(
+                "🚀 Comenzar Análisis", type="primary", use_container_width=True
+            )
+
+    # Botón para guardar como CV Base (usa el último texto enviado en el formulario)
+    if cv_input_method == "Pegar texto" and st.button(
+        "💾 Guardar como mi CV Base",
+        help="Guarda este texto como tu CV predeterminado para futuras sesiones",
+    ):
+        if len(st.session_state.cv_text.strip()) > 50:
+            try:
+                db = CVDatabase()
+                db.save_base_cv(st.session_state.cv_text, user_id=_get_user_id())
+                st.toast("✅ CV Base actualizado correctamente")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error guardando CV base: {e}")
+        else:
+            st.warning("⚠️ El texto es muy corto para guardarlo como base")
 
     st.divider()
 
-    # Validación y AUTO-AVANCE
+    # Validación y AVANCE (solo al enviar el formulario)
     validation_errors = []
 
     if not st.session_state.cv_text or len(st.session_state.cv_text.strip()) < 50:
@@ -729,12 +1342,10 @@ if st.session_state.current_step == 0:
 
     if validation_errors:
         st.warning(f"⚠️ **Para continuar, completa:** {', '.join(validation_errors)}")
-        st.button("🚀 Comenzar Análisis (Deshabilitado)", disabled=True)
     else:
         st.success("✅ Inputs válidos. Configura tu idioma y tema, luego inicia el análisis.")
 
-        # Botón manual para avanzar
-        if st.button("🚀 Comenzar Análisis", type="primary", use_container_width=True):
+        if start_analysis:
             st.session_state.current_step = 1
             st.rerun()
 
@@ -759,15 +1370,20 @@ elif st.session_state.current_step == 1:
         with st.spinner("🤖 Analizando tu CV vs. la vacante con Gemini AI..."):
             try:
                 # Crear cliente de Gemini
-                gemini_client = GeminiClient()
+                gemini_client = _get_gemini_client(_get_user_id())
 
-                # Inicializar GapAnalyzer con el cliente
-                gap_analyzer = GapAnalyzer(gemini_client=gemini_client)
+                # Inicializar GapAnalyzer compartiendo el cliente (también en JobAnalyzer)
+                gap_analyzer = GapAnalyzer(
+                    cv_parser=_get_cv_parser(),
+                    job_analyzer=JobAnalyzer(gemini_client=gemini_client),
+                    gemini_client=gemini_client,
+                )
 
-                # Ejecutar Gap Analysis
-                gap_result = gap_analyzer.analyze(
-                    cv_text=st.session_state.cv_text,
-                    job_description=st.session_state.job_description,
+                # Ejecutar Gap Analysis (cacheado por cv_text + job_description)
+                gap_result = _run_gap_analysis(
+                    st.session_state.cv_text,
+                    st.session_state.job_description,
+                    gap_analyzer,
                 )
 
                 # Registrar tokens consumidos
@@ -790,8 +1406,7 @@ elif st.session_state.current_step == 1:
                 }
                 st.session_state.gap_analysis_done = True
 
-                st.success("✅ ¡Análisis completado!")
-                time.sleep(1)  # Pequeña pausa para ver el mensaje
+                st.toast("✅ ¡Análisis completado!")
                 st.rerun()
 
             except Exception as e:
@@ -804,6 +1419,10 @@ elif st.session_state.current_step == 1:
         # Mostrar resultados del análisis
         result = st.session_state.gap_analysis_result
         gap_analysis = result.get("gap_analysis")
+        must_haves = result.get("must_haves", [])
+        found_in_cv = result.get("found_in_cv", [])
+        gaps = result.get("gaps", [])
+        found_set = set(found_in_cv)
 
         # Métricas principales
         col1, col2, col3, col4 = st.columns(4)
@@ -811,12 +1430,12 @@ elif st.session_state.current_step == 1:
         with col1:
             st.metric(
                 "Requisitos Totales",
-                len(result.get("must_haves", [])),
+                len(must_haves),
                 help="Total de habilidades must-have identificadas",
             )
 
         with col2:
-            matched_count = len(result.get("found_in_cv", []))
+            matched_count = len(found_in_cv)
             st.metric(
                 "Encontradas en CV",
                 matched_count,
@@ -826,7 +1445,7 @@ elif st.session_state.current_step == 1:
             )
 
         with col3:
-            gap_count = len(result.get("gaps", []))
+            gap_count = len(gaps)
             st.metric(
                 "Brechas Detectadas",
                 gap_count,
@@ -836,10 +1455,7 @@ elif st.session_state.current_step == 1:
             )
 
         with col4:
-            if len(result.get("must_haves", [])) > 0:
-                match_percentage = int((matched_count / len(result.get("must_haves", []))) * 100)
-            else:
-                match_percentage = 0
+            match_percentage = int(matched_count / len(must_haves) * 100) if must_haves else 0
 
             st.metric(
                 "Compatibilidad",
@@ -852,20 +1468,15 @@ elif st.session_state.current_step == 1:
         # Requisitos de la vacante
         st.subheader("📋 Requisitos Must-Have de la Vacante")
 
-        if result.get("must_haves"):
-            # Agrupar en filas de 4
-            must_haves = result.get("must_haves", [])
-            rows = [must_haves[i : i + 4] for i in range(0, len(must_haves), 4)]
-
-            for row in rows:
-                cols = st.columns(4)
-                for idx, skill in enumerate(row):
-                    with cols[idx]:
-                        # Verificar si está en found_in_cv
-                        if skill in result.get("found_in_cv", []):
-                            st.success(f"✅ {skill}")
-                        else:
-                            st.error(f"❌ {skill}")
+        if must_haves:
+            # Grid de 4 columnas: verde si está en found_in_cv, rojo si no
+            badges = [
+                (f"✅ {html.escape(skill)}", "badge-ok")
+                if skill in found_set
+                else (f"❌ {html.escape(skill)}", "badge-missing")
+                for skill in must_haves
+            ]
+            st.markdown(_badge_grid_html(badges, columns=4), unsafe_allow_html=True)
         else:
             st.info("No se identificaron requisitos must-have específicos")
 
@@ -874,16 +1485,14 @@ elif st.session_state.current_step == 1:
         # Habilidades encontradas
         st.subheader("✅ Habilidades Encontradas en tu CV")
 
-        if result.get("found_in_cv"):
-            found_skills = result.get("found_in_cv", [])
-
+        if found_in_cv:
             # Mostrar en badges verdes
-            cols = st.columns(5)
-            for idx, skill in enumerate(found_skills):
-                with cols[idx % 5]:
-                    st.markdown(f":green[✓ **{skill}**]")
+            badges = [
+                (f"✓ <strong>{html.escape(skill)}</strong>", "badge-ok") for skill in found_in_cv
+            ]
+            st.markdown(_badge_grid_html(badges, columns=5), unsafe_allow_html=True)
 
-            st.success(f"🎉 Tienes {len(found_skills)} de las habilidades requeridas!")
+            st.success(f"🎉 Tienes {len(found_in_cv)} de las habilidades requeridas!")
         else:
             st.warning("⚠️ No se encontraron coincidencias directas con los requisitos")
             st.info(
@@ -895,16 +1504,12 @@ elif st.session_state.current_step == 1:
         # Brechas identificadas
         st.subheader("⚠️ Brechas Identificadas (Skills Faltantes)")
 
-        if result.get("gaps"):
-            gaps = result.get("gaps", [])
-
+        if gaps:
             st.warning(f"Se identificaron **{len(gaps)} brechas** entre tu CV y la vacante")
 
             # Mostrar gaps en columnas
-            cols = st.columns(3)
-            for idx, gap in enumerate(gaps):
-                with cols[idx % 3]:
-                    st.markdown(f"🔴 **{gap}**")
+            badges = [(f"🔴 <strong>{html.escape(gap)}</strong>", "badge-missing") for gap in gaps]
+            st.markdown(_badge_grid_html(badges, columns=3), unsafe_allow_html=True)
 
             st.info("""
             💡 **Siguiente paso:** En el tab de Preguntas, la IA te consultará sobre estas habilidades.
@@ -924,20 +1529,18 @@ elif st.session_state.current_step == 1:
             st.subheader("💡 Recomendaciones de la IA")
 
             # Mostrar recomendaciones críticas
+            # (un solo widget por nivel en lugar de uno por recomendación)
             if recommendations.get("critical"):
-                for rec in recommendations["critical"]:
-                    st.error(f"🚨 {rec}")
+                st.error("🚨 " + "\n\n🚨 ".join(recommendations["critical"]))
 
             # Mostrar recomendaciones importantes
             if recommendations.get("important"):
-                for rec in recommendations["important"]:
-                    st.warning(f"⚠️ {rec}")
+                st.warning("⚠️ " + "\n\n⚠️ ".join(recommendations["important"]))
 
             # Mostrar sugerencias
             if recommendations.get("nice_to_have"):
                 with st.expander("ℹ️ Ver sugerencias adicionales"):
-                    for rec in recommendations["nice_to_have"]:
-                        st.info(rec)
+                    st.info("\n\n".join(recommendations["nice_to_have"]))
 
         # AVANCE MANUAL
         st.divider()
@@ -990,7 +1593,7 @@ elif st.session_state.current_step == 2:
                     lang_enum = lang_map.get(selected_lang, Language.SPANISH)
 
                     # Inicializar generador
-                    gemini_client = GeminiClient()
+                    gemini_client = _get_gemini_client(_get_user_id())
                     question_gen = QuestionGenerator(ai_client=gemini_client, language=lang_enum)
 
                     # Generar preguntas
@@ -1046,94 +1649,7 @@ elif st.session_state.current_step == 2:
 
         st.divider()
 
-        # Historial de chat
-        for msg in st.session_state.conversation_history:
-            if msg["role"] == "ai":
-                with st.chat_message("assistant"):
-                    st.markdown(msg["text"])
-            else:
-                with st.chat_message("user"):
-                    st.markdown(msg["text"])
-
-        # Input area
-        if not st.session_state.questions_completed and st.session_state.generated_questions:
-            idx = st.session_state.current_question_index
-
-            if idx < len(st.session_state.generated_questions):
-                current_q = st.session_state.generated_questions[idx]
-
-                # Usar form para enviar con Enter
-                with st.form(key=f"question_form_{idx}"):
-                    # Verificar si hay respuesta pre-cargada
-                    skill_name_current = current_q.gap.skill_name
-                    default_answer = st.session_state.prefilled_answers.get(skill_name_current, "")
-
-                    label_text = "Tu respuesta:"
-                    if default_answer:
-                        label_text = "💡 Respuesta recuperada de tu historial (puedes editarla):"
-
-                    user_response = st.text_area(
-                        label_text,
-                        value=default_answer,
-                        height=100,
-                        placeholder="Ej: Sí, he usado esta tecnología en el proyecto X para...",
-                    )
-
-                    col1, col2 = st.columns([1, 1])
-                    with col1:
-                        submit = st.form_submit_button(
-                            "📤 Enviar Respuesta", type="primary", use_container_width=True
-                        )
-                    with col2:
-                        skip = st.form_submit_button(
-                            "⏭️ Saltar / No tengo experiencia",
-                            type="secondary",
-                            use_container_width=True,
-                        )
-
-                    if submit or skip:
-                        # Guardar respuesta
-                        answer_text = (
-                            user_response
-                            if submit and user_response
-                            else "No tengo experiencia en esto."
-                        )
-
-                        # Guardar en diccionario de respuestas
-                        skill_name = current_q.gap.skill_name
-                        st.session_state.user_answers[skill_name] = answer_text
-
-                        # NUEVO: Guardar en memoria persistente si es una respuesta válida (no skip vacío o negativa default)
-                        # Nota: Si el usuario confirma "No tengo experiencia", también podríamos querer guardarlo para no preguntar de nuevo?
-                        # Por ahora guardamos todo lo que el usuario envía explícitamente.
-                        if submit and user_response:
-                            db = CVDatabase()
-                            db.save_skill_answer(skill_name, answer_text)
-
-                        # Agregar a historial
-                        st.session_state.conversation_history.append(
-                            {"role": "user", "text": answer_text}
-                        )
-
-                        # Avanzar
-                        next_idx = idx + 1
-                        st.session_state.current_question_index = next_idx
-
-                        if next_idx < len(st.session_state.generated_questions):
-                            next_q = st.session_state.generated_questions[next_idx]
-                            st.session_state.conversation_history.append(
-                                {"role": "ai", "text": next_q.text, "question_idx": next_idx}
-                            )
-                        else:
-                            st.session_state.questions_completed = True
-                            st.session_state.conversation_history.append(
-                                {
-                                    "role": "ai",
-                                    "text": "✅ ¡Gracias! He recopilado toda la información necesaria. Generando tu CV automáticamente...",
-                                }
-                            )
-
-                        st.rerun()
+        _chat_panel()
 
         # AUTO-AVANCE: Si preguntas completadas, ir al siguiente paso
         if st.session_state.questions_completed:
@@ -1146,10 +1662,9 @@ elif st.session_state.current_step == 2:
                         st.markdown(f"**{skill}:** {answer}")
 
             # Auto-avance
-            with st.spinner("Preparando resultado final..."):
-                time.sleep(2)
-                st.session_state.current_step = 3
-                st.rerun()
+            st.toast("Preparando resultado final...")
+            st.session_state.current_step = 3
+            st.rerun()
 
 # TAB 4: RESULTADO
 elif st.session_state.current_step == 3:
@@ -1176,6 +1691,7 @@ elif st.session_state.current_step == 3:
                 st.session_state.current_question_index = 0
                 # NOTA: No borramos user_answers para que sirvan de pre-llenado
                 st.session_state.yaml_generated = None  # Forzar regeneración
+                st.session_state.pop("cv_future", None)
                 st.rerun()
 
         if not st.session_state.yaml_generated:
@@ -1188,354 +1704,39 @@ elif st.session_state.current_step == 3:
             try:
                 logger.info("Iniciando generación automática de CV (Tab 4)")
 
-                # Inicializar clientes
-                gemini_client = GeminiClient()
-
-                # Mapeo de idioma (definir temprano para usar en todos los prompts)
-                lang_code = {
-                    "Español": "es",
-                    "English": "en",
-                    "Português": "pt",
-                    "Français": "fr",
-                }.get(st.session_state.selected_language, "es")
-
-                language_name = "English" if lang_code == "en" else "Español"
-
-                # 1. Estructurar Datos del CV (Contacto, Educación, Experiencia, Skills)
-                with st.spinner("🧠 Estructurando información del CV..."):
-                    logger.info("Estructurando información del CV...")
-                    prompt = PromptManager.get_data_structuring_prompt(
-                        st.session_state.cv_text, language=language_name
-                    )
-
-                    response = gemini_client.generate(prompt)
-                    import json
-
-                    # Limpiar JSON
-                    json_str = response.text.strip()
-                    if "```json" in json_str:
-                        json_str = json_str.split("```json")[1].split("```")[0].strip()
-                    elif "```" in json_str:
-                        json_str = json_str.split("```")[1].split("```")[0].strip()
+                gemini_client = _get_gemini_client(_get_user_id())
+                pipeline_inputs = _cv_pipeline_inputs()
 
-                    structured_data = json.loads(json_str)
-                    logger.info(
-                        f"Datos estructurados: {len(structured_data.get('experience', []))} experiencias encontradas"
-                    )
-
-                # 2. Clasificar y Procesar Respuestas del Usuario (OPTIMIZADO CON BATCHING Y PARALELISMO)
-                gap_result = st.session_state.gap_analysis_result["gap_analysis"]
-                user_answers = st.session_state.user_answers
-
-                # Inicializar listas para clasificaciones
-                experience_enrichments = []  # Para enriquecer experiencia laboral existente
-                projects_to_create = []  # Para crear sección de proyectos
-
-                if user_answers:
-                    with st.spinner("🔍 Clasificando tus respuestas (Optimizado)..."):
-                        logger.info("Clasificando respuestas del usuario en batch...")
-
-                        # Obtener nombres de empresas conocidas del CV
-                        known_companies = [
-                            exp.get("company", "") for exp in structured_data.get("experience", [])
-                        ]
-
-                        # Preparar lista de respuestas válidas para el prompt
-                        answers_list = []
-                        for skill, answer in user_answers.items():
-                            if "no tengo experiencia" not in answer.lower():
-                                answers_list.append({"skill": skill, "answer": answer})
-
-                        if answers_list:
-                            try:
-                                # Llamada BATCH única a la IA
-                                classifier_prompt = (
-                                    PromptManager.get_batch_user_response_classifier_prompt(
-                                        user_answers_list=answers_list,
-                                        known_companies=known_companies,
-                                    )
-                                )
-
-                                classifier_response = gemini_client.generate(classifier_prompt)
-                                classifier_text = classifier_response.text.strip()
-
-                                # Limpiar JSON
-                                if "```json" in classifier_text:
-                                    classifier_text = (
-                                        classifier_text.split("```json")[1].split("```")[0].strip()
-                                    )
-                                elif "```" in classifier_text:
-                                    classifier_text = (
-                                        classifier_text.split("```")[1].split("```")[0].strip()
-                                    )
-
-                                classifications = json.loads(classifier_text)
-
-                                # Procesar clasificaciones
-                                for classification in classifications:
-                                    skill_name = classification.get("skill")
-
-                                    if classification["classification"] == "EXPERIENCIA_LABORAL":
-                                        experience_enrichments.append(
-                                            {
-                                                "skill": skill_name,
-                                                "company": classification.get("company_name"),
-                                                "description": classification.get("description"),
-                                            }
-                                        )
-                                        logger.info(
-                                            f"{skill_name} clasificado como EXPERIENCIA_LABORAL en {classification.get('company_name')}"
-                                        )
-
-                                    elif classification["classification"] in [
-                                        "PROYECTO_ACADEMICO",
-                                        "PROYECTO_PERSONAL",
-                                    ]:
-                                        projects_to_create.append(
-                                            {
-                                                "skill": skill_name,
-                                                "project_name": classification.get("project_name"),
-                                                "project_type": classification["classification"],
-                                                "description": classification.get("description"),
-                                            }
-                                        )
-                                        logger.info(
-                                            f"{skill_name} clasificado como {classification['classification']}: {classification.get('project_name')}"
-                                        )
-
-                            except Exception as e:
-                                logger.error(f"Error en clasificación batch: {e}")
-                                # Fallback (podría implementarse lógica individual aquí si falla el batch)
-
-                # EJECUCIÓN PARALELA DE GENERACIÓN DE CONTENIDO
-                with st.spinner("🚀 Generando contenido enriquecido en paralelo..."):
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        futures = {}
-
-                        # 1. Tareas de Enriquecimiento de Experiencia
-                        enrichment_tasks = []
-                        if experience_enrichments and structured_data.get("experience"):
-                            # Agrupar enriquecimientos por empresa
-                            enrichments_by_company = {}
-                            for enrichment in experience_enrichments:
-                                company = enrichment["company"]
-                                if company not in enrichments_by_company:
-                                    enrichments_by_company[company] = []
-                                enrichments_by_company[company].append(enrichment)
-
-                            # Obtener keywords de la vacante
-                            job_keywords = [
-                                s.name for s in gap_result.job_requirements.get_must_haves()
-                            ]
-
-                            for i, exp in enumerate(structured_data["experience"]):
-                                company_name = exp.get("company", "")
-                                if company_name in enrichments_by_company:
-                                    # Preparar prompt
-                                    current_highlights = "\n".join(
-                                        [f"- {h}" for h in exp.get("highlights", [])]
-                                    )
-                                    skills_to_add = "\n".join(
-                                        [
-                                            f"- {e['skill']}: {e['description']}"
-                                            for e in enrichments_by_company[company_name]
-                                        ]
-                                    )
-
-                                    prompt = PromptManager.get_experience_enrichment_prompt(
-                                        position=exp.get("position", ""),
-                                        company=company_name,
-                                        duration=f"{exp.get('start_date', '')} - {exp.get('end_date', '')}",
-                                        current_highlights=current_highlights,
-                                        user_confirmed_skills=skills_to_add,
-                                        job_keywords=job_keywords,
-                                        language=language_name,
-                                    )
-
-                                    # Submit task
-                                    future = executor.submit(gemini_client.generate, prompt)
-                                    futures[future] = {
-                                        "type": "enrichment",
-                                        "index": i,
-                                        "company": company_name,
-                                    }
-
-                        # 2. Tareas de Creación de Proyectos
-                        if projects_to_create:
-                            for i, project_data in enumerate(projects_to_create):
-                                prompt = PromptManager.get_project_entry_generation_prompt(
-                                    project_name=project_data["project_name"],
-                                    project_type="académico"
-                                    if "ACADEMICO" in project_data["project_type"]
-                                    else "personal",
-                                    main_skill=project_data["skill"],
-                                    user_description=project_data["description"],
-                                    language=language_name,
-                                )
-                                future = executor.submit(gemini_client.generate, prompt)
-                                futures[future] = {"type": "project", "data": project_data}
-
-                        # 3. Tarea de Resumen Profesional
-                        # Preparar datos
-                        education_summary = ", ".join(
-                            [
-                                f"{e.get('degree', 'N/A')} en {e.get('institution', 'N/A')}"
-                                for e in structured_data.get("education", [])
-                            ]
-                        )
-                        experience_summary = ", ".join(
-                            [
-                                f"{e.get('position', 'N/A')} en {e.get('company', 'N/A')}"
-                                for e in structured_data.get("experience", [])
-                            ]
-                        )
-                        skills_summary = ", ".join(
-                            [s.get("details", "") for s in structured_data.get("skills", [])]
-                        )
-
-                        years_exp = "2-3 años"
-                        if structured_data.get("experience"):
-                            try:
-                                first_exp = structured_data["experience"][0]
-                                start = first_exp.get("start_date", "2020")
-                                if start and len(start) >= 4:
-                                    years_exp = f"{2026 - int(start[:4])} años"
-                            except:
-                                pass
-
-                        must_haves = "\n".join(
-                            [
-                                f"- {s}"
-                                for s in st.session_state.gap_analysis_result.get("must_haves", [])
-                            ]
-                        )
-
-                        summary_prompt = PromptManager.get_summary_generation_prompt(
-                            job_description=st.session_state.job_description,
-                            education_summary=education_summary,
-                            experience_summary=experience_summary,
-                            skills_summary=skills_summary,
-                            years_experience=years_exp,
-                            must_have_skills=must_haves,
-                            language=language_name,
-                        )
-                        future_summary = executor.submit(gemini_client.generate, summary_prompt)
-                        futures[future_summary] = {"type": "summary"}
-
-                        # 4. Tarea de Priorización de Skills
-                        current_skills_text = json.dumps(
-                            structured_data.get("skills", []), ensure_ascii=False, indent=2
-                        )
-                        must_haves_list = st.session_state.gap_analysis_result.get("must_haves", [])
-                        must_haves_text = ", ".join(must_haves_list)
-                        job_title = "Desarrollador"  # TODO: Improve extraction
-
-                        skill_prompt = PromptManager.get_skill_prioritization_prompt(
-                            current_skills=current_skills_text,
-                            must_have_skills=must_haves_text,
-                            job_title=job_title,
+                # Reusar la generación lanzada en segundo plano al terminar la entrevista
+                background = st.session_state.get("cv_future")
+                with st.spinner("🚀 Generando tu CV optimizado..."):
+                    if background is not None and background[0] == pipeline_inputs:
+                        yaml_content, pdf_path = background[1].result(timeout=CV_GENERATION_TIMEOUT)
+                    else:
+                        yaml_content, pdf_path = _generate_cv_pipeline(
+                            gemini_client, **pipeline_inputs
                         )
-                        future_skills = executor.submit(gemini_client.generate, skill_prompt)
-                        futures[future_skills] = {"type": "skills"}
-
-                        # PROCESAR RESULTADOS A MEDIDA QUE LLEGAN
-                        new_projects = []
-
-                        for future in concurrent.futures.as_completed(futures):
-                            task_info = futures[future]
-                            try:
-                                response = future.result()
-                                text = response.text.strip()
-
-                                # Limpiar marcadores JSON si existen
-                                if "```json" in text:
-                                    text = text.split("```json")[1].split("```")[0].strip()
-                                elif "```" in text:
-                                    text = text.split("```")[1].split("```")[0].strip()
-
-                                if task_info["type"] == "enrichment":
-                                    # Procesar texto enriquecido (bullet points)
-                                    enriched_highlights = [
-                                        line.strip().lstrip("-").lstrip("•").lstrip("*").strip()
-                                        for line in text.split("\n")
-                                        if line.strip() and not line.strip().startswith("#")
-                                    ]
-                                    structured_data["experience"][task_info["index"]][
-                                        "highlights"
-                                    ] = enriched_highlights
-                                    logger.info(
-                                        f"Experiencia enriquecida (Async): {task_info['company']}"
-                                    )
-
-                                elif task_info["type"] == "project":
-                                    project_entry = json.loads(text)
-                                    new_projects.append(
-                                        {
-                                            "name": task_info["data"]["project_name"],
-                                            "summary": project_entry.get("summary"),
-                                            "start_date": None,
-                                            "end_date": None,
-                                            "highlights": project_entry.get("highlights", []),
-                                        }
-                                    )
-                                    logger.info(
-                                        f"Proyecto creado (Async): {task_info['data']['project_name']}"
-                                    )
-
-                                elif task_info["type"] == "summary":
-                                    if text.startswith('"') and text.endswith('"'):
-                                        text = text[1:-1]
-                                    structured_data["summary"] = text
-                                    logger.info("Resumen generado (Async)")
-
-                                elif task_info["type"] == "skills":
-                                    prioritized_skills = json.loads(text)
-                                    structured_data["skills"] = prioritized_skills
-                                    logger.info("Skills priorizadas (Async)")
-
-                            except Exception as e:
-                                logger.error(f"Error en tarea {task_info['type']}: {e}")
-
-                        # Agregar proyectos generados
-                        if new_projects:
-                            structured_data["projects"] = new_projects
+                st.session_state.pop("cv_future", None)
+                st.session_state.yaml_generated = yaml_content
+                st.session_state.pdf_path = pdf_path
+                lang_code = LANGUAGE_CODES.get(st.session_state.selected_language, "es")
 
                 # Registrar tokens consumidos (todas las llamadas IA acumuladas)
                 _record_token_usage(gemini_client, "cv_generation")
 
-                # 3. Generar YAML
-                with st.spinner("📄 Generando archivo YAML..."):
-                    logger.info("Generando YAML...")
-                    yaml_gen = YAMLGenerator()
-
-                    yaml_content = yaml_gen.parse_and_generate(
-                        structured_data=structured_data,
-                        theme=st.session_state.selected_theme,
-                        language=lang_code,
-                    )
-                    st.session_state.yaml_generated = yaml_content
-
-                # 4. Renderizar PDF
-                with st.spinner("🎨 Renderizando PDF con RenderCV..."):
-                    logger.info("Renderizando PDF...")
-                    pdf_renderer = PDFRenderer(output_dir="outputs")
-                    pdf_path = pdf_renderer.render_from_string(yaml_content)
-                    st.session_state.pdf_path = pdf_path
-
-                # 5. Guardar en Historial
-                with st.spinner("💾 Guardando en historial..."):
-                    logger.info("Guardando en historial...")
-                    db = CVDatabase()
-                    db.save_cv(
-                        job_title="CV Generado",  # TODO: Extraer título real
-                        yaml_content=yaml_content,
-                        company="N/A",
-                        language=lang_code,
-                        theme=st.session_state.selected_theme,
-                        pdf_path=pdf_path,
-                        original_cv=st.session_state.cv_text,
-                        job_description=st.session_state.job_description,
-                    )
+                # 5. Guardar en Historial (en segundo plano, sin bloquear el resultado)
+                logger.info("Guardando en historial...")
+                _get_background_executor().submit(
+                    _save_cv_to_history,
+                    job_title="CV Generado",  # TODO: Extraer título real
+                    yaml_content=yaml_content,
+                    company="N/A",
+                    language=lang_code,
+                    theme=st.session_state.selected_theme,
+                    pdf_path=pdf_path,
+                    original_cv=st.session_state.cv_text,
+                    job_description=st.session_state.job_description,
+                )
 
                 logger.info("CV generado exitosamente")
                 st.success("✅ ¡CV Generado exitosamente!")
@@ -1543,6 +1744,9 @@ elif st.session_state.current_step == 3:
                 st.rerun()
 
             except Exception as e:
+                # Un future terminado con error no se reutiliza al reintentar
+                if not isinstance(e, concurrent.futures.TimeoutError):
+                    st.session_state.pop("cv_future", None)
                 logger.error(f"Error durante la generación de CV: {e}", exc_info=True)
                 st.error(f"❌ Error durante la generación: {str(e)}")
                 st.info("Intenta nuevamente. Si el error persiste, verifica tus inputs.")
@@ -1572,9 +1776,18 @@ elif st.session_state.current_step == 3:
             with col2:
                 st.subheader("📄 PDF Visual")
                 if st.session_state.pdf_path:
-                    # Leer PDF binario para descarga
-                    with open(st.session_state.pdf_path, "rb") as f:
-                        pdf_bytes = f.read()
+                    # Leer y codificar el PDF una sola vez por archivo (no en cada rerun)
+                    preview = st.session_state.pdf_preview
+                    if preview is None or preview[0] != st.session_state.pdf_path:
+                        with open(st.session_state.pdf_path, "rb") as f:
+                            pdf_bytes = f.read()
+                        preview = (
+                            st.session_state.pdf_path,
+                            pdf_bytes,
+                            base64.b64encode(pdf_bytes).decode("ascii"),
+                        )
+                        st.session_state.pdf_preview = preview
+                    _, pdf_bytes, base64_pdf = preview
 
                     st.download_button(
                         "📥 Descargar PDF",
@@ -1586,9 +1799,6 @@ elif st.session_state.current_step == 3:
                     )
 
                     # Iframe preview (trick para mostrar PDF)
-                    import base64
-
-                    base64_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
                     pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="600" type="application/pdf"></iframe>'
                     st.markdown(pdf_display, unsafe_allow_html=True)
 
@@ -1607,8 +1817,7 @@ elif st.session_state.current_step == 3:
                 if st.button(
                     "🔄 Generar Otro CV (Reiniciar)", type="secondary", use_container_width=True
                 ):
-                    for key in list(st.session_state.keys()):
-                        del st.session_state[key]
+                    _reset_app_state()
                     st.rerun()
 
 # TAB 5: ASISTENTE DE ENTREVISTA
@@ -1636,16 +1845,15 @@ elif st.session_state.current_step == 4:
         uploaded_file_quick = st.file_uploader(
             "Sube tu CV (PDF) rápidamente:", type=["pdf"], key="quick_uploader"
         )
-        if uploaded_file_quick:
+        quick_file_hash = _hash_upload(uploaded_file_quick) if uploaded_file_quick else None
+        # Solo procesar si el archivo cambió (evita re-extraer y re-ejecutar en cada rerun)
+        if uploaded_file_quick and quick_file_hash != st.session_state.last_uploaded_file_hash:
             with st.spinner("Procesando..."):
                 try:
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                        tmp_file.write(uploaded_file_quick.getvalue())
-                        tmp_path = tmp_file.name
-                    parser = CVParser()
-                    cv_data = parser.parse_pdf(tmp_path)
-                    st.session_state.cv_text = cv_data.raw_text
-                    Path(tmp_path).unlink()
+                    st.session_state.cv_text = _extract_cv_text(
+                        quick_file_hash, uploaded_file_quick
+                    )
+                    st.session_state.last_uploaded_file_hash = quick_file_hash
                     st.success("✅ CV cargado. Ya puedes usar el asistente.")
                     st.rerun()
                 except Exception as e:
@@ -1702,17 +1910,21 @@ elif st.session_state.current_step == 4:
                     with st.spinner("🧠 Pensando como tú..."):
                         try:
                             # Inicializar componentes
-                            gemini_client = GeminiClient()
+                            gemini_client = _get_gemini_client(_get_user_id())
                             db = CVDatabase()
-                            proxy = InterviewProxy(gemini_client, db)
-
-                            # Generar respuesta
-                            answer = proxy.answer_question(
-                                question=question_input,
-                                cv_text=st.session_state.cv_text,
-                                job_description=st.session_state.job_description,
-                                tone=selected_tone,
-                            )
+                            proxy = _get_interview_proxy(_get_user_id())
+
+                            # Generar respuesta mostrándola a medida que llega
+                            stream_placeholder = st.empty()
+                            answer = stream_placeholder.write_stream(
+                                proxy.answer_question_stream(
+                                    question=question_input,
+                                    cv_text=st.session_state.cv_text,
+                                    job_description=st.session_state.job_description,
+                                    tone=selected_tone,
+                                )
+                            ).strip()
+                            stream_placeholder.empty()
 
                             # Registrar tokens consumidos
                             _record_token_usage(gemini_client, "interview_answer")
@@ -1753,7 +1965,9 @@ elif st.session_state.current_step == 4:
             st.subheader("📚 Historial Reciente")
             try:
                 db = CVDatabase()
-                sessions = db.get_interview_sessions(limit=10)
+                sessions = db.get_interview_sessions(
+                    limit=10, columns="id, created_at, question, generated_answer"
+                )
                 if not sessions:
                     st.caption("No hay preguntas recientes.")
 
@@ -1766,8 +1980,7 @@ elif st.session_state.current_step == 4:
 
         st.divider()
         if st.button("🔄 Generar Otro CV (Reiniciar)", type="secondary"):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            _reset_app_state()
             st.rerun()
 
 # Footer
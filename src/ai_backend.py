@@ -2,23 +2,68 @@
 Backend de IA: Cliente Gemini y Estratega de Carrera.
 """
 
+import asyncio
+import functools
+import json
 import os
+import re
+import sqlite3
+import threading
 import time
+import unicodedata
+from collections.abc import Coroutine, Iterator
 from dataclasses import dataclass
-from typing import Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
 
+import httpx
+import xxhash
 from google import genai
-from google.genai.types import GenerateContentConfig
+from google.genai import errors as genai_errors
+from google.genai.types import CreateCachedContentConfig, GenerateContentConfig, ThinkingConfig
 from dotenv import load_dotenv
 
 from src.logger import get_logger
+from src.prompts import PromptManager
+
+if TYPE_CHECKING:
+    from src.semantic_cache import SemanticCache
 
 # Configurar logger
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
 # Cargar variables de entorno
 load_dotenv()
 
+# Bloques de código en respuestas: ```yaml ... ``` (preferido) o ``` ... ```
+_YAML_FENCE_RE = re.compile(r"```yaml\s*(.*?)(?:```|$)", re.DOTALL)
+_FENCE_RE = re.compile(r"```\s*(.*?)(?:```|$)", re.DOTALL)
+
+# Clasificación de errores para el retry: códigos HTTP de la API de Gemini y,
+# para excepciones genéricas, patrones del mensaje
+_RATE_LIMIT_CODES = frozenset({429})
+_CONNECTION_CODES = frozenset({500, 502, 503, 504})
+_RATE_LIMIT_MSG_RE = re.compile(r"quota|rate|429", re.IGNORECASE)
+_CONNECTION_MSG_RE = re.compile(r"connection|timeout", re.IGNORECASE)
+
+
+def _classify_error(error: Exception) -> str:
+    """Clasifica un error de generación como ``"rate"``, ``"connection"`` u ``"other"``."""
+    if isinstance(error, genai_errors.APIError):
+        if error.code in _RATE_LIMIT_CODES:
+            return "rate"
+        return "connection" if error.code in _CONNECTION_CODES else "other"
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return "connection"
+    message = str(error)
+    if _RATE_LIMIT_MSG_RE.search(message):
+        return "rate"
+    if _CONNECTION_MSG_RE.search(message):
+        return "connection"
+    return "other"
+
 
 @dataclass
 class GeminiResponse:
@@ -50,6 +95,110 @@ class GeminiConnectionError(GeminiClientError):
     pass
 
 
+class ResponseCache:
+    """
+    Cache exacto de respuestas de Gemini persistido en SQLite.
+
+    La key es el xxh3 de 128 bits de (modelo, temperatura, max tokens, instrucción de
+    sistema, prompt), con los textos normalizados (strip + NFC). Pensado para
+    ciclos de desarrollo donde el mismo prompt se repite; se activa pasando
+    una instancia a ``GeminiClient`` o con la variable GEMINI_RESPONSE_CACHE.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: Optional[int] = None):
+        """
+        Abre (o crea) la base SQLite del cache.
+
+        Args:
+            db_path: Ruta del archivo SQLite
+            ttl_seconds: Vigencia de cada entrada; None para no expirar
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        # Una sola conexión compartida entre hilos (generate_batch), serializada con lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, ts INTEGER NOT NULL)"
+            )
+
+    @staticmethod
+    def _normalize(text: Optional[str]) -> str:
+        return unicodedata.normalize("NFC", text.strip()) if text else ""
+
+    @classmethod
+    def make_key(
+        cls,
+        model_name: str,
+        temperature: float,
+        max_output_tokens: int,
+        system_instruction: Optional[str],
+        prompt: str,
+    ) -> str:
+        """Calcula la key (xxh3 de 128 bits) de una petición."""
+        payload = {
+            "m": model_name,
+            "t": temperature,
+            "mo": max_output_tokens,
+            "s": cls._normalize(system_instruction),
+            "p": cls._normalize(prompt),
+        }
+        return xxhash.xxh3_128_hexdigest(
+            json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Devuelve el texto cacheado para ``key`` o None si no existe o expiró."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, ts FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        text, ts = row
+        if self.ttl_seconds is not None and time.time() - ts > self.ttl_seconds:
+            return None
+        return text
+
+    def set(self, key: str, text: str) -> None:
+        """Guarda (o reemplaza) el texto para ``key``."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, text, ts) VALUES (?, ?, ?)",
+                (key, text, int(time.time())),
+            )
+
+
+# Event loop de fondo para los lotes asíncronos. El cliente ``aio`` de
+# google.genai (compartido por API key) guarda conexiones atadas al loop donde
+# se abrieron: con un ``asyncio.run`` por lote, el segundo lote reutiliza
+# conexiones de un loop ya cerrado ("Event loop is closed").
+_background_loop: asyncio.AbstractEventLoop | None = None
+_background_loop_lock = threading.Lock()
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Ejecuta ``coro`` en el event loop de fondo del proceso y espera su resultado.
+
+    El loop vive en un hilo daemon propio y se crea la primera vez; así todas
+    las llamadas ``aio`` comparten un único loop. No debe llamarse desde una
+    corrutina que ya corre en ese loop.
+    """
+    global _background_loop
+    if _background_loop is None:
+        with _background_loop_lock:
+            if _background_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="gemini-aio", daemon=True
+                ).start()
+                _background_loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop).result()
+
+
 class GeminiClient:
     """
     Cliente base para interactuar con Gemini AI usando la nueva API google.genai.
@@ -62,12 +211,31 @@ class GeminiClient:
     RETRY_DELAY = 2  # segundos
     BACKOFF_MULTIPLIER = 2
 
+    # Clientes google.genai compartidos por API key (sesiones HTTP reutilizadas
+    # entre instancias de GeminiClient, p. ej. entre usuarios o reruns)
+    _clients: dict[str, genai.Client] = {}
+    _clients_lock = threading.Lock()
+
+    # Llamadas simultáneas en generate_batch (cada una conserva su propio backoff)
+    BATCH_MAX_WORKERS = 8
+
+    # Instrucciones de sistema desde este tamaño se suben como contexto cacheado
+    # (Gemini exige un mínimo de ~1024 tokens para el caching explícito)
+    CONTEXT_CACHE_MIN_CHARS = 4096
+    CONTEXT_CACHE_TTL = 300  # segundos
+
+    # Modelo barato y sin razonamiento para confirmar hits de la zona gris del
+    # cache semántico (un modelo "thinking" gasta el límite de salida pensando)
+    SEMANTIC_VERIFY_MODEL = "gemini-2.5-flash-lite"
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         model_name: str = "gemini-3-flash-preview",
         temperature: float = 0.7,
         max_output_tokens: int = 8192,
+        response_cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional["SemanticCache"] = None,
     ):
         """
         Inicializa el cliente de Gemini.
@@ -77,6 +245,11 @@ class GeminiClient:
             model_name: Nombre del modelo a usar (gemini-2.0-flash-thinking-exp-1219 recomendado)
             temperature: Control de aleatoriedad (0.0-1.0)
             max_output_tokens: Máximo de tokens en la respuesta
+            response_cache: Cache exacto de respuestas. Si no se proporciona y existe
+                GEMINI_RESPONSE_CACHE, se usa un ResponseCache en esa ruta
+            semantic_cache: Cache semántico de respuestas (opcional). Solo lo usan las
+                llamadas con ``semantic=True``; debe ser propio de un usuario, porque
+                devuelve respuestas generadas para otros prompts
 
         Raises:
             GeminiClientError: Si no se encuentra la API key o hay error de configuración
@@ -93,19 +266,34 @@ class GeminiClient:
         self.temperature = temperature
         self.max_output_tokens = max_output_tokens
 
+        cache_path = os.getenv("GEMINI_RESPONSE_CACHE")
+        self.response_cache = response_cache or (ResponseCache(cache_path) if cache_path else None)
+        self.semantic_cache = semantic_cache
+
         # Acumulador de tokens para tracking
         self._usage_log: list[tuple[int, int]] = []
 
-        # Configurar cliente con nueva API
+        # Contextos cacheados en Gemini: xxh3(system_instruction) -> (nombre, expira)
+        self._context_caches: dict[str, tuple[Optional[str], float]] = {}
+        self._context_lock = threading.Lock()
+
+        # Configurar cliente con nueva API (uno por API key en todo el proceso)
         try:
-            self.client = genai.Client(api_key=self.api_key)
+            with GeminiClient._clients_lock:
+                if self.api_key not in GeminiClient._clients:
+                    GeminiClient._clients[self.api_key] = genai.Client(api_key=self.api_key)
+                self.client = GeminiClient._clients[self.api_key]
             logger.info(f"Cliente Gemini inicializado. Modelo: {model_name}")
         except Exception as e:
             logger.error(f"Error al configurar Gemini: {e}", exc_info=True)
             raise GeminiConnectionError(f"Error al configurar Gemini: {str(e)}")
 
     def generate(
-        self, prompt: str, system_instruction: Optional[str] = None, retry: bool = True
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        retry: bool = True,
+        semantic: bool = False,
     ) -> GeminiResponse:
         """
         Genera contenido usando Gemini con manejo de errores y retry logic.
@@ -114,106 +302,390 @@ class GeminiClient:
             prompt: Prompt para el modelo
             system_instruction: Instrucción de sistema opcional
             retry: Si debe reintentar en caso de rate limit
+            semantic: Si puede usar el cache semántico (solo prompts que entran
+                completos en el embedder)
 
         Returns:
             GeminiResponse con el resultado
         """
-        # Construir el contenido
-        contents = []
-        if system_instruction:
-            contents.append(system_instruction + "\n\n")
-        contents.append(prompt)
-
-        full_prompt = "".join(contents)
+        cached, cache_key, semantic_scope = self._lookup_caches(
+            prompt, system_instruction, semantic
+        )
+        if cached is not None:
+            return cached
 
+        config = self._build_config(system_instruction)
         last_error = None
 
         for attempt in range(self.MAX_RETRIES if retry else 1):
             try:
                 logger.debug(f"Generando contenido (intento {attempt + 1})")
 
-                # Configuración de generación
-                config = GenerateContentConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_output_tokens,
-                )
-
                 # Generar contenido con nueva API
                 response = self.client.models.generate_content(
-                    model=self.model_name, contents=full_prompt, config=config
-                )
-
-                # Extraer texto de la respuesta
-                if not response or not response.text:
-                    logger.warning("Respuesta vacía del modelo")
-                    return GeminiResponse(
-                        text="", success=False, error="Respuesta vacía del modelo"
-                    )
-
-                # Extraer usage_metadata (tokens consumidos)
-                in_tokens = 0
-                out_tokens = 0
-                try:
-                    if hasattr(response, "usage_metadata") and response.usage_metadata:
-                        in_tokens = getattr(response.usage_metadata, "prompt_token_count", 0) or 0
-                        out_tokens = (
-                            getattr(response.usage_metadata, "candidates_token_count", 0) or 0
-                        )
-                        logger.debug(f"Tokens: input={in_tokens}, output={out_tokens}")
-                    else:
-                        logger.warning("usage_metadata no disponible en la respuesta")
-                except Exception as meta_err:
-                    logger.warning(f"Error leyendo usage_metadata: {meta_err}")
-
-                logger.info("Contenido generado exitosamente")
-                result = GeminiResponse(
-                    text=response.text,
-                    success=True,
-                    model_used=self.model_name,
-                    input_tokens=in_tokens,
-                    output_tokens=out_tokens,
+                    model=self.model_name, contents=prompt, config=config
                 )
-                # Acumular tokens para tracking
-                if in_tokens or out_tokens:
-                    self._usage_log.append((in_tokens, out_tokens))
-                return result
+                return self._build_response(response, prompt, cache_key, semantic_scope)
 
             except Exception as e:
-                error_msg = str(e).lower()
-                logger.warning(f"Error en intento {attempt + 1}: {e}")
+                last_error, delay = self._handle_error(e, attempt, retry)
+                if delay is not None:
+                    time.sleep(delay)
+                    continue
 
-                # Detectar rate limit
-                if "quota" in error_msg or "rate" in error_msg or "429" in error_msg:
-                    last_error = GeminiRateLimitError(f"Rate limit excedido: {str(e)}")
+                # Si no reintentar, salir del loop
+                if not retry:
+                    break
 
-                    if retry and attempt < self.MAX_RETRIES - 1:
-                        delay = self.RETRY_DELAY * (self.BACKOFF_MULTIPLIER**attempt)
-                        logger.info(f"Rate limit. Esperando {delay}s...")
-                        time.sleep(delay)
-                        continue
+        # Si llegamos aquí, todos los reintentos fallaron
+        logger.error("Todos los intentos de generación fallaron")
+        return GeminiResponse(text="", success=False, error=str(last_error))
 
-                # Otros errores de conexión
-                elif "connection" in error_msg or "timeout" in error_msg:
-                    last_error = GeminiConnectionError(f"Error de conexión: {str(e)}")
+    async def agenerate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        retry: bool = True,
+        semantic: bool = False,
+    ) -> GeminiResponse:
+        """
+        Versión asíncrona de ``generate`` sobre el cliente ``aio`` de google.genai.
 
-                    if retry and attempt < self.MAX_RETRIES - 1:
-                        logger.info(f"Error de conexión. Reintentando en {self.RETRY_DELAY}s...")
-                        time.sleep(self.RETRY_DELAY)
-                        continue
+        El backoff usa ``asyncio.sleep``, así una espera por rate limit no ocupa
+        un hilo y otras llamadas del mismo event loop siguen avanzando. Los
+        caches (SQLite, embedder, verificación) y la creación del contexto
+        cacheado son bloqueantes y corren en ``asyncio.to_thread``.
 
-                # Error general
-                else:
-                    last_error = GeminiClientError(f"Error en Gemini: {str(e)}")
-                    logger.error(f"Error no recuperable: {e}", exc_info=True)
+        Args:
+            prompt: Prompt para el modelo
+            system_instruction: Instrucción de sistema opcional
+            retry: Si debe reintentar en caso de rate limit
+            semantic: Si puede usar el cache semántico
+
+        Returns:
+            GeminiResponse con el resultado
+        """
+        cached, cache_key, semantic_scope = await asyncio.to_thread(
+            self._lookup_caches, prompt, system_instruction, semantic
+        )
+        if cached is not None:
+            return cached
+
+        config = await asyncio.to_thread(self._build_config, system_instruction)
+        last_error = None
+
+        for attempt in range(self.MAX_RETRIES if retry else 1):
+            try:
+                logger.debug(f"Generando contenido async (intento {attempt + 1})")
+
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name, contents=prompt, config=config
+                )
+                return await asyncio.to_thread(
+                    self._build_response, response, prompt, cache_key, semantic_scope
+                )
+
+            except Exception as e:
+                last_error, delay = self._handle_error(e, attempt, retry)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
 
-                # Si no reintentar, salir del loop
                 if not retry:
                     break
 
-        # Si llegamos aquí, todos los reintentos fallaron
         logger.error("Todos los intentos de generación fallaron")
         return GeminiResponse(text="", success=False, error=str(last_error))
 
+    def _lookup_caches(
+        self, prompt: str, system_instruction: Optional[str], semantic: bool
+    ) -> tuple[Optional[GeminiResponse], Optional[str], Optional[str]]:
+        """
+        Busca la respuesta en el cache exacto y luego en el semántico.
+
+        Returns:
+            Tupla (respuesta cacheada o None, key del cache exacto, scope semántico
+            o None si la llamada no usa el cache semántico)
+        """
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = ResponseCache.make_key(
+                self.model_name,
+                self.temperature,
+                self.max_output_tokens,
+                system_instruction,
+                prompt,
+            )
+            cached_text = self.response_cache.get(cache_key)
+            if cached_text is not None:
+                logger.debug("Respuesta servida desde el cache")
+                cached = GeminiResponse(text=cached_text, success=True, model_used=self.model_name)
+                return cached, cache_key, None
+
+        # Solo prompts marcados como semánticos y que el embedder ve completos
+        # (truncado, un prompt largo se confunde con otro que solo difiere al final)
+        if self.semantic_cache is None or not semantic or not self.semantic_cache.fits(prompt):
+            return None, cache_key, None
+
+        # Solo se reutilizan respuestas generadas con el mismo modelo, configuración y sistema
+        semantic_scope = (
+            f"{self.model_name}|{self.temperature}|{self.max_output_tokens}|"
+            f"{system_instruction or ''}"
+        )
+        cached_text = self.semantic_cache.lookup(
+            prompt, scope=semantic_scope, verify=self._confirm_equivalent
+        )
+        if cached_text is not None:
+            logger.debug("Respuesta servida desde el cache semántico")
+            cached = GeminiResponse(text=cached_text, success=True, model_used=self.model_name)
+            return cached, cache_key, semantic_scope
+
+        return None, cache_key, semantic_scope
+
+    def _build_config(self, system_instruction: Optional[str]) -> GenerateContentConfig:
+        """Configuración de generación con la instrucción de sistema (o su contexto cacheado)."""
+        # La instrucción de sistema va en la config (prefijo estable y cacheable);
+        # si es grande se referencia como contexto cacheado en vez de reenviarla
+        cached_content = (
+            self._get_cached_context(system_instruction) if system_instruction else None
+        )
+        return GenerateContentConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_output_tokens,
+            system_instruction=None if cached_content else system_instruction,
+            cached_content=cached_content,
+        )
+
+    def _build_response(
+        self, response, prompt: str, cache_key: Optional[str], semantic_scope: Optional[str]
+    ) -> GeminiResponse:
+        """Convierte la respuesta de la API, registra tokens y alimenta los caches."""
+        # Extraer texto de la respuesta
+        if not response or not response.text:
+            logger.warning("Respuesta vacía del modelo")
+            return GeminiResponse(text="", success=False, error="Respuesta vacía del modelo")
+
+        # Extraer usage_metadata (tokens consumidos)
+        in_tokens = 0
+        out_tokens = 0
+        try:
+            if hasattr(response, "usage_metadata") and response.usage_metadata:
+                in_tokens = getattr(response.usage_metadata, "prompt_token_count", 0) or 0
+                out_tokens = getattr(response.usage_metadata, "candidates_token_count", 0) or 0
+                logger.debug(f"Tokens: input={in_tokens}, output={out_tokens}")
+            else:
+                logger.warning("usage_metadata no disponible en la respuesta")
+        except Exception as meta_err:
+            logger.warning(f"Error leyendo usage_metadata: {meta_err}")
+
+        logger.info("Contenido generado exitosamente")
+        result = GeminiResponse(
+            text=response.text,
+            success=True,
+            model_used=self.model_name,
+            input_tokens=in_tokens,
+            output_tokens=out_tokens,
+        )
+        # Acumular tokens para tracking
+        if in_tokens or out_tokens:
+            self._usage_log.append((in_tokens, out_tokens))
+        if cache_key is not None:
+            self.response_cache.set(cache_key, response.text)
+        if semantic_scope is not None:
+            self.semantic_cache.add(prompt, response.text, scope=semantic_scope)
+        return result
+
+    def _handle_error(
+        self, error: Exception, attempt: int, retry: bool
+    ) -> tuple[GeminiClientError, Optional[float]]:
+        """
+        Traduce un error de la API y decide el backoff.
+
+        Returns:
+            Tupla (error para reportar, segundos a esperar antes de reintentar
+            o None si no corresponde esperar)
+        """
+        error_kind = _classify_error(error)
+        logger.warning(f"Error en intento {attempt + 1}: {error}")
+        can_retry = retry and attempt < self.MAX_RETRIES - 1
+
+        # Detectar rate limit
+        if error_kind == "rate":
+            delay = self.RETRY_DELAY * (self.BACKOFF_MULTIPLIER**attempt)
+            if can_retry:
+                logger.info(f"Rate limit. Esperando {delay}s...")
+            return GeminiRateLimitError(f"Rate limit excedido: {str(error)}"), (
+                delay if can_retry else None
+            )
+
+        # Otros errores de conexión
+        if error_kind == "connection":
+            if can_retry:
+                logger.info(f"Error de conexión. Reintentando en {self.RETRY_DELAY}s...")
+            return GeminiConnectionError(f"Error de conexión: {str(error)}"), (
+                self.RETRY_DELAY if can_retry else None
+            )
+
+        # Error general
+        logger.error(f"Error no recuperable: {error}", exc_info=True)
+        return GeminiClientError(f"Error en Gemini: {str(error)}"), None
+
+    def generate_stream(
+        self, prompt: str, system_instruction: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Genera contenido en streaming, entregando el texto a medida que llega.
+
+        A diferencia de ``generate`` no reintenta ni usa los caches de respuestas:
+        está pensado para mostrar la respuesta progresivamente en la UI.
+
+        Args:
+            prompt: Prompt para el modelo
+            system_instruction: Instrucción de sistema opcional
+
+        Yields:
+            Fragmentos de texto de la respuesta
+
+        Raises:
+            GeminiClientError: Si la generación falla
+        """
+        cached_content = (
+            self._get_cached_context(system_instruction) if system_instruction else None
+        )
+        config = GenerateContentConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_output_tokens,
+            system_instruction=None if cached_content else system_instruction,
+            cached_content=cached_content,
+        )
+
+        in_tokens = 0
+        out_tokens = 0
+        try:
+            for chunk in self.client.models.generate_content_stream(
+                model=self.model_name, contents=prompt, config=config
+            ):
+                # El último fragmento trae el conteo acumulado de tokens
+                usage = getattr(chunk, "usage_metadata", None)
+                if usage:
+                    in_tokens = getattr(usage, "prompt_token_count", 0) or 0
+                    out_tokens = getattr(usage, "candidates_token_count", 0) or 0
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Error en streaming de Gemini: {e}", exc_info=True)
+            raise GeminiClientError(f"Error en Gemini: {str(e)}") from e
+
+        if in_tokens or out_tokens:
+            self._usage_log.append((in_tokens, out_tokens))
+
+    def _get_cached_context(self, system_instruction: str) -> Optional[str]:
+        """
+        Devuelve el nombre del contexto cacheado en Gemini para la instrucción de sistema.
+
+        Se crea la primera vez que se ve la instrucción y se reutiliza hasta que
+        expira. Si es muy corta o Gemini rechaza el cache, devuelve None y la
+        instrucción se envía normalmente (el resultado también se recuerda).
+
+        Args:
+            system_instruction: Instrucción de sistema completa
+
+        Returns:
+            Nombre del cached content o None
+        """
+        if len(system_instruction) < self.CONTEXT_CACHE_MIN_CHARS:
+            return None
+
+        key = xxhash.xxh3_128_hexdigest(system_instruction.encode())
+        now = time.time()
+        with self._context_lock:
+            entry = self._context_caches.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+
+        try:
+            cache = self.client.caches.create(
+                model=self.model_name,
+                config=CreateCachedContentConfig(
+                    system_instruction=system_instruction,
+                    ttl=f"{self.CONTEXT_CACHE_TTL}s",
+                ),
+            )
+            name = cache.name
+            logger.info(f"Contexto cacheado en Gemini: {name}")
+        except Exception as e:
+            logger.warning(f"No se pudo cachear la instrucción de sistema: {e}")
+            name = None
+
+        # Margen para no referenciar un cache que expira durante la llamada
+        with self._context_lock:
+            self._context_caches[key] = (name, now + self.CONTEXT_CACHE_TTL - 30)
+        return name
+
+    def _confirm_equivalent(self, prompt: str, cached_prompt: str) -> bool:
+        """Confirma con una llamada corta (temperatura 0) un hit en la zona gris."""
+        try:
+            response = self.client.models.generate_content(
+                model=self.SEMANTIC_VERIFY_MODEL,
+                contents=PromptManager.get_prompt_equivalence_prompt(cached_prompt, prompt),
+                config=GenerateContentConfig(
+                    temperature=0.0,
+                    max_output_tokens=4,
+                    thinking_config=ThinkingConfig(thinking_budget=0),
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo verificar el hit semántico: {e}")
+            return False
+
+        # La verificación también cuenta para los límites de tokens del usuario
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            in_tokens = getattr(usage, "prompt_token_count", 0) or 0
+            out_tokens = getattr(usage, "candidates_token_count", 0) or 0
+            if in_tokens or out_tokens:
+                self._usage_log.append((in_tokens, out_tokens))
+        return bool(response and response.text) and response.text.strip().upper().startswith("SI")
+
+    def generate_batch(
+        self, prompts: list[str], max_workers: Optional[int] = None, semantic: bool = False
+    ) -> list[GeminiResponse]:
+        """
+        Genera varias respuestas independientes en un solo lote.
+
+        Los prompts se envían concurrentemente con ``agenerate`` en el event loop
+        de fondo (``run_coroutine``, cada uno con su propio retry), de modo que el
+        lote tarda lo que la llamada más lenta y no la suma de todas. Desde una
+        corrutina se usa ``agenerate`` directamente.
+
+        Args:
+            prompts: Prompts independientes entre sí
+            max_workers: Máximo de llamadas simultáneas (por defecto BATCH_MAX_WORKERS)
+            semantic: Si los prompts pueden usar el cache semántico
+
+        Returns:
+            Lista de GeminiResponse en el mismo orden que ``prompts``
+        """
+        if not prompts:
+            return []
+
+        logger.info(f"Generando lote de {len(prompts)} prompts")
+        return run_coroutine(
+            self._agenerate_batch(prompts, max_workers or self.BATCH_MAX_WORKERS, semantic)
+        )
+
+    async def _agenerate_batch(
+        self, prompts: list[str], limit: int, semantic: bool = False
+    ) -> list[GeminiResponse]:
+        """Ejecuta ``agenerate`` para todos los prompts con a lo sumo ``limit`` en vuelo."""
+        semaphore = asyncio.Semaphore(limit)
+
+        async def bounded(prompt: str) -> GeminiResponse:
+            async with semaphore:
+                return await self.agenerate(prompt, semantic=semantic)
+
+        return list(await asyncio.gather(*(bounded(prompt) for prompt in prompts)))
+
     def generate_content(self, prompt: str) -> str:
         """
         Alias de generate() que retorna solo el texto para compatibilidad.
@@ -233,9 +705,11 @@ class GeminiClient:
         Returns:
             Tupla (total_input_tokens, total_output_tokens).
         """
-        total_in = sum(i for i, _ in self._usage_log)
-        total_out = sum(o for _, o in self._usage_log)
-        self._usage_log.clear()
+        # Intercambiar la lista antes de sumar: el cliente se reutiliza entre
+        # reruns y un generate() concurrente no debe perderse entre sum y clear.
+        usage_log, self._usage_log = self._usage_log, []
+        total_in = sum(i for i, _ in usage_log)
+        total_out = sum(o for _, o in usage_log)
         return total_in, total_out
 
     def test_connection(self) -> bool:
@@ -252,25 +726,10 @@ class GeminiClient:
             return False
 
 
-class CareerStrategist:
-    """
-    Estratega de carrera impulsado por Gemini.
-
-    Implementa la lógica del protocolo de Gap Analysis para generación de CVs.
-    """
-
-    def __init__(self, client: Optional[GeminiClient] = None):
-        """
-        Inicializa el estratega de carrera.
-
-        Args:
-            client: Cliente de Gemini opcional. Si no se proporciona, crea uno nuevo.
-        """
-        self.client = client or GeminiClient()
-
-    def _build_system_prompt(self, yaml_template: str) -> str:
-        """Construye el prompt del sistema con el template YAML."""
-        return f"""Eres un **Estratega de Carrera Senior** y experto en **RenderCV**. 
+@functools.lru_cache(maxsize=32)
+def _build_system_prompt(yaml_template: str) -> str:
+    """Construye el prompt del sistema con el template YAML (memoizado por template)."""
+    return f"""Eres un **Estratega de Carrera Senior** y experto en **RenderCV**. 
 Tu objetivo es crear la hoja de vida perfecta en formato YAML, pero tu prioridad es 
 asegurarte de que el usuario demuestre su máxima compatibilidad con la vacante.
 
@@ -329,6 +788,23 @@ El YAML debe estar envuelto en marcadores para facilitar su extracción:
 IMPORTANTE: Genera el YAML en el idioma especificado por el usuario.
 """
 
+
+class CareerStrategist:
+    """
+    Estratega de carrera impulsado por Gemini.
+
+    Implementa la lógica del protocolo de Gap Analysis para generación de CVs.
+    """
+
+    def __init__(self, client: Optional[GeminiClient] = None):
+        """
+        Inicializa el estratega de carrera.
+
+        Args:
+            client: Cliente de Gemini opcional. Si no se proporciona, crea uno nuevo.
+        """
+        self.client = client or GeminiClient()
+
     def analyze_gap(
         self, cv_text: str, job_description: str, language: str = "es"
     ) -> GeminiResponse:
@@ -346,7 +822,7 @@ IMPORTANTE: Genera el YAML en el idioma especificado por el usuario.
         # Template simplificado para el análisis inicial
         simple_template = "cv:\\n  name: John Doe\\n  # ... estructura básica"
 
-        system_prompt = self._build_system_prompt(simple_template)
+        system_prompt = _build_system_prompt(simple_template)
 
         user_prompt = f"""
 **Idioma objetivo:** {language}
@@ -384,7 +860,7 @@ vacante que no aparecen en mi CV y hazme preguntas específicas sobre ellas.
         Returns:
             GeminiResponse con el YAML generado
         """
-        system_prompt = self._build_system_prompt(yaml_template)
+        system_prompt = _build_system_prompt(yaml_template)
 
         user_prompt = f"""
 **Idioma objetivo:** {language}
@@ -420,18 +896,9 @@ en la narrativa de mi experiencia laboral. Recuerda respetar el template proporc
         Returns:
             Contenido YAML limpio
         """
-        # Buscar bloques de código YAML
-        if "```yaml" in text:
-            start = text.find("```yaml") + 7
-            end = text.find("```", start)
-            return text[start:end].strip()
-        elif "```" in text:
-            start = text.find("```") + 3
-            end = text.find("```", start)
-            return text[start:end].strip()
-        else:
-            # Si no hay marcadores, devolver todo
-            return text.strip()
+        # Buscar bloques de código YAML; si no hay marcadores, devolver todo
+        match = _YAML_FENCE_RE.search(text) or _FENCE_RE.search(text)
+        return (match.group(1) if match else text).strip()
 
     def continue_conversation(
         self, conversation_history: list[dict[str, str]], yaml_template: str
@@ -446,12 +913,12 @@ en la narrativa de mi experiencia laboral. Recuerda respetar el template proporc
         Returns:
             GeminiResponse con la respuesta de la IA
         """
-        system_prompt = self._build_system_prompt(yaml_template)
+        system_prompt = _build_system_prompt(yaml_template)
 
-        # Construir el historial de chat
-        full_prompt = system_prompt + "\\n\\n"
-        for msg in conversation_history:
-            role = "Usuario" if msg["role"] == "user" else "Asistente"
-            full_prompt += f"{role}: {msg['text']}\\n\\n"
+        # Construir el historial de chat (el prompt del sistema va aparte para cachearse)
+        full_prompt = "\n\n".join(
+            f"{'Usuario' if msg['role'] == 'user' else 'Asistente'}: {msg['text']}"
+            for msg in conversation_history
+        )
 
-        return self.client.generate(full_prompt, retry=True)
+        return self.client.generate(full_prompt, system_instruction=system_prompt, retry=True)
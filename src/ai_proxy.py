@@ -1,64 +1,354 @@
 """
 Módulo AI Proxy: Asistente inteligente para entrevistas y postulaciones.
 """
-from src.ai_backend import GeminiClient
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Optional
+
+import xxhash
+
+from src.ai_backend import GeminiClient, run_coroutine
 from src.database import CVDatabase
 from src.prompts import PromptManager
 from src.logger import get_logger
 
+if TYPE_CHECKING:
+    from src.semantic_cache import SemanticCache
+
 logger = get_logger(__name__)
 
+# Umbrales del cache semántico de preguntas: por encima de HIT se reutiliza la
+# respuesta; entre VERIFY y HIT (zona gris) se vuelve a generar con el LLM
+INTERVIEW_CACHE_HIT_THRESHOLD = 0.92
+INTERVIEW_CACHE_VERIFY_THRESHOLD = 0.80
+
+
+def _digest(text: str) -> str:
+    """Hash no criptográfico (xxh3 de 128 bits) para keys de cache."""
+    return xxhash.xxh3_128_hexdigest(text.encode("utf-8"))
+
+
 class InterviewProxy:
     """Actúa como proxy del usuario para responder preguntas de entrevista."""
 
-    def __init__(self, ai_client: GeminiClient, db: CVDatabase):
+    # Segundos que se reutiliza la memoria de skills leída de la base de datos
+    SKILL_MEMORY_TTL = 30
+
+    # Cache exacto de respuestas: LRU acotado con vigencia (el proxy vive
+    # todo el proceso y cada pregunta × estado de skills es una entrada nueva)
+    ANSWER_CACHE_TTL = 3600  # segundos
+    ANSWER_CACHE_MAXSIZE = 256
+
+    def __init__(
+        self,
+        ai_client: GeminiClient,
+        db: CVDatabase,
+        semantic_cache: Optional["SemanticCache"] = None,
+    ):
+        """
+        Args:
+            ai_client: Cliente de Gemini
+            db: Base de datos (memoria de skills)
+            semantic_cache: Cache semántico de preguntas (opcional). Se consulta con
+                el texto de la pregunta dentro del contexto (CV, vacante, skills, tono)
+        """
         self.ai_client = ai_client
         self.db = db
+        self.semantic_cache = semantic_cache
+
+        # Cache exacto: xxh3(prompt) -> (instante de guardado, respuesta)
+        self._answer_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Memoria de skills ya formateada: (instante de lectura, generación del
+        # cache de CVDatabase, skills, texto para el prompt)
+        self._skill_context: Optional[tuple[float, int, dict[str, str], str]] = None
+
+    def invalidate_skill_memory(self) -> None:
+        """Fuerza releer la memoria de skills.
+
+        Los guardados y borrados de skills vía CVDatabase ya la invalidan (cambia
+        ``CVDatabase.cache_generation()``); esto es para cambios hechos por fuera.
+        """
+        self._skill_context = None
 
-    def answer_question(self, 
-                       question: str, 
-                       cv_text: str, 
-                       job_description: str, 
+    def answer_question(self,
+                       question: str,
+                       cv_text: str,
+                       job_description: str,
                        user_name: str = "Candidato",
                        tone: str = "Profesional") -> str:
         """
         Genera una respuesta a una pregunta de entrevista utilizando el contexto del usuario.
-        
+
+        Las respuestas se reutilizan si el prompt es idéntico o, con cache semántico,
+        si la pregunta es casi equivalente a otra ya respondida en el mismo contexto.
+
         Args:
             question: La pregunta a responder.
             cv_text: El texto del CV del usuario.
             job_description: La descripción de la vacante.
             user_name: Nombre del usuario (para el prompt).
             tone: Tono deseado (Profesional, Entusiasta, Conciso, etc.).
-            
+
         Returns:
             La respuesta generada por la IA.
         """
         try:
-            # 1. Obtener contexto de memoria de skills (información confirmada por el usuario)
-            skill_memory = self.db.get_all_skill_answers()
-            skill_context_str = ""
-            if skill_memory:
-                skill_context_str = "\n".join([f"- **{k.title()}:** {v}" for k,v in skill_memory.items()])
-            else:
-                skill_context_str = "No hay detalles específicos de habilidades confirmadas previamente."
-            
-            # 2. Construir prompt
-            prompt = PromptManager.get_interview_answer_prompt(
-                user_name=user_name,
-                cv_context=cv_text,
-                skill_memory_context=skill_context_str,
-                job_description=job_description,
-                question=question,
-                tone=tone
+            prompt, prompt_key, scope = self._build_prompt(
+                question, cv_text, job_description, user_name, tone
             )
-            
+
+            # Buscar en los caches (exacto por prompt, semántico por pregunta)
+            cached = self._lookup_answer(prompt_key, question, scope)
+            if cached is not None:
+                logger.info(f"Respuesta de entrevista servida desde cache: '{question[:30]}...'")
+                return cached
+
             logger.info(f"Generando respuesta de entrevista para: '{question[:30]}...' (Tono: {tone})")
-            
-            # 3. Generar respuesta
+
+            # Generar respuesta
             response = self.ai_client.generate(prompt)
-            return response.text.strip()
-            
+            answer = response.text.strip()
+            self._store_answer(prompt_key, question, scope, answer)
+            return answer
+
+        except Exception as e:
+            logger.error(f"Error generando respuesta de entrevista: {e}", exc_info=True)
+            raise
+
+    def answer_question_stream(self,
+                               question: str,
+                               cv_text: str,
+                               job_description: str,
+                               user_name: str = "Candidato",
+                               tone: str = "Profesional") -> Iterator[str]:
+        """
+        Igual que ``answer_question`` pero entrega la respuesta en fragmentos a
+        medida que el modelo la genera (una respuesta cacheada llega completa).
+
+        Args:
+            question: La pregunta a responder.
+            cv_text: El texto del CV del usuario.
+            job_description: La descripción de la vacante.
+            user_name: Nombre del usuario (para el prompt).
+            tone: Tono deseado (Profesional, Entusiasta, Conciso, etc.).
+
+        Yields:
+            Fragmentos de texto de la respuesta.
+        """
+        try:
+            prompt, prompt_key, scope = self._build_prompt(
+                question, cv_text, job_description, user_name, tone
+            )
+
+            cached = self._lookup_answer(prompt_key, question, scope)
+            if cached is not None:
+                logger.info(f"Respuesta de entrevista servida desde cache: '{question[:30]}...'")
+                yield cached
+                return
+
+            logger.info(f"Generando respuesta de entrevista en streaming: '{question[:30]}...' (Tono: {tone})")
+
+            parts = []
+            for chunk in self.ai_client.generate_stream(prompt):
+                parts.append(chunk)
+                yield chunk
+            self._store_answer(prompt_key, question, scope, "".join(parts).strip())
+
         except Exception as e:
             logger.error(f"Error generando respuesta de entrevista: {e}", exc_info=True)
             raise
+
+    def answer_questions_batch(self,
+                               questions: list[str],
+                               cv_text: str,
+                               job_description: str,
+                               user_name: str = "Candidato",
+                               tone: str = "Profesional") -> list[str]:
+        """
+        Responde varias preguntas de una simulación de entrevista en un solo lote.
+
+        Corre en el event loop de fondo compartido con ``GeminiClient.generate_batch``
+        (``run_coroutine``); desde una corrutina se usa ``aanswer_questions_batch``.
+
+        Returns:
+            Respuestas en el mismo orden que ``questions`` ("" si una falló)
+        """
+        if not questions:
+            return []
+        return run_coroutine(
+            self.aanswer_questions_batch(questions, cv_text, job_description, user_name, tone)
+        )
+
+    async def aanswer_questions_batch(self,
+                                      questions: list[str],
+                                      cv_text: str,
+                                      job_description: str,
+                                      user_name: str = "Candidato",
+                                      tone: str = "Profesional") -> list[str]:
+        """
+        Versión asíncrona de ``answer_questions_batch``.
+
+        Los caches se consultan para todas las preguntas a la vez (un solo
+        llamado al embedder) y las que faltan se generan concurrentemente, con a
+        lo sumo ``GeminiClient.BATCH_MAX_WORKERS`` llamadas en vuelo.
+
+        Args:
+            questions: Preguntas a responder.
+            cv_text: El texto del CV del usuario.
+            job_description: La descripción de la vacante.
+            user_name: Nombre del usuario (para el prompt).
+            tone: Tono deseado (Profesional, Entusiasta, Conciso, etc.).
+
+        Returns:
+            Respuestas en el mismo orden que ``questions`` ("" si una falló)
+        """
+        # La memoria de skills (base de datos) y el embedder son bloqueantes:
+        # corren en un hilo para no frenar el event loop compartido
+        built = await asyncio.to_thread(
+            lambda: [
+                self._build_prompt(question, cv_text, job_description, user_name, tone)
+                for question in questions
+            ]
+        )
+        # Todas las preguntas comparten contexto y, por lo tanto, scope
+        scope = built[0][2] if built else ""
+
+        answers: list[Optional[str]] = [
+            self._get_cached_answer(prompt_key) for _, prompt_key, _ in built
+        ]
+        pending = [i for i, answer in enumerate(answers) if answer is None]
+        if pending and self.semantic_cache is not None:
+            found = await asyncio.to_thread(
+                self.semantic_cache.lookup_many, [questions[i] for i in pending], scope=scope
+            )
+            for i, answer in zip(pending, found, strict=True):
+                answers[i] = answer
+            pending = [i for i in pending if answers[i] is None]
+
+        logger.info(
+            f"Respondiendo lote de {len(questions)} preguntas "
+            f"({len(questions) - len(pending)} desde cache)"
+        )
+        semaphore = asyncio.Semaphore(GeminiClient.BATCH_MAX_WORKERS)
+
+        async def bounded(prompt: str):
+            async with semaphore:
+                return await self.ai_client.agenerate(prompt)
+
+        results = await asyncio.gather(
+            *(bounded(built[i][0]) for i in pending), return_exceptions=True
+        )
+
+        generated_questions, generated_answers = [], []
+        for i, result in zip(pending, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(f"Error generando respuesta de entrevista: {result}")
+                answers[i] = ""
+                continue
+            answers[i] = result.text.strip()
+            if answers[i]:
+                self._set_cached_answer(built[i][1], answers[i])
+                generated_questions.append(questions[i])
+                generated_answers.append(answers[i])
+        if self.semantic_cache is not None and generated_questions:
+            await asyncio.to_thread(
+                self.semantic_cache.add_many, generated_questions, generated_answers, scope=scope
+            )
+
+        return answers
+
+    def _build_prompt(self,
+                      question: str,
+                      cv_text: str,
+                      job_description: str,
+                      user_name: str,
+                      tone: str) -> tuple[str, str, str]:
+        """
+        Construye el prompt de respuesta y sus keys de cache.
+
+        Returns:
+            Tupla (prompt, hash del prompt, scope del cache semántico)
+        """
+        # 1. Obtener contexto de memoria de skills (información confirmada por el usuario)
+        skill_context_str = self._get_skill_context()
+
+        # 2. Construir prompt
+        prompt = PromptManager.get_interview_answer_prompt(
+            user_name=user_name,
+            cv_context=cv_text,
+            skill_memory_context=skill_context_str,
+            job_description=job_description,
+            question=question,
+            tone=tone
+        )
+
+        scope = _digest(
+            "\x1f".join((cv_text, job_description, skill_context_str, user_name, tone))
+        )
+        return prompt, _digest(prompt), scope
+
+    def _get_skill_context(self) -> str:
+        """
+        Memoria de skills formateada para el prompt.
+
+        La lectura de la base de datos se reutiliza durante SKILL_MEMORY_TTL mientras
+        no haya escrituras en CVDatabase, y el texto solo se vuelve a formatear si
+        las skills cambiaron.
+        """
+        now = time.monotonic()
+        generation = self.db.cache_generation()
+        cached = self._skill_context
+        if (
+            cached is not None
+            and now - cached[0] < self.SKILL_MEMORY_TTL
+            and cached[1] == generation
+        ):
+            return cached[3]
+
+        skill_memory = self.db.get_all_skill_answers()
+        if cached is not None and cached[2] == skill_memory:
+            skill_context_str = cached[3]
+        elif skill_memory:
+            skill_context_str = "\n".join(f"- **{k.title()}:** {v}" for k, v in skill_memory.items())
+        else:
+            skill_context_str = "No hay detalles específicos de habilidades confirmadas previamente."
+        self._skill_context = (now, generation, skill_memory, skill_context_str)
+        return skill_context_str
+
+    def _get_cached_answer(self, prompt_key: str) -> Optional[str]:
+        """Respuesta del cache exacto si existe y no expiró."""
+        with self._cache_lock:
+            entry = self._answer_cache.get(prompt_key)
+            if entry is None or time.monotonic() - entry[0] >= self.ANSWER_CACHE_TTL:
+                return None
+            self._answer_cache.move_to_end(prompt_key)
+            return entry[1]
+
+    def _set_cached_answer(self, prompt_key: str, answer: str) -> None:
+        """Guarda en el cache exacto descartando las entradas menos usadas."""
+        with self._cache_lock:
+            self._answer_cache[prompt_key] = (time.monotonic(), answer)
+            self._answer_cache.move_to_end(prompt_key)
+            while len(self._answer_cache) > self.ANSWER_CACHE_MAXSIZE:
+                self._answer_cache.popitem(last=False)
+
+    def _lookup_answer(self, prompt_key: str, question: str, scope: str) -> Optional[str]:
+        """Respuesta cacheada para el prompt exacto o una pregunta equivalente."""
+        cached = self._get_cached_answer(prompt_key)
+        if cached is not None or self.semantic_cache is None:
+            return cached
+        # Sin verify: la zona gris cae al LLM
+        return self.semantic_cache.lookup(question, scope=scope)
+
+    def _store_answer(self, prompt_key: str, question: str, scope: str, answer: str) -> None:
+        """Guarda una respuesta generada en los caches."""
+        if not answer:
+            return
+        self._set_cached_answer(prompt_key, answer)
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(question, answer, scope=scope)
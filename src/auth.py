@@ -6,17 +6,28 @@ Encapsula las operaciones de registro, login, logout y gestion de sesion.
 
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from src.logger import get_logger
-from supabase import Client, create_client
+
+if TYPE_CHECKING:
+    # supabase (postgrest, gotrue, httpx...) tarda ~0.5 s en importarse: se
+    # importa al crear el primer cliente
+    from supabase import Client
 
 logger = get_logger(__name__)
 
+# Hilos para precargar perfiles en segundo plano justo despues del login
+_PROFILE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="profile-prefetch")
+
 
-@dataclass
+@dataclass(slots=True)
 class AuthResult:
     """Resultado de una operacion de autenticacion."""
 
@@ -37,14 +48,27 @@ _ERROR_MESSAGES: dict[str, str] = {
 }
 
 
+# Claves en minusculas calculadas una vez (el mensaje se normaliza una vez por llamada)
+_ERROR_MESSAGES_LOWER: tuple[tuple[str, str], ...] = tuple(
+    (key.lower(), translation) for key, translation in _ERROR_MESSAGES.items()
+)
+
+
 def _translate_error(error_message: str) -> str:
     """Traduce errores de Supabase Auth al espanol."""
-    for key, translation in _ERROR_MESSAGES.items():
-        if key.lower() in error_message.lower():
+    message_lower = error_message.lower()
+    for key_lower, translation in _ERROR_MESSAGES_LOWER:
+        if key_lower in message_lower:
             return translation
     return f"Error de autenticacion: {error_message}"
 
 
+def _user_to_dict(user: Any) -> dict[str, Any]:
+    """Datos publicos de un usuario de Supabase Auth (gotrue ya entrega el id como str)."""
+    user_id = user.id if isinstance(user.id, str) else str(user.id)
+    return {"id": user_id, "email": user.email}
+
+
 class AuthManager:
     """Gestiona la autenticacion de usuarios via Supabase Auth.
 
@@ -53,6 +77,15 @@ class AuthManager:
 
     _client: Client | None = None
 
+    # Perfiles de user_profiles por user_id: (instante de lectura, fila o None).
+    # Compartido entre instancias porque la app crea un AuthManager por chequeo.
+    PROFILE_CACHE_TTL = 30  # segundos
+    _profile_cache: dict[str, tuple[float, dict[str, Any] | None]] = {}
+    _profile_lock = threading.Lock()
+    # Lecturas de perfil lanzadas tras sign_in que aun no se consumieron
+    _profile_futures: dict[str, Future] = {}
+    PROFILE_PREFETCH_TIMEOUT = 1.0  # segundos
+
     def __init__(self) -> None:
         if AuthManager._client is None:
             url = os.environ.get("SUPABASE_URL", "")
@@ -61,6 +94,8 @@ class AuthManager:
                 raise ValueError(
                     "Las variables de entorno SUPABASE_URL y SUPABASE_KEY son requeridas."
                 )
+            from supabase import create_client
+
             AuthManager._client = create_client(url, key)
             logger.info("AuthManager: cliente Supabase inicializado")
         self.client: Client = AuthManager._client
@@ -86,10 +121,7 @@ class AuthManager:
                 return AuthResult(success=False, error="No se pudo crear el usuario.")
 
             logger.info(f"Usuario registrado: {email}")
-            user_dict = {
-                "id": str(user.id),
-                "email": user.email,
-            }
+            user_dict = _user_to_dict(user)
             session_dict = None
             if response.session:
                 session_dict = {
@@ -125,10 +157,8 @@ class AuthManager:
                 return AuthResult(success=False, error="Credenciales invalidas.")
 
             logger.info(f"Login exitoso: {email}")
-            user_dict = {
-                "id": str(user.id),
-                "email": user.email,
-            }
+            user_dict = _user_to_dict(user)
+            self._prefetch_profile(user_dict["id"])
             session_dict = None
             if response.session:
                 session_dict = {
@@ -172,10 +202,7 @@ class AuthManager:
         try:
             response = self.client.auth.get_user()
             if response and response.user:
-                return {
-                    "id": str(response.user.id),
-                    "email": response.user.email,
-                }
+                return _user_to_dict(response.user)
             return None
         except Exception:
             return None
@@ -193,6 +220,65 @@ class AuthManager:
     # Roles y perfiles
     # ------------------------------------------------------------------
 
+    def _fetch_profile(self, user_id: str) -> dict[str, Any] | None:
+        """Lee la fila de user_profiles del usuario, memorizada durante PROFILE_CACHE_TTL.
+
+        Una sola consulta cubre rol, estado y perfil completo. Si hay una
+        precarga en curso (ver ``_prefetch_profile``) se espera su resultado.
+        Los errores se propagan para que cada llamador aplique su valor por defecto.
+
+        Args:
+            user_id: UUID del usuario.
+
+        Returns:
+            Diccionario con el perfil o None si no existe.
+        """
+        with AuthManager._profile_lock:
+            future = AuthManager._profile_futures.pop(user_id, None)
+        if future is not None:
+            try:
+                return future.result(timeout=self.PROFILE_PREFETCH_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Precarga de perfil fallida, consultando de nuevo: {e}")
+
+        with AuthManager._profile_lock:
+            cached = AuthManager._profile_cache.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] < self.PROFILE_CACHE_TTL:
+            return cached[1]
+        return self._load_profile(user_id)
+
+    def _load_profile(self, user_id: str) -> dict[str, Any] | None:
+        """Consulta user_profiles y guarda el resultado en el cache de perfiles."""
+        now = time.monotonic()
+        response = self.client.table("user_profiles").select("*").eq("id", user_id).execute()
+        profile = response.data[0] if response.data else None  # type: ignore[index]
+        with AuthManager._profile_lock:
+            AuthManager._profile_cache[user_id] = (now, profile)  # type: ignore[assignment]
+        return profile  # type: ignore[return-value]
+
+    def _prefetch_profile(self, user_id: str) -> None:
+        """Lanza en segundo plano la lectura del perfil.
+
+        Los chequeos de rol y estado llegan justo despues del login; asi la
+        consulta se solapa con lo que haga la app mientras tanto.
+        """
+        with AuthManager._profile_lock:
+            if user_id not in AuthManager._profile_futures:
+                AuthManager._profile_futures[user_id] = _PROFILE_EXECUTOR.submit(
+                    self._load_profile, user_id
+                )
+
+    @classmethod
+    def invalidate_profile(cls, user_id: str | None = None) -> None:
+        """Descarta el perfil memorizado de un usuario (o de todos si es None)."""
+        with cls._profile_lock:
+            if user_id is None:
+                cls._profile_cache.clear()
+                cls._profile_futures.clear()
+            else:
+                cls._profile_cache.pop(user_id, None)
+                cls._profile_futures.pop(user_id, None)
+
     def is_admin(self, user_id: str) -> bool:
         """Verifica si un usuario tiene rol admin consultando user_profiles.
 
@@ -203,10 +289,8 @@ class AuthManager:
             True si el usuario es admin.
         """
         try:
-            response = self.client.table("user_profiles").select("role").eq("id", user_id).execute()
-            if response.data:
-                return response.data[0]["role"] == "admin"  # type: ignore[call-overload,index]
-            return False
+            profile = self._fetch_profile(user_id)
+            return profile is not None and profile.get("role") == "admin"
         except Exception as e:
             logger.error(f"Error verificando admin: {e}")
             return False
@@ -221,11 +305,9 @@ class AuthManager:
             True si el usuario esta activo.
         """
         try:
-            response = (
-                self.client.table("user_profiles").select("is_active").eq("id", user_id).execute()
-            )
-            if response.data:
-                return bool(response.data[0]["is_active"])  # type: ignore[call-overload,index]
+            profile = self._fetch_profile(user_id)
+            if profile is not None:
+                return bool(profile["is_active"])
             # Si no hay perfil aun, asumir activo (trigger puede no haber corrido).
             return True
         except Exception as e:
@@ -242,14 +324,26 @@ class AuthManager:
             Diccionario con datos del perfil o None.
         """
         try:
-            response = self.client.table("user_profiles").select("*").eq("id", user_id).execute()
-            if response.data:
-                return response.data[0]  # type: ignore[return-value]
-            return None
+            return self._fetch_profile(user_id)
         except Exception as e:
             logger.error(f"Error obteniendo perfil: {e}")
             return None
 
+    # Variantes async: cada consulta corre en un hilo con el mismo cliente
+    # (y la misma sesion), asi varios chequeos con asyncio.gather no se serializan.
+
+    async def a_is_admin(self, user_id: str) -> bool:
+        """Version async de ``is_admin``."""
+        return await asyncio.to_thread(self.is_admin, user_id)
+
+    async def a_is_user_active(self, user_id: str) -> bool:
+        """Version async de ``is_user_active``."""
+        return await asyncio.to_thread(self.is_user_active, user_id)
+
+    async def a_get_user_profile(self, user_id: str) -> dict[str, Any] | None:
+        """Version async de ``get_user_profile``."""
+        return await asyncio.to_thread(self.get_user_profile, user_id)
+
     def get_all_profiles(self) -> list[dict[str, Any]]:
         """Obtiene todos los perfiles de usuarios (para admin).
 
@@ -282,6 +376,7 @@ class AuthManager:
             self.client.table("user_profiles").update({"is_active": is_active}).eq(
                 "id", user_id
             ).execute()
+            self.invalidate_profile(user_id)
             logger.info(f"Usuario {user_id} {'activado' if is_active else 'desactivado'}")
             return True
         except Exception as e:
@@ -4,22 +4,151 @@ Procesador de CVs: extracción de texto de diferentes formatos.
 Soporta texto plano y PDFs.
 """
 import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import TYPE_CHECKING, BinaryIO, Dict, Optional, Union
 from dataclasses import dataclass
-import PyPDF2
+
+import orjson
+import xxhash
 
 from src.logger import get_logger
 
+if TYPE_CHECKING:
+    # pypdfium2 se importa al parsear el primer PDF (no al importar el módulo)
+    import pypdfium2 as pdfium
+
 logger = get_logger(__name__)
 
+# Palabras clave para identificar secciones (multilenguaje)
+_SECTION_KEYWORDS: Dict[str, tuple[str, ...]] = {
+    'experience': (
+        'experiencia', 'experience', 'experiência', 'expérience',
+        'trabajo', 'work', 'trabalho', 'travail',
+        'empleo', 'employment', 'emploi'
+    ),
+    'education': (
+        'educación', 'education', 'educação', 'éducation',
+        'formación', 'training', 'formação', 'formation',
+        'estudios', 'studies', 'estudos', 'études'
+    ),
+    'skills': (
+        'habilidades', 'skills', 'competências', 'compétences',
+        'tecnologías', 'technologies', 'tecnologias',
+        'herramientas', 'tools', 'ferramentas', 'outils'
+    ),
+    'summary': (
+        'resumen', 'summary', 'resumo', 'résumé',
+        'perfil', 'profile', 'sobre mí', 'about',
+        'objetivo', 'objective', 'objectif'
+    ),
+}
+
+# Cada sección detectada es un bit de CVData.sections_mask (en este orden)
+SECTION_NAMES: tuple[str, ...] = tuple(_SECTION_KEYWORDS)
+
+def _count_lines(text: str) -> int:
+    """Igual que ``len(text.splitlines())`` para saltos \\n, sin construir la lista."""
+    if not text:
+        return 0
+    return text.count("\n") + (0 if text.endswith("\n") else 1)
+
+
+# PDFs con al menos estas páginas se extraen en paralelo (en PDFs cortos el
+# arranque de los procesos cuesta más que la extracción, ~2 ms por página)
+PARALLEL_MIN_PAGES = 32
+
+# Pool de procesos compartido, creado al primer PDF largo y reutilizado después
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    Devuelve el pool de extracción del proceso (lo crea la primera vez).
+
+    Los workers arrancan con forkserver (spawn si no está disponible) y no con
+    fork: un fork del servidor de Streamlit, que tiene varios hilos, puede
+    heredar un lock tomado (p. ej. el del logging) y bloquearse.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                start_method = (
+                    "forkserver"
+                    if "forkserver" in multiprocessing.get_all_start_methods()
+                    else "spawn"
+                )
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=os.cpu_count() or 1,
+                    mp_context=multiprocessing.get_context(start_method),
+                )
+    return _process_pool
 
-@dataclass
+
+def _extract_page_texts(pdf: "pdfium.PdfDocument", start: int, end: int) -> list[str]:
+    """Texto de las páginas [start, end) en orden; las páginas ilegibles se omiten."""
+    text_parts = []
+    errors = []
+    for page_num in range(start, end):
+        # En 3.11+ el try no cuesta nada si no hay excepción
+        try:
+            page = pdf[page_num]
+            textpage = page.get_textpage()
+            page_text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+        except Exception as e:
+            # Continuar con otras páginas; se reportan al final
+            errors.append((page_num, e))
+            continue
+        if page_text:
+            text_parts.append(page_text)
+
+    for page_num, error in errors:
+        logger.warning(f"Error extrayendo página {page_num + 1}: {error}")
+    return text_parts
+
+
+def _extract_pages_range(args: tuple[Union[str, bytes], int, int]) -> list[str]:
+    """Worker del pool: abre su propio documento y extrae un rango de páginas."""
+    import pypdfium2 as pdfium
+
+    pdf_source, start, end = args
+    pdf = pdfium.PdfDocument(pdf_source)
+    try:
+        return _extract_page_texts(pdf, start, end)
+    finally:
+        pdf.close()
+
+
+@dataclass(slots=True)
 class CVData:
     """Estructura de datos para un CV parseado."""
     raw_text: str
-    sections: Dict[str, str]
+    sections_mask: int  # bit i activo = sección SECTION_NAMES[i] detectada
     metadata: Dict[str, any]
+    # Datos estructurados opcionales (los leen QuestionGenerator y ExperienceRewriter
+    # si quien crea el CVData ya los tiene); con slots no se pueden agregar después
+    work_experience: Optional[list[dict]] = None
+    technical_skills: Optional[list] = None
+    education: Optional[list] = None
+    
+    @property
+    def sections(self) -> list[str]:
+        """Nombres de las secciones detectadas."""
+        return [
+            name for index, name in enumerate(SECTION_NAMES)
+            if self.sections_mask & (1 << index)
+        ]
+    
+    def has_section(self, name: str) -> bool:
+        """Retorna True si se detectó la sección ``name``."""
+        return bool(self.sections_mask & (1 << SECTION_NAMES.index(name)))
     
     @property
     def is_empty(self) -> bool:
@@ -46,9 +175,25 @@ class CVParser:
     - PDF (con texto seleccionable, no OCR)
     """
     
-    def __init__(self):
-        """Inicializa el parser de CVs."""
+    # Tope del cache en disco de PDFs parseados (se borran los menos usados)
+    CACHE_MAX_BYTES = 100 * 1024 * 1024
+    # Cambiar si cambia la forma de CVData: las entradas viejas pasan a ser miss
+    _CACHE_VERSION = 1
+    
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Inicializa el parser de CVs.
+        
+        Args:
+            cache_dir: Directorio del cache en disco de PDFs parseados (key: xxh3 del
+                archivo). Si no se proporciona y existe CV_CACHE, se usa esa ruta;
+                sin ninguno de los dos no se cachea
+        """
         self.supported_formats = ['.pdf', '.txt']
+        cache_dir = cache_dir or os.getenv("CV_CACHE")
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        # El directorio del cache se crea en la primera escritura, no en cada una
+        self._cache_dir_ready = False
     
     def parse_text(self, text: str) -> CVData:
         """
@@ -70,40 +215,57 @@ class CVParser:
         # En futuras versiones podríamos usar NLP para extraer secciones
         return CVData(
             raw_text=text.strip(),
-            sections=self._extract_basic_sections(text),
+            sections_mask=self._extract_basic_sections(text),
             metadata={
                 'format': 'text',
                 'length': len(text),
-                'lines': len(text.splitlines())
+                'lines': _count_lines(text)
             }
         )
     
     def parse_pdf(
         self,
         file_path: Optional[str] = None,
-        file_bytes: Optional[bytes] = None
+        file_bytes: Optional[bytes] = None,
+        file_obj: Optional[BinaryIO] = None
     ) -> CVData:
         """
         Parsea un CV en formato PDF.
         ...
+        ``file_obj`` permite pasar un stream binario ya abierto (p. ej. el archivo
+        subido en Streamlit) sin copiarlo a bytes ni a un archivo temporal.
         """
-        if not file_path and not file_bytes:
+        if not file_path and not file_bytes and file_obj is None:
             raise CVParserError("Debe proporcionar file_path o file_bytes")
         
+        import pypdfium2 as pdfium
+        
+        source = 'archivo' if file_path else 'stream' if file_obj is not None else 'bytes'
         try:
-            logger.info(f"Iniciando parsing de PDF: {'archivo' if file_path else 'bytes'}")
+            cache_path = None
+            if self.cache_dir is not None:
+                cache_path = self._cache_path(file_path, file_bytes, file_obj)
+                cached = self._load_cached(cache_path)
+                if cached is not None:
+                    logger.info(f"PDF servido desde el cache: {cache_path.name}")
+                    cached.metadata['source'] = file_path or source
+                    return cached
+            
+            logger.info(f"Iniciando parsing de PDF: {source}")
             
-            # Abrir el PDF
+            # Abrir el PDF (PDFium lee la ruta directamente, o el stream/bytes en memoria)
             if file_path:
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    text, metadata = self._extract_from_pdf_reader(pdf_reader)
-                    metadata['source'] = file_path
+                pdf_source = file_path
             else:
-                pdf_file = io.BytesIO(file_bytes)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                text, metadata = self._extract_from_pdf_reader(pdf_reader)
-                metadata['source'] = 'bytes'
+                pdf_source = file_obj if file_obj is not None else file_bytes
+            pdf = pdfium.PdfDocument(pdf_source)
+            # Los workers en paralelo reabren el PDF: posible desde ruta o bytes, no desde el stream
+            parallel_source = file_path or (file_bytes if file_obj is None else None)
+            try:
+                text, metadata = self._extract_from_pdf_document(pdf, parallel_source)
+            finally:
+                pdf.close()
+            metadata['source'] = file_path or source
             
             if not text.strip():
                 logger.warning("PDF parseado pero sin texto extraíble")
@@ -113,13 +275,16 @@ class CVParser:
                 )
             
             logger.info(f"PDF parseado exitosamente. Longitud: {len(text)} caracteres")
-            return CVData(
+            cv_data = CVData(
                 raw_text=text.strip(),
-                sections=self._extract_basic_sections(text),
+                sections_mask=self._extract_basic_sections(text),
                 metadata=metadata
             )
+            if cache_path is not None:
+                self._store_cached(cache_path, cv_data)
+            return cv_data
             
-        except PyPDF2.errors.PdfReadError as e:
+        except pdfium.PdfiumError as e:
             logger.error(f"Error de lectura PDF: {e}")
             raise PDFParseError(f"Error al leer el PDF: {str(e)}")
         except FileNotFoundError:
@@ -131,48 +296,129 @@ class CVParser:
             logger.error(f"Error inesperado parsing PDF: {e}", exc_info=True)
             raise PDFParseError(f"Error inesperado al parsear PDF: {str(e)}")
     
-    def _extract_from_pdf_reader(self, pdf_reader: PyPDF2.PdfReader) -> tuple[str, Dict]:
+    def _cache_path(
+        self,
+        file_path: Optional[str],
+        file_bytes: Optional[bytes],
+        file_obj: Optional[BinaryIO]
+    ) -> Path:
+        """Ruta del cache para el contenido del PDF (xxh3 leído por bloques)."""
+        hasher = xxhash.xxh3_128()
+        if file_path:
+            with open(file_path, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b''):
+                    hasher.update(block)
+        elif file_obj is not None:
+            start = file_obj.tell()
+            for block in iter(lambda: file_obj.read(1 << 20), b''):
+                hasher.update(block)
+            file_obj.seek(start)
+        else:
+            hasher.update(file_bytes)
+        return self.cache_dir / f"{hasher.hexdigest()}.json"
+    
+    def _load_cached(self, cache_path: Path) -> Optional[CVData]:
+        """CVData guardado en ``cache_path`` o None (inexistente, corrupto o de otra versión)."""
+        try:
+            entry = orjson.loads(cache_path.read_bytes())
+            if entry.get('version') != self._CACHE_VERSION:
+                return None
+            cv_data = CVData(**entry['cv'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrada de cache de CV inválida ({cache_path.name}): {e}")
+            return None
+        # La fecha de modificación marca el último uso (orden de desalojo)
+        os.utime(cache_path)
+        return cv_data
+    
+    def _store_cached(self, cache_path: Path, cv_data: CVData) -> None:
+        """Guarda el CVData parseado y desaloja las entradas más viejas si se pasa del tope."""
+        try:
+            if not self._cache_dir_ready:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._cache_dir_ready = True
+            tmp_path = cache_path.with_suffix('.tmp')
+            tmp_path.write_bytes(orjson.dumps({'version': self._CACHE_VERSION, 'cv': cv_data}))
+            tmp_path.replace(cache_path)
+            
+            entries = [(path.stat(), path) for path in self.cache_dir.glob('*.json')]
+            total = sum(stat.st_size for stat, _ in entries)
+            for stat, path in sorted(entries, key=lambda entry: entry[0].st_mtime):
+                if total <= self.CACHE_MAX_BYTES:
+                    break
+                if path == cache_path:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el CV en el cache: {e}")
+    
+    def _extract_from_pdf_document(
+        self,
+        pdf: "pdfium.PdfDocument",
+        parallel_source: Optional[Union[str, bytes]] = None
+    ) -> tuple[str, Dict]:
         """
-        Extrae texto y metadata de un PdfReader.
+        Extrae texto y metadata de un PdfDocument de PDFium.
         
         Args:
-            pdf_reader: Instancia de PyPDF2.PdfReader
+            pdf: Instancia de pypdfium2.PdfDocument
+            parallel_source: Ruta o bytes del mismo PDF. Si se indica y el PDF tiene
+                al menos PARALLEL_MIN_PAGES páginas, los rangos de páginas se
+                extraen en un pool de procesos (PDFium no es thread-safe)
             
         Returns:
             Tupla (texto_extraído, metadata)
         """
-        # Extraer texto de todas las páginas
-        text_parts = []
-        for page_num, page in enumerate(pdf_reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-            except Exception as e:
-                # Log warning pero continuar con otras páginas
-                print(f"Warning: Error extrayendo página {page_num + 1}: {e}")
+        # Extraer texto de todas las páginas (la extracción corre en código nativo)
+        num_pages = len(pdf)
+        workers = min(os.cpu_count() or 1, num_pages)
+        if parallel_source is not None and num_pages >= PARALLEL_MIN_PAGES and workers > 1:
+            step = -(-num_pages // workers)
+            ranges = [
+                (parallel_source, start, min(start + step, num_pages))
+                for start in range(0, num_pages, step)
+            ]
+            # map conserva el orden de los rangos
+            text_parts = [
+                text
+                for chunk in _get_process_pool().map(_extract_pages_range, ranges)
+                for text in chunk
+            ]
+        else:
+            text_parts = _extract_page_texts(pdf, 0, num_pages)
         
-        full_text = "\n\n".join(text_parts)
+        # PDFium separa las líneas con \r\n: StringIO con newline=None las
+        # normaliza a \n mientras escribe (sin join + replace, que copian dos veces)
+        buffer = io.StringIO(newline=None)
+        for index, page_text in enumerate(text_parts):
+            if index:
+                buffer.write("\n\n")
+            buffer.write(page_text)
+        full_text = buffer.getvalue()
         
         # Extraer metadata del PDF
         metadata = {
             'format': 'pdf',
-            'num_pages': len(pdf_reader.pages),
+            'num_pages': num_pages,
             'length': len(full_text),
-            'lines': len(full_text.splitlines())
+            'lines': _count_lines(full_text)
         }
         
         # Intentar extraer metadata adicional
-        if pdf_reader.metadata:
+        pdf_metadata = pdf.get_metadata_dict(skip_empty=True)
+        if pdf_metadata:
             metadata['pdf_metadata'] = {
-                'title': pdf_reader.metadata.get('/Title', ''),
-                'author': pdf_reader.metadata.get('/Author', ''),
-                'creator': pdf_reader.metadata.get('/Creator', ''),
+                'title': pdf_metadata.get('Title', ''),
+                'author': pdf_metadata.get('Author', ''),
+                'creator': pdf_metadata.get('Creator', ''),
             }
         
         return full_text, metadata
     
-    def _extract_basic_sections(self, text: str) -> Dict[str, str]:
+    def _extract_basic_sections(self, text: str) -> int:
         """
         Intenta extraer secciones básicas del CV.
         
@@ -183,43 +429,18 @@ class CVParser:
             text: Texto completo del CV
             
         Returns:
-            Diccionario con secciones identificadas
+            Máscara de bits con las secciones identificadas (ver SECTION_NAMES)
         """
-        sections = {}
+        mask = 0
         text_lower = text.lower()
         
-        # Palabras clave para identificar secciones (multilenguaje)
-        section_keywords = {
-            'experience': [
-                'experiencia', 'experience', 'experiência', 'expérience',
-                'trabajo', 'work', 'trabalho', 'travail',
-                'empleo', 'employment', 'emploi'
-            ],
-            'education': [
-                'educación', 'education', 'educação', 'éducation',
-                'formación', 'training', 'formação', 'formation',
-                'estudios', 'studies', 'estudos', 'études'
-            ],
-            'skills': [
-                'habilidades', 'skills', 'competências', 'compétences',
-                'tecnologías', 'technologies', 'tecnologias',
-                'herramientas', 'tools', 'ferramentas', 'outils'
-            ],
-            'summary': [
-                'resumen', 'summary', 'resumo', 'résumé',
-                'perfil', 'profile', 'sobre mí', 'about',
-                'objetivo', 'objective', 'objectif'
-            ]
-        }
-        
-        # Buscar secciones
-        for section_name, keywords in section_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    sections[section_name] = 'detected'
-                    break
+        # Un ``in`` por palabra clave (búsqueda en C); cada sección se deja de
+        # buscar en cuanto aparece una de sus palabras
+        for index, keywords in enumerate(_SECTION_KEYWORDS.values()):
+            if any(keyword in text_lower for keyword in keywords):
+                mask |= 1 << index
         
-        return sections
+        return mask
     
     def parse_file(self, file_path: str) -> CVData:
         """
@@ -280,13 +501,16 @@ class CVParser:
             Diccionario con estadísticas
         """
         text = cv_data.raw_text
+        # str.split() sigue siendo el conteo más rápido en CPython: contar con
+        # re.finditer(r"\S+") crea un objeto Match por palabra y es ~6x más lento
         words = text.split()
+        total_lines = _count_lines(text)
         
         return {
             'total_characters': len(text),
             'total_words': len(words),
-            'total_lines': len(text.splitlines()),
-            'avg_words_per_line': len(words) / max(len(text.splitlines()), 1),
-            'sections_detected': list(cv_data.sections.keys()),
+            'total_lines': total_lines,
+            'avg_words_per_line': len(words) / max(total_lines, 1),
+            'sections_detected': cv_data.sections,
             'format': cv_data.metadata.get('format', 'unknown')
         }
@@ -2,15 +2,81 @@
 Gestor de base de datos Supabase PostgreSQL para el historial de CVs generados.
 """
 
+import asyncio
 import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 from datetime import datetime, timezone
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from src.logger import get_logger
-from supabase import Client, create_client
+
+if TYPE_CHECKING:
+    # supabase (postgrest, gotrue, httpx...) tarda ~0.5 s en importarse: se
+    # importa al crear el primer cliente
+    from postgrest.types import ReturnMethod
+
+    from supabase import Client
 
 logger = get_logger(__name__)
 
+# Timeout de las peticiones a PostgREST (supabase-py usa 120 s por defecto)
+POSTGREST_TIMEOUT = 30.0
+POSTGREST_CONNECT_TIMEOUT = 5.0
+
+# Pool de conexiones HTTP compartido por todas las sesiones de Streamlit: con
+# HTTP/2 una conexión multiplexa varias peticiones, así que pocas bastan
+POOL_MAX_CONNECTIONS = 10
+POOL_MAX_KEEPALIVE = 5
+POOL_KEEPALIVE_EXPIRY = 60.0
+
+# Proyecciones fijas de las consultas. PostgREST ya prepara y reutiliza el plan
+# de cada consulta en el servidor; aquí solo se evita reconstruir los textos
+_CV_LIST_COLUMNS = "id, created_at, job_title, company, language, theme, yaml_path, pdf_path"
+_CV_COLUMNS = (
+    _CV_LIST_COLUMNS
+    + ", yaml_content, original_cv, job_description, gap_analysis, questions_asked"
+)
+_SESSION_LIST_COLUMNS = "id, created_at, cv_id, question"
+_CV_WITH_SESSIONS_COLUMNS = (
+    _CV_COLUMNS + ", interview_sessions(id, question, generated_answer, created_at)"
+)
+
+# Prefer: return=minimal (ReturnMethod es un StrEnum; evita importar postgrest aquí)
+_RETURN_MINIMAL = cast("ReturnMethod", "minimal")
+
+# Filas por insert en las escrituras en lote (cuerpos de petición acotados)
+BULK_INSERT_CHUNK_SIZE = 1000
+
+# Filas por petición al recorrer el historial (menor que el max-rows de Supabase)
+CV_PAGE_SIZE = 500
+
+
+def _create_client(url: str, key: str) -> "Client":
+    """Crea el cliente Supabase sobre un cliente HTTP propio y persistente.
+
+    supabase-py descarta su cliente PostgREST (y con él las conexiones TCP/TLS
+    abiertas) en cada evento de auth; al pasarle un ``httpx.Client`` propio la
+    conexión HTTP/2 keep-alive sobrevive y no se repite el handshake.
+    """
+    import httpx
+
+    from supabase import ClientOptions, create_client
+
+    http_client = httpx.Client(
+        http2=True,
+        follow_redirects=True,
+        timeout=httpx.Timeout(POSTGREST_TIMEOUT, connect=POSTGREST_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return create_client(url, key, options=ClientOptions(httpx_client=http_client))
+
 
 class CVDatabase:
     """Cliente de base de datos que conecta a Supabase PostgreSQL.
@@ -20,21 +86,98 @@ class CVDatabase:
     mientras no se implemente autenticación, se pasa ``None``.
     """
 
-    _client: Client | None = None
+    _client: "Client | None" = None
+    # Evita que dos sesiones de Streamlit creen el cliente a la vez
+    _client_lock = threading.Lock()
+
+    # Respuestas de skill_memory por user_id: (instante de lectura, {skill: respuesta}).
+    # Compartido entre instancias porque la app crea un CVDatabase por operación.
+    SKILL_CACHE_TTL = 30  # segundos
+    _skill_answers_cache: dict[str | None, tuple[float, dict[str, str]]] = {}
+    _cache_lock = threading.Lock()
+    # Lecturas puntuales (get_skill_answer, get_base_cv): LRU acotado con TTL,
+    # key -> (instante de lectura, valor). También se cachea "no existe" (None)
+    READ_CACHE_TTL = 300  # segundos
+    READ_CACHE_MAXSIZE = 256
+    _read_cache: "OrderedDict[tuple, tuple[float, str | None]]" = OrderedDict()
+    # Se incrementa con cada escritura de skills o CV base; una lectura que empezó
+    # antes de la escritura no guarda su resultado (ya podría estar desactualizado)
+    _cache_generation = 0
 
     def __init__(self) -> None:
         if CVDatabase._client is None:
-            url = os.environ.get("SUPABASE_URL", "")
-            key = os.environ.get("SUPABASE_KEY", "")
-            if not url or not key:
-                raise ValueError(
-                    "Las variables de entorno SUPABASE_URL y SUPABASE_KEY "
-                    "son requeridas. Configúralas en .env o en Streamlit secrets."
-                )
-            CVDatabase._client = create_client(url, key)
-            logger.info("Cliente Supabase inicializado")
+            with CVDatabase._client_lock:
+                if CVDatabase._client is None:
+                    url = os.environ.get("SUPABASE_URL", "")
+                    key = os.environ.get("SUPABASE_KEY", "")
+                    if not url or not key:
+                        raise ValueError(
+                            "Las variables de entorno SUPABASE_URL y SUPABASE_KEY "
+                            "son requeridas. Configúralas en .env o en Streamlit secrets."
+                        )
+                    CVDatabase._client = _create_client(url, key)
+                    logger.info("Cliente Supabase inicializado")
         self.client: Client = CVDatabase._client
 
+    @classmethod
+    def close(cls) -> None:
+        """Cierra las conexiones del pool HTTP y descarta el cliente compartido."""
+        with cls._client_lock:
+            client, cls._client = cls._client, None
+        if client is not None:
+            http_client = client.options.httpx_client
+            if http_client is not None:
+                http_client.close()
+            logger.info("Cliente Supabase cerrado")
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Descarta las lecturas cacheadas (p. ej. tras cambios hechos fuera de la app)."""
+        with cls._cache_lock:
+            cls._cache_generation += 1
+            cls._skill_answers_cache.clear()
+            cls._read_cache.clear()
+
+    @classmethod
+    def cache_generation(cls) -> int:
+        """Contador que cambia con cada escritura o ``invalidate_cache()``.
+
+        Permite a otros caches (p. ej. el de InterviewProxy) detectar que sus
+        lecturas quedaron viejas sin que la UI tenga que avisarles.
+        """
+        return cls._cache_generation
+
+    def _cached_read(self, key: tuple, load: Callable[[], str | None]) -> str | None:
+        """Devuelve ``load()`` pasando por el cache LRU de lecturas puntuales.
+
+        Los errores de ``load`` se propagan y no se cachean.
+        """
+        with self._cache_lock:
+            entry = self._read_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.READ_CACHE_TTL:
+                self._read_cache.move_to_end(key)
+                return entry[1]
+            generation = self._cache_generation
+
+        value = load()
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._read_cache[key] = (time.monotonic(), value)
+                self._read_cache.move_to_end(key)
+                while len(self._read_cache) > self.READ_CACHE_MAXSIZE:
+                    self._read_cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _returning(builder: Any, columns: str = "id") -> Any:
+        """Equivalente a ``RETURNING columns`` en un insert o delete.
+
+        PostgREST responde por defecto con las filas completas (``yaml_content``,
+        ``original_cv``...); ``select`` limita la respuesta a las columnas pedidas.
+        """
+        builder.request.params = builder.request.params.set("select", columns)
+        return builder
+
     @staticmethod
     def _rows(response: Any) -> list[dict[str, Any]]:
         """Cast Supabase response data to a typed list for mypy."""
@@ -79,31 +222,93 @@ class CVDatabase:
             ID del registro creado.
         """
         try:
-            data: dict = {
-                "job_title": job_title,
-                "company": company,
-                "language": language,
-                "theme": theme,
-                "yaml_content": yaml_content,
-                "yaml_path": yaml_path,
-                "pdf_path": pdf_path,
-                "original_cv": original_cv,
-                "job_description": job_description,
-                "gap_analysis": gap_analysis,
-                "questions_asked": questions_asked,
-            }
-            if user_id is not None:
-                data["user_id"] = user_id
-
-            response = self.client.table("cv_history").insert(data).execute()
+            data = self._build_cv_row(
+                job_title=job_title,
+                yaml_content=yaml_content,
+                company=company,
+                language=language,
+                theme=theme,
+                yaml_path=yaml_path,
+                pdf_path=pdf_path,
+                original_cv=original_cv,
+                job_description=job_description,
+                gap_analysis=gap_analysis,
+                questions_asked=questions_asked,
+                user_id=user_id,
+            )
+            response = self._returning(self.client.table("cv_history").insert(data)).execute()
             rows = self._rows(response)
             cv_id: int = rows[0]["id"]
-            logger.info(f"CV guardado con ID: {cv_id} ({job_title})")
+            logger.info("CV guardado con ID: %s (%s)", cv_id, job_title)
             return cv_id
         except Exception as e:
             logger.error(f"Error guardando CV en DB: {e}", exc_info=True)
             raise
 
+    def save_cvs_bulk(self, cvs: list[dict], user_id: str | None = None) -> list[int]:
+        """Guarda varios CVs con un insert por cada ``BULK_INSERT_CHUNK_SIZE`` filas.
+
+        Args:
+            cvs: Un diccionario por CV con los mismos argumentos que ``save_cv``
+                (``job_title`` y ``yaml_content`` obligatorios).
+            user_id: UUID del usuario para los CVs que no traigan el suyo (opcional).
+
+        Returns:
+            IDs de los registros creados, en el mismo orden.
+        """
+        if not cvs:
+            return []
+        try:
+            rows = [self._build_cv_row(**{"user_id": user_id, **cv}) for cv in cvs]
+            cv_ids = self._insert_chunked("cv_history", rows)
+            logger.info("%d CVs guardados", len(cv_ids))
+            return cv_ids
+        except Exception as e:
+            logger.error(f"Error guardando CVs en DB: {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    def _build_cv_row(
+        job_title: str,
+        yaml_content: str,
+        company: str | None = None,
+        language: str = "es",
+        theme: str = "classic",
+        yaml_path: str | None = None,
+        pdf_path: str | None = None,
+        original_cv: str | None = None,
+        job_description: str | None = None,
+        gap_analysis: str | None = None,
+        questions_asked: str | None = None,
+        user_id: str | None = None,
+    ) -> dict:
+        """Fila de ``cv_history`` a partir de los argumentos de ``save_cv``."""
+        data: dict = {
+            "job_title": job_title,
+            "company": company,
+            "language": language,
+            "theme": theme,
+            "yaml_content": yaml_content,
+            "yaml_path": yaml_path,
+            "pdf_path": pdf_path,
+            "original_cv": original_cv,
+            "job_description": job_description,
+            "gap_analysis": gap_analysis,
+            "questions_asked": questions_asked,
+        }
+        if user_id is not None:
+            data["user_id"] = user_id
+        return data
+
+    def _insert_chunked(self, table: str, rows: list[dict]) -> list[int]:
+        """Inserta ``rows`` en lotes de ``BULK_INSERT_CHUNK_SIZE`` y devuelve sus IDs."""
+        ids: list[int] = []
+        for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+            chunk = rows[start : start + BULK_INSERT_CHUNK_SIZE]
+            response = self._returning(self.client.table(table).insert(chunk)).execute()
+            ids.extend(row["id"] for row in self._rows(response))
+        return ids
+
     def get_all_cvs(self, user_id: str | None = None) -> list[dict]:
         """Obtiene todos los CVs guardados, ordenados por fecha descendente.
 
@@ -113,13 +318,41 @@ class CVDatabase:
         Returns:
             Lista de diccionarios con los datos de cada CV.
         """
-        query = self.client.table("cv_history").select(
-            "id, created_at, job_title, company, language, theme, yaml_path, pdf_path"
-        )
-        if user_id is not None:
-            query = query.eq("user_id", user_id)
-        response = query.order("created_at", desc=True).execute()
-        return self._rows(response)
+        return list(self.iter_all_cvs(user_id=user_id))
+
+    def iter_all_cvs(
+        self, user_id: str | None = None, page_size: int = CV_PAGE_SIZE
+    ) -> Iterator[dict]:
+        """Recorre los CVs guardados (más recientes primero) página a página.
+
+        Cada página es una petición con ``range``: la memoria queda acotada a
+        ``page_size`` filas y no se pierde nada por el tope de filas por
+        respuesta de PostgREST (``max-rows``, 1000 en Supabase).
+
+        Args:
+            user_id: Filtrar por usuario (opcional).
+            page_size: Filas por petición.
+
+        Yields:
+            Diccionario con los datos de cada CV.
+        """
+        start = 0
+        while True:
+            query = self.client.table("cv_history").select(_CV_LIST_COLUMNS)
+            if user_id is not None:
+                query = query.eq("user_id", user_id)
+            # id desempata fechas iguales para que las páginas no se solapen
+            response = (
+                query.order("created_at", desc=True)
+                .order("id", desc=True)
+                .range(start, start + page_size - 1)
+                .execute()
+            )
+            rows = self._rows(response)
+            yield from rows
+            if len(rows) < page_size:
+                return
+            start += page_size
 
     def get_cv_by_id(self, cv_id: int, user_id: str | None = None) -> dict | None:
         """Obtiene un CV específico por su ID.
@@ -131,13 +364,62 @@ class CVDatabase:
         Returns:
             Diccionario con todos los datos del CV o ``None`` si no existe.
         """
-        query = self.client.table("cv_history").select("*").eq("id", cv_id)
+        return self._get_cv(cv_id, _CV_COLUMNS, user_id)
+
+    def get_cv_metadata(self, cv_id: int, user_id: str | None = None) -> dict | None:
+        """Como ``get_cv_by_id`` pero solo con los metadatos del listado.
+
+        No transfiere ``yaml_content``, ``original_cv`` ni el resto de textos
+        grandes; sirve para refrescar la UI sin cargar el CV completo.
+
+        Args:
+            cv_id: ID del CV.
+            user_id: Filtrar por usuario (opcional).
+
+        Returns:
+            Diccionario con los metadatos del CV o ``None`` si no existe.
+        """
+        return self._get_cv(cv_id, _CV_LIST_COLUMNS, user_id)
+
+    def _get_cv(self, cv_id: int, columns: str, user_id: str | None) -> dict | None:
+        """Lee las columnas ``columns`` de un CV."""
+        query = self.client.table("cv_history").select(columns).eq("id", cv_id)
         if user_id is not None:
             query = query.eq("user_id", user_id)
         response = query.execute()
         rows = self._rows(response)
         return rows[0] if rows else None
 
+    def get_cv_with_sessions(self, cv_id: int, user_id: str | None = None) -> dict | None:
+        """Obtiene un CV y sus sesiones de entrevista en una sola petición.
+
+        Usa el embedding de recursos de PostgREST (JOIN por la FK
+        ``interview_sessions.cv_id``) en vez de ``get_cv_by_id`` +
+        ``get_interview_sessions(cv_id=...)``.
+
+        Args:
+            cv_id: ID del CV.
+            user_id: Filtrar por usuario (opcional).
+
+        Returns:
+            ``{"cv": {...}, "sessions": [...]}`` con las sesiones más recientes
+            primero, o ``None`` si el CV no existe.
+        """
+        query = (
+            self.client.table("cv_history")
+            .select(_CV_WITH_SESSIONS_COLUMNS)
+            .eq("id", cv_id)
+        )
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        response = query.order("created_at", desc=True, foreign_table="interview_sessions").execute()
+        rows = self._rows(response)
+        if not rows:
+            return None
+        cv = rows[0]
+        sessions = cv.pop("interview_sessions", None) or []
+        return {"cv": cv, "sessions": sessions}
+
     def delete_cv(self, cv_id: int, user_id: str | None = None) -> bool:
         """Elimina un CV del historial.
 
@@ -151,7 +433,7 @@ class CVDatabase:
         query = self.client.table("cv_history").delete().eq("id", cv_id)
         if user_id is not None:
             query = query.eq("user_id", user_id)
-        response = query.execute()
+        response = self._returning(query).execute()
         return len(self._rows(response)) > 0
 
     def clear_all(self, user_id: str | None = None) -> int:
@@ -169,7 +451,7 @@ class CVDatabase:
         else:
             # Supabase requiere al menos un filtro en DELETE.
             query = query.gte("id", 0)
-        response = query.execute()
+        response = self._returning(query).execute()
         return len(self._rows(response))
 
     # ------------------------------------------------------------------
@@ -185,7 +467,9 @@ class CVDatabase:
         """Guarda o actualiza una respuesta de habilidad en la memoria.
 
         Si la habilidad ya existe para el usuario, actualiza el texto e
-        incrementa ``usage_count``.
+        incrementa ``usage_count``. Se hace en una sola petición atómica con la
+        función ``upsert_skill_answer`` (migración 009), sin leer antes el
+        contador.
 
         Args:
             skill_name: Nombre de la habilidad (se normaliza a minúsculas).
@@ -194,42 +478,61 @@ class CVDatabase:
         """
         try:
             normalized_skill = skill_name.strip().lower()
-            now = datetime.now(timezone.utc).isoformat()  # noqa: UP017
+            self.client.rpc(
+                "upsert_skill_answer",
+                {"p_user_id": user_id, "p_skill": normalized_skill, "p_answer": answer_text},
+            ).execute()
+            logger.info("Respuesta guardada para skill: %s", normalized_skill)
+        except Exception as e:
+            logger.error(f"Error guardando skill answer: {e}", exc_info=True)
+        finally:
+            self.invalidate_cache()
 
-            # Buscar registro existente para incrementar usage_count.
-            existing_query = (
-                self.client.table("skill_memory")
-                .select("usage_count")
-                .eq("skill_name", normalized_skill)
-            )
-            if user_id is not None:
-                existing_query = existing_query.eq("user_id", user_id)
-            else:
-                existing_query = existing_query.is_("user_id", "null")
-            existing = existing_query.execute()
+    def save_skill_answers_bulk(
+        self,
+        items: list[tuple[str, str]],
+        user_id: str | None = None,
+    ) -> int:
+        """Guarda o actualiza varias respuestas de habilidades a la vez.
 
-            existing_rows = self._rows(existing)
-            usage_count = existing_rows[0]["usage_count"] + 1 if existing_rows else 1
+        Equivale a llamar ``save_skill_answer`` por cada par, pero en una sola
+        petición atómica: la función ``upsert_skill_answers`` (migración 012)
+        incrementa ``usage_count`` en el mismo INSERT ... ON CONFLICT.
 
-            data: dict = {
-                "skill_name": normalized_skill,
-                "answer_text": answer_text,
-                "updated_at": now,
-                "usage_count": usage_count,
-            }
-            if user_id is not None:
-                data["user_id"] = user_id
+        Args:
+            items: Pares ``(skill_name, answer_text)``. Si una habilidad se
+                repite, gana la última respuesta.
+            user_id: UUID del usuario (opcional).
 
-            self.client.table("skill_memory").upsert(
-                data, on_conflict="user_id,skill_name"
+        Returns:
+            Número de habilidades guardadas (0 si hubo error).
+        """
+        answers = {skill.strip().lower(): answer for skill, answer in items}
+        if not answers:
+            return 0
+        try:
+            self.client.rpc(
+                "upsert_skill_answers",
+                {
+                    "p_user_id": user_id,
+                    "p_skills": list(answers),
+                    "p_answers": list(answers.values()),
+                },
             ).execute()
-            logger.info(f"Respuesta guardada para skill: {normalized_skill}")
+            logger.info("%d respuestas de skills guardadas", len(answers))
+            return len(answers)
         except Exception as e:
-            logger.error(f"Error guardando skill answer: {e}", exc_info=True)
+            logger.error(f"Error guardando skill answers: {e}", exc_info=True)
+            return 0
+        finally:
+            self.invalidate_cache()
 
     def get_skill_answer(self, skill_name: str, user_id: str | None = None) -> str | None:
         """Recupera una respuesta previa para una habilidad.
 
+        El resultado (también "no existe") se reutiliza durante ``READ_CACHE_TTL``
+        segundos o hasta la siguiente escritura de skills hecha desde la app.
+
         Args:
             skill_name: Nombre de la habilidad.
             user_id: UUID del usuario (opcional).
@@ -239,35 +542,54 @@ class CVDatabase:
         """
         try:
             normalized_skill = skill_name.strip().lower()
-            query = (
-                self.client.table("skill_memory")
-                .select("answer_text")
-                .eq("skill_name", normalized_skill)
+            return self._cached_read(
+                ("skill", user_id, normalized_skill),
+                lambda: self._load_skill_answer(normalized_skill, user_id),
             )
-            if user_id is not None:
-                query = query.eq("user_id", user_id)
-            response = query.execute()
-            rows = self._rows(response)
-            return rows[0]["answer_text"] if rows else None
         except Exception as e:
             logger.error(f"Error recuperando skill answer: {e}", exc_info=True)
             return None
 
+    def _load_skill_answer(self, normalized_skill: str, user_id: str | None) -> str | None:
+        """Consulta la respuesta de una skill en Supabase."""
+        query = (
+            self.client.table("skill_memory")
+            .select("answer_text")
+            .eq("skill_name", normalized_skill)
+        )
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        response = query.execute()
+        rows = self._rows(response)
+        return rows[0]["answer_text"] if rows else None
+
     def get_all_skill_answers(self, user_id: str | None = None) -> dict[str, str]:
         """Recupera todas las respuestas de habilidades almacenadas.
 
+        La lectura se reutiliza durante ``SKILL_CACHE_TTL`` segundos o hasta la
+        siguiente escritura de skills hecha desde la app.
+
         Args:
             user_id: UUID del usuario (opcional).
 
         Returns:
             Diccionario ``{skill_name: answer_text}``.
         """
+        with self._cache_lock:
+            cached = self._skill_answers_cache.get(user_id)
+            generation = self._cache_generation
+        if cached is not None and time.monotonic() - cached[0] < self.SKILL_CACHE_TTL:
+            return dict(cached[1])
+
         try:
-            query = self.client.table("skill_memory").select("skill_name, answer_text")
-            if user_id is not None:
-                query = query.eq("user_id", user_id)
-            response = query.execute()
-            return {row["skill_name"]: row["answer_text"] for row in self._rows(response)}
+            # Postgres arma el diccionario (jsonb_object_agg, migración 010): una
+            # sola respuesta JSON en vez de un objeto por fila
+            response = self.client.rpc("get_all_skill_answers", {"p_user_id": user_id}).execute()
+            answers: dict[str, str] = dict(response.data or {})
+            with self._cache_lock:
+                if generation == self._cache_generation:
+                    self._skill_answers_cache[user_id] = (time.monotonic(), answers)
+            return dict(answers)
         except Exception as e:
             logger.error(
                 f"Error recuperando todas las skill answers: {e}",
@@ -290,12 +612,14 @@ class CVDatabase:
             query = self.client.table("skill_memory").delete().eq("skill_name", normalized_skill)
             if user_id is not None:
                 query = query.eq("user_id", user_id)
-            response = query.execute()
-            logger.info(f"Skill eliminada de memoria: {normalized_skill}")
+            response = self._returning(query).execute()
+            logger.info("Skill eliminada de memoria: %s", normalized_skill)
             return len(self._rows(response)) > 0
         except Exception as e:
             logger.error(f"Error eliminando skill answer: {e}", exc_info=True)
             return False
+        finally:
+            self.invalidate_cache()
 
     # ------------------------------------------------------------------
     # base_cv
@@ -317,15 +641,22 @@ class CVDatabase:
             if user_id is not None:
                 data["user_id"] = user_id
 
-            self.client.table("base_cv").upsert(data, on_conflict="user_id").execute()
+            self.client.table("base_cv").upsert(
+                data, on_conflict="user_id", returning=_RETURN_MINIMAL
+            ).execute()
             logger.info("CV Base guardado exitosamente")
         except Exception as e:
             logger.error(f"Error guardando CV Base: {e}", exc_info=True)
             raise
+        finally:
+            self.invalidate_cache()
 
     def get_base_cv(self, user_id: str | None = None) -> str | None:
         """Recupera el CV base predeterminado si existe.
 
+        Se reutiliza durante ``READ_CACHE_TTL`` segundos o hasta el siguiente
+        ``save_base_cv`` hecho desde la app.
+
         Args:
             user_id: UUID del usuario (opcional).
 
@@ -333,16 +664,20 @@ class CVDatabase:
             Texto del CV base o ``None``.
         """
         try:
-            query = self.client.table("base_cv").select("cv_text")
-            if user_id is not None:
-                query = query.eq("user_id", user_id)
-            response = query.limit(1).execute()
-            rows = self._rows(response)
-            return rows[0]["cv_text"] if rows else None
+            return self._cached_read(("base_cv", user_id), lambda: self._load_base_cv(user_id))
         except Exception as e:
             logger.error(f"Error recuperando CV Base: {e}", exc_info=True)
             return None
 
+    def _load_base_cv(self, user_id: str | None) -> str | None:
+        """Consulta el CV base en Supabase."""
+        query = self.client.table("base_cv").select("cv_text")
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        response = query.limit(1).execute()
+        rows = self._rows(response)
+        return rows[0]["cv_text"] if rows else None
+
     # ------------------------------------------------------------------
     # interview_sessions
     # ------------------------------------------------------------------
@@ -374,7 +709,9 @@ class CVDatabase:
             if user_id is not None:
                 data["user_id"] = user_id
 
-            response = self.client.table("interview_sessions").insert(data).execute()
+            response = self._returning(
+                self.client.table("interview_sessions").insert(data)
+            ).execute()
             rows = self._rows(response)
             session_id: int = rows[0]["id"]
             return session_id
@@ -382,11 +719,49 @@ class CVDatabase:
             logger.error(f"Error guardando sesión de entrevista: {e}", exc_info=True)
             raise
 
+    def save_interview_sessions_bulk(
+        self,
+        cv_id: int | None,
+        qa_pairs: list[tuple[str, str]],
+        user_id: str | None = None,
+    ) -> list[int]:
+        """Guarda varias preguntas/respuestas de entrevista.
+
+        Se insertan con una petición por cada ``BULK_INSERT_CHUNK_SIZE`` filas.
+
+        Args:
+            cv_id: ID del CV asociado (puede ser ``None`` si es sesión libre).
+            qa_pairs: Pares ``(pregunta, respuesta)``.
+            user_id: UUID del usuario (opcional).
+
+        Returns:
+            IDs de los registros creados, en el mismo orden.
+        """
+        if not qa_pairs:
+            return []
+        try:
+            rows: list[dict] = []
+            for question, answer in qa_pairs:
+                data: dict = {
+                    "cv_id": cv_id,
+                    "question": question,
+                    "generated_answer": answer,
+                }
+                if user_id is not None:
+                    data["user_id"] = user_id
+                rows.append(data)
+
+            return self._insert_chunked("interview_sessions", rows)
+        except Exception as e:
+            logger.error(f"Error guardando sesiones de entrevista: {e}", exc_info=True)
+            raise
+
     def get_interview_sessions(
         self,
         cv_id: int | None = None,
         limit: int = 50,
         user_id: str | None = None,
+        columns: str = _SESSION_LIST_COLUMNS,
     ) -> list[dict]:
         """Recupera historial de entrevistas.
 
@@ -394,14 +769,46 @@ class CVDatabase:
             cv_id: Filtrar por ID de CV (opcional).
             limit: Límite de resultados.
             user_id: UUID del usuario (opcional).
+            columns: Columnas a traer. Por defecto no incluye la respuesta
+                generada (``generated_answer``); usar ``"*"`` para la fila completa.
 
         Returns:
             Lista de sesiones.
         """
-        query = self.client.table("interview_sessions").select("*")
+        query = self.client.table("interview_sessions").select(columns)
         if cv_id is not None:
             query = query.eq("cv_id", cv_id)
         if user_id is not None:
             query = query.eq("user_id", user_id)
         response = query.order("created_at", desc=True).limit(limit).execute()
         return self._rows(response)
+
+    # ------------------------------------------------------------------
+    # Variantes async
+    # ------------------------------------------------------------------
+    # Cada lectura corre en un hilo sobre el mismo cliente (y su pool HTTP/2),
+    # así varias consultas con asyncio.gather no se serializan. Se mantiene
+    # PostgREST en vez de una conexión directa a Postgres para que RLS siga
+    # aplicando con el JWT del usuario.
+
+    async def a_get_all_cvs(self, user_id: str | None = None) -> list[dict]:
+        """Versión async de ``get_all_cvs``."""
+        return await asyncio.to_thread(self.get_all_cvs, user_id)
+
+    async def a_get_interview_sessions(
+        self,
+        cv_id: int | None = None,
+        limit: int = 50,
+        user_id: str | None = None,
+        columns: str = _SESSION_LIST_COLUMNS,
+    ) -> list[dict]:
+        """Versión async de ``get_interview_sessions``."""
+        return await asyncio.to_thread(self.get_interview_sessions, cv_id, limit, user_id, columns)
+
+    async def a_get_skill_answer(self, skill_name: str, user_id: str | None = None) -> str | None:
+        """Versión async de ``get_skill_answer``."""
+        return await asyncio.to_thread(self.get_skill_answer, skill_name, user_id)
+
+    async def a_get_base_cv(self, user_id: str | None = None) -> str | None:
+        """Versión async de ``get_base_cv``."""
+        return await asyncio.to_thread(self.get_base_cv, user_id)
@@ -7,9 +7,12 @@ RenderCV para generar PDFs profesionales a partir de archivos YAML de CVs.
 import os
 import shutil
 import pathlib
+import uuid
 from pathlib import Path
 from typing import Optional
 
+import xxhash
+
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -188,6 +191,33 @@ class PDFRenderer:
         """Renderiza contenido YAML (como string) a PDF (método de conveniencia)."""
         return self.render(yaml_content=yaml_string, output_filename=output_filename)
 
+    def render_from_string_cached(self, yaml_string: str) -> str:
+        """
+        Renderiza contenido YAML reutilizando el PDF si ya se generó antes.
+
+        El nombre del archivo es el xxh3 (128 bits) del YAML, así un contenido idéntico
+        apunta al mismo PDF y no vuelve a pasar por RenderCV/Typst. Se renderiza a un
+        nombre temporal y se renombra al final, así un render interrumpido nunca
+        deja un PDF a medias con el nombre definitivo.
+        """
+        digest = xxhash.xxh3_128_hexdigest(yaml_string.encode("utf-8"))
+        output_filename = f"cv_{digest}"
+        pdf_path = self.output_dir / f"{output_filename}.pdf"
+
+        if pdf_path.is_file() and pdf_path.stat().st_size > 0:
+            logger.info(f"Reutilizando PDF ya renderizado: {pdf_path}")
+            return str(pdf_path.absolute())
+
+        tmp_filename = f"{output_filename}.tmp-{uuid.uuid4().hex[:8]}"
+        tmp_path = self.output_dir / f"{tmp_filename}.pdf"
+        try:
+            self.render(yaml_content=yaml_string, output_filename=tmp_filename)
+            # rename atómico (mismo directorio): los lectores ven el PDF completo o nada
+            tmp_path.replace(pdf_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return str(pdf_path.absolute())
+
     def batch_render(
         self, yaml_files: list[str | Path], output_dir: str | Path | None = None
     ) -> list[str]:
@@ -4,6 +4,8 @@ Sistema centralizado de prompts para Gemini AI.
 Este módulo gestiona todos los templates de prompts utilizados en la aplicación,
 facilitando su mantenimiento, internacionalización y testing.
 """
+import functools
+import string
 from typing import Optional, List
 
 
@@ -427,6 +429,58 @@ Ejemplo 3 (para Full Stack Developer):
 **IMPORTANTE:** Siempre mantén la categoría "Idiomas" al FINAL de la lista.
 
 **Genera el JSON (solo el array, sin explicaciones):**
+"""
+
+    # 5b. Resumen + Priorización de Habilidades (una sola llamada)
+    SUMMARY_AND_SKILL_PRIORITIZATION = """Eres un experto en redacción de CVs optimizados para ATS. Realiza DOS tareas para el mismo candidato y la misma vacante.
+
+**Descripción de la vacante:**
+```
+{job_description}
+```
+
+**Cargo al que aplica:**
+{job_title}
+
+**Requisitos must-have del cargo:**
+{must_have_skills}
+
+**Perfil del candidato:**
+- Educación: {education_summary}
+- Experiencia clave: {experience_summary}
+- Habilidades técnicas principales: {skills_summary}
+- Años de experiencia: {years_experience}
+
+**Habilidades actuales del CV:**
+{current_skills}
+
+**TAREA 1 - RESUMEN PROFESIONAL:**
+1. Escribe un resumen de 3-5 oraciones en {language}
+2. ENFOCA el resumen al cargo específico (menciona el tipo de rol: ej. "Desarrollador Python", "Ingeniero de Datos")
+3. DESTACA las habilidades must-have que el candidato TIENE
+4. Incluye años de experiencia si es relevante
+5. Menciona tecnologías clave que coinciden con la vacante
+6. Hazlo impactante pero profesional, sin exageraciones ni lenguaje genérico como "profesional altamente motivado"
+
+**TAREA 2 - PRIORIZACIÓN DE HABILIDADES:**
+1. Reorganiza las habilidades actuales en categorías lógicas
+2. PRIORIZA las categorías que contengan must-haves del cargo
+3. Dentro de cada categoría, lista primero las skills must-have
+4. Usa nombres de categorías específicos al cargo (ej: "Desarrollo Web" en lugar de genérico "Frameworks")
+5. Mantén siempre la categoría "Idiomas" al FINAL de la lista
+
+**FORMATO DE SALIDA (JSON estricto):**
+{{
+    "summary": "texto del resumen profesional",
+    "skills": [
+        {{
+            "label": "Nombre de categoría (priorizada según cargo)",
+            "details": "skill1, skill2, skill3, ..."
+        }}
+    ]
+}}
+
+Retorna SOLO el JSON válido, sin texto adicional ni explicaciones
 """
 
     # 6. Estructuración de Datos (para YAML)
@@ -599,6 +653,41 @@ INSTRUCCIONES CRÍTICAS PARA CVs EN ESPAÑOL:
 6. Retorna SOLO el JSON válido, sin texto adicional ni explicaciones
 """
 
+    # 6b. Estructuración + Clasificación de Respuestas (una sola llamada)
+    STRUCTURING_AND_CLASSIFICATION = DATA_STRUCTURING.replace(
+        "6. Retorna SOLO el JSON válido, sin texto adicional ni explicaciones\n", ""
+    ) + """
+**TAREA ADICIONAL - CLASIFICACIÓN DE RESPUESTAS DEL USUARIO:**
+Además de estructurar el CV, clasifica cada una de estas respuestas sobre su experiencia.
+Las empresas conocidas son las que extrajiste en "experience"; usa exactamente ese nombre en "company_name".
+
+**Respuestas a clasificar:**
+{user_answers_json}
+
+Clasifica cada respuesta en UNA de estas categorías:
+1. **EXPERIENCIA_LABORAL:** Si menciona que usó la skill en una empresa/trabajo
+2. **PROYECTO_ACADEMICO:** Si menciona universidad, curso, tesis, proyecto académico
+3. **PROYECTO_PERSONAL:** Si menciona proyecto personal, freelance, independiente
+4. **NO_APLICABLE:** Si dice que NO tiene experiencia (ej: "no tengo experiencia") o la respuesta es muy vaga
+
+**FORMATO DE SALIDA FINAL (JSON estricto):**
+{{
+    "structured": {{ ...objeto completo según el JSON Schema anterior... }},
+    "classifications": [
+        {{
+            "skill": "nombre de la skill",
+            "classification": "EXPERIENCIA_LABORAL" | "PROYECTO_ACADEMICO" | "PROYECTO_PERSONAL" | "NO_APLICABLE",
+            "company_name": "nombre empresa" o null,
+            "project_name": "nombre proyecto extraído del contexto" o "Proyecto con {{skill_name}}" si es genérico,
+            "description": "descripción limpia de lo que hizo con la skill",
+            "confidence": "high" | "medium" | "low"
+        }}
+    ]
+}}
+
+Retorna SOLO el JSON válido, sin texto adicional ni explicaciones
+"""
+
 
     # 7. Generación de Respuesta de Entrevista (AI Proxy)
     INTERVIEW_ANSWER_GENERATION = """Eres {user_name}, un profesional postulando a un cargo. Tu tarea es responder una pregunta de entrevista en primera persona ("yo"), basándote estrictamente en tu perfil real.
@@ -628,10 +717,93 @@ INSTRUCCIONES CRÍTICAS PARA CVs EN ESPAÑOL:
 **Respuesta:**
 """
 
+    # 8. Verificación de equivalencia (zona gris del cache semántico)
+    PROMPT_EQUIVALENCE_CHECK = """Compara estas dos solicitudes. ¿Una respuesta correcta para la solicitud A sería igualmente correcta, sin cambios, para la solicitud B?
+
+**Solicitud A:**
+{prompt_a}
+
+**Solicitud B:**
+{prompt_b}
+
+Responde SOLO "SI" o "NO"."""
+
+
+def _compile_template(template: str) -> tuple[tuple[str, Optional[str]], ...]:
+    """
+    Pre-parsea un template estilo ``str.format`` en pares (literal, campo).
+
+    ``str.format`` vuelve a escanear el template (y a resolver los ``{{ }}``)
+    en cada llamada; con los pares ya separados, renderizar es solo un join.
+    """
+    return tuple(
+        (literal, field_name)
+        for literal, field_name, _format_spec, _conversion in string.Formatter().parse(template)
+    )
+
+
+# Templates compilados una sola vez al importar el módulo
+_COMPILED_TEMPLATES: dict[str, tuple[tuple[str, Optional[str]], ...]] = {
+    name: _compile_template(value)
+    for name, value in vars(PromptTemplates).items()
+    if name.isupper() and isinstance(value, str)
+}
+
+
+def _render_around(template_name: str, field: str, values: dict) -> tuple[str, str]:
+    """Renderiza un template partido en el campo ``field``: (antes, después)."""
+    parts = _COMPILED_TEMPLATES[template_name]
+    split = next(i for i, (_literal, field_name) in enumerate(parts) if field_name == field)
+
+    def _join(pairs) -> str:
+        return "".join(
+            literal if field_name is None else literal + str(values[field_name])
+            for literal, field_name in pairs
+        )
+
+    return _join(parts[:split]) + parts[split][0], _join(parts[split + 1:])
+
+
+@functools.lru_cache(maxsize=32)
+def _interview_answer_frame(
+    user_name: str,
+    cv_context: str,
+    skill_memory_context: str,
+    job_description: str,
+    tone: str,
+) -> tuple[str, str]:
+    """Prompt de entrevista sin la pregunta, cacheado por contexto de la sesión."""
+    return _render_around(
+        "INTERVIEW_ANSWER_GENERATION",
+        "question",
+        {
+            "user_name": user_name,
+            "cv_context": cv_context,
+            "skill_memory_context": skill_memory_context,
+            "job_description": job_description,
+            "tone": tone,
+        },
+    )
+
 
 class PromptManager:
     """Gestor para construir prompts con validación de variables."""
 
+    @staticmethod
+    def render(template_name: str, **values) -> str:
+        """
+        Renderiza un template de ``PromptTemplates`` ya compilado.
+
+        Equivale a ``getattr(PromptTemplates, template_name).format(**values)``.
+
+        Raises:
+            KeyError: Si el template no existe o falta alguna variable.
+        """
+        return "".join(
+            literal if field_name is None else literal + str(values[field_name])
+            for literal, field_name in _COMPILED_TEMPLATES[template_name]
+        )
+
     @staticmethod
     def get_interview_answer_prompt(
         user_name: str,
@@ -641,20 +813,27 @@ class PromptManager:
         question: str,
         tone: str = "Profesional"
     ) -> str:
-        """Construye el prompt para el asistente de entrevista."""
-        return PromptTemplates.INTERVIEW_ANSWER_GENERATION.format(
-            user_name=user_name,
-            cv_context=cv_context,
-            skill_memory_context=skill_memory_context,
-            job_description=job_description,
-            question=question,
-            tone=tone
+        """Construye el prompt para el asistente de entrevista.
+
+        El contexto (CV, skills, vacante, tono) cambia poco entre preguntas: el
+        prompt alrededor de la pregunta se renderiza una vez y se reutiliza.
+        """
+        prefix, suffix = _interview_answer_frame(
+            user_name, cv_context, skill_memory_context, job_description, tone
+        )
+        return prefix + question + suffix
+
+    @staticmethod
+    def get_prompt_equivalence_prompt(prompt_a: str, prompt_b: str) -> str:
+        """Construye el prompt que verifica si dos solicitudes admiten la misma respuesta."""
+        return PromptManager.render(
+            "PROMPT_EQUIVALENCE_CHECK", prompt_a=prompt_a, prompt_b=prompt_b
         )
 
     @staticmethod
     def get_job_analysis_prompt(job_description: str) -> str:
         """Construye el prompt de análisis de vacante."""
-        return PromptTemplates.JOB_ANALYSIS.format(job_description=job_description)
+        return PromptManager.render("JOB_ANALYSIS", job_description=job_description)
 
     @staticmethod
     def get_question_generation_prompt(
@@ -665,7 +844,8 @@ class PromptManager:
         language: str = "en español",
     ) -> str:
         """Construye el prompt de generación de preguntas."""
-        return PromptTemplates.QUESTION_GENERATION.format(
+        return PromptManager.render(
+            "QUESTION_GENERATION",
             gaps_summary=gaps_summary,
             cv_summary=cv_summary,
             job_summary=job_summary,
@@ -683,7 +863,8 @@ class PromptManager:
         companies_text = ", ".join(known_companies) if known_companies else "Ninguna empresa conocida"
         answers_json = json.dumps(user_answers_list, ensure_ascii=False, indent=2)
         
-        return PromptTemplates.BATCH_USER_RESPONSE_CLASSIFIER.format(
+        return PromptManager.render(
+            "BATCH_USER_RESPONSE_CLASSIFIER",
             user_answers_json=answers_json,
             known_companies=companies_text
         )
@@ -696,7 +877,8 @@ class PromptManager:
     ) -> str:
         """Construye el prompt para clasificar respuestas del usuario."""
         companies_text = ", ".join(known_companies) if known_companies else "Ninguna empresa conocida"
-        return PromptTemplates.USER_RESPONSE_CLASSIFIER.format(
+        return PromptManager.render(
+            "USER_RESPONSE_CLASSIFIER",
             skill_name=skill_name,
             user_answer=user_answer,
             known_companies=companies_text
@@ -711,7 +893,8 @@ class PromptManager:
         language: str = "español"
     ) -> str:
         """Construye el prompt para generar entrada de proyecto."""
-        return PromptTemplates.PROJECT_ENTRY_GENERATION.format(
+        return PromptManager.render(
+            "PROJECT_ENTRY_GENERATION",
             project_name=project_name,
             project_type=project_type,
             main_skill=main_skill,
@@ -730,7 +913,8 @@ class PromptManager:
         language: str = "español"
     ) -> str:
         """Construye el prompt para enriquecer experiencia con respuestas del usuario."""
-        return PromptTemplates.EXPERIENCE_ENRICHMENT.format(
+        return PromptManager.render(
+            "EXPERIENCE_ENRICHMENT",
             position=position,
             company=company,
             duration=duration,
@@ -750,7 +934,8 @@ class PromptManager:
         language: str = "en español",
     ) -> str:
         """Construye el prompt de reescritura de experiencia."""
-        return PromptTemplates.EXPERIENCE_REWRITE.format(
+        return PromptManager.render(
+            "EXPERIENCE_REWRITE",
             title=title,
             company=company,
             original_description=original_description,
@@ -770,7 +955,8 @@ class PromptManager:
         language: str = "español"
     ) -> str:
         """Construye el prompt para generar resumen profesional enfocado al cargo."""
-        return PromptTemplates.SUMMARY_GENERATION.format(
+        return PromptManager.render(
+            "SUMMARY_GENERATION",
             job_description=job_description,
             education_summary=education_summary,
             experience_summary=experience_summary,
@@ -787,16 +973,61 @@ class PromptManager:
         job_title: str
     ) -> str:
         """Construye el prompt para priorizar habilidades según el cargo."""
-        return PromptTemplates.SKILL_PRIORITIZATION.format(
+        return PromptManager.render(
+            "SKILL_PRIORITIZATION",
             current_skills=current_skills,
             must_have_skills=must_have_skills,
             job_title=job_title
         )
 
+    @staticmethod
+    def get_summary_and_skill_prioritization_prompt(
+        job_description: str,
+        education_summary: str,
+        experience_summary: str,
+        skills_summary: str,
+        years_experience: str,
+        must_have_skills: str,
+        current_skills: str,
+        job_title: str,
+        language: str = "español"
+    ) -> str:
+        """Construye el prompt que genera el resumen y prioriza las habilidades a la vez."""
+        return PromptManager.render(
+            "SUMMARY_AND_SKILL_PRIORITIZATION",
+            job_description=job_description,
+            education_summary=education_summary,
+            experience_summary=experience_summary,
+            skills_summary=skills_summary,
+            years_experience=years_experience,
+            must_have_skills=must_have_skills,
+            current_skills=current_skills,
+            job_title=job_title,
+            language=language
+        )
+
     @staticmethod
     def get_data_structuring_prompt(cv_text: str, language: str = "Español") -> str:
         """Construye el prompt para estructurar datos del CV con traducción al idioma objetivo."""
-        return PromptTemplates.DATA_STRUCTURING.format(
+        return PromptManager.render(
+            "DATA_STRUCTURING",
             cv_text=cv_text,
             language=language
         )
+
+    @staticmethod
+    def get_combined_structuring_and_classification_prompt(
+        cv_text: str,
+        user_answers_list: list[dict],
+        language: str = "Español"
+    ) -> str:
+        """Construye el prompt que estructura el CV y clasifica las respuestas del usuario a la vez."""
+        import json
+        answers_json = json.dumps(user_answers_list, ensure_ascii=False, indent=2)
+
+        return PromptManager.render(
+            "STRUCTURING_AND_CLASSIFICATION",
+            cv_text=cv_text,
+            user_answers_json=answers_json,
+            language=language
+        )
@@ -0,0 +1,249 @@
+"""
+Cache semántico de respuestas de Gemini.
+
+Reutiliza la respuesta de un prompt previo cuando el nuevo prompt es casi
+idéntico en significado (misma plantilla y valores muy parecidos). Los prompts
+se representan con embeddings normalizados, así la similitud coseno es un
+producto punto contra la matriz de embeddings guardados.
+
+Verificación en dos etapas:
+    - similitud >= ``hit_threshold``: hit directo.
+    - ``verify_threshold`` <= similitud < ``hit_threshold``: zona gris; solo es
+      hit si ``verify(prompt, prompt_cacheado)`` lo confirma.
+    - similitud < ``verify_threshold``: miss.
+
+Los prompts más largos que la secuencia máxima del embedder no se cachean:
+el modelo trunca la entrada y dos prompts que solo difieren al final
+tendrían el mismo embedding.
+
+Requiere las dependencias opcionales de ``requirements-semantic.txt``.
+"""
+
+import json
+import threading
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+EmbedFn = Callable[[Sequence[str]], "np.ndarray"]
+TokenCountFn = Callable[[str], int]
+VerifyFn = Callable[[str, str], bool]
+
+
+def _load_default_embedder(
+    model_name: str = DEFAULT_EMBEDDING_MODEL,
+) -> tuple[EmbedFn, TokenCountFn, int]:
+    """
+    Carga un embedder local de sentence-transformers (import diferido).
+
+    Returns:
+        Tupla (embedder, contador de tokens del tokenizer, secuencia máxima del modelo)
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "sentence-transformers no está instalado. "
+            "Ejecuta: pip install -r requirements-semantic.txt"
+        ) from e
+
+    model = SentenceTransformer(model_name)
+
+    def embed(texts: Sequence[str]) -> np.ndarray:
+        return model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+
+    def count_tokens(text: str) -> int:
+        # +2 por los tokens especiales [CLS] y [SEP]
+        return len(model.tokenizer.tokenize(text)) + 2
+
+    return embed, count_tokens, model.max_seq_length
+
+
+class SemanticCache:
+    """
+    Cache de respuestas indexado por similitud de embeddings.
+
+    Attributes:
+        hit_threshold: Similitud mínima para un hit directo.
+        verify_threshold: Similitud mínima para consultar ``verify`` (zona gris).
+        persist_path: Archivo base para persistir el índice (``.npy`` + ``.json``).
+        max_tokens: Tokens máximos de un prompt cacheable (None: sin límite).
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn | None = None,
+        hit_threshold: float = 0.97,
+        verify_threshold: float = 0.88,
+        persist_path: str | Path | None = None,
+        count_tokens: TokenCountFn | None = None,
+        max_tokens: int | None = None,
+    ):
+        """
+        Inicializa el cache.
+
+        Args:
+            embed_fn: Función que convierte textos en embeddings normalizados.
+                Si no se proporciona, se usa sentence-transformers (all-MiniLM-L6-v2)
+            hit_threshold: Similitud para hit directo
+            verify_threshold: Similitud mínima de la zona gris
+            persist_path: Ruta base para guardar/cargar el índice en disco
+            count_tokens: Cuenta los tokens de un prompt con el tokenizer del embedder.
+                Con el embedder por defecto se usa el de sentence-transformers
+            max_tokens: Largo máximo (en tokens) de los prompts que se cachean.
+                Con el embedder por defecto es su ``max_seq_length``
+        """
+        if embed_fn is None:
+            embed_fn, default_count, default_max = _load_default_embedder()
+            count_tokens = count_tokens or default_count
+            max_tokens = max_tokens if max_tokens is not None else default_max
+        self._embed = embed_fn
+        self._count_tokens = count_tokens or (lambda text: len(text.split()))
+        self.max_tokens = max_tokens
+        self.hit_threshold = hit_threshold
+        self.verify_threshold = verify_threshold
+        self.persist_path = Path(persist_path) if persist_path else None
+
+        self._lock = threading.Lock()
+        self._embeddings: np.ndarray | None = None
+        self._entries: list[dict[str, str]] = []
+        # El directorio de persistencia se crea en el primer guardado, no en cada uno
+        self._persist_dir_ready = False
+
+        if self.persist_path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def fits(self, prompt: str) -> bool:
+        """Indica si el embedder ve el prompt completo (sin truncarlo)."""
+        return self.max_tokens is None or self._count_tokens(prompt) <= self.max_tokens
+
+    def lookup(self, prompt: str, scope: str = "", verify: VerifyFn | None = None) -> str | None:
+        """
+        Busca una respuesta cacheada para un prompt semánticamente equivalente.
+
+        Args:
+            prompt: Prompt a resolver
+            scope: Solo se consideran entradas guardadas con el mismo scope
+                (p. ej. el modelo y la configuración de generación)
+            verify: Confirmación para la zona gris; sin ella la zona gris es miss
+
+        Returns:
+            Texto cacheado o None si no hay una entrada suficientemente similar
+        """
+        return self.lookup_many([prompt], scope=scope, verify=verify)[0]
+
+    def lookup_many(
+        self, prompts: Sequence[str], scope: str = "", verify: VerifyFn | None = None
+    ) -> list[str | None]:
+        """
+        Igual que ``lookup`` para varios prompts: un solo llamado al embedder y
+        un solo producto matricial contra el índice.
+
+        Returns:
+            Texto cacheado (o None) por cada prompt, en el mismo orden
+        """
+        results: list[str | None] = [None] * len(prompts)
+        # Los prompts que el embedder truncaría nunca son hit
+        candidates = [i for i, prompt in enumerate(prompts) if self.fits(prompt)]
+        if not candidates:
+            return results
+        with self._lock:
+            if self._embeddings is None:
+                return results
+            embeddings, entries = self._embeddings, list(self._entries)
+
+        queries = np.asarray(self._embed([prompts[i] for i in candidates]), dtype=np.float32)
+        scores = queries @ embeddings.T
+        for i, row in zip(candidates, scores, strict=True):
+            results[i] = self._best_match(prompts[i], row, entries, scope, verify)
+        return results
+
+    def _best_match(
+        self,
+        prompt: str,
+        scores: np.ndarray,
+        entries: list[dict[str, str]],
+        scope: str,
+        verify: VerifyFn | None,
+    ) -> str | None:
+        """Elige la entrada cacheada para ``prompt`` a partir de sus similitudes."""
+        # Mejores candidatos primero (top 5 como en un IndexFlatIP)
+        for idx in np.argsort(scores)[::-1][:5]:
+            score = float(scores[idx])
+            if score < self.verify_threshold:
+                break
+            entry = entries[idx]
+            if entry["scope"] != scope:
+                continue
+            if score >= self.hit_threshold:
+                logger.debug(f"Cache semántico: hit directo ({score:.3f})")
+                return entry["text"]
+            if verify is None:
+                continue
+            if verify(prompt, entry["prompt"]):
+                logger.debug(f"Cache semántico: hit verificado ({score:.3f})")
+                return entry["text"]
+            # Cada verificación es una llamada a la API: si el mejor candidato de la
+            # zona gris no es equivalente, los siguientes (menos similares) tampoco
+            break
+        return None
+
+    def add(self, prompt: str, text: str, scope: str = "") -> None:
+        """Guarda la respuesta ``text`` para ``prompt`` dentro de ``scope``."""
+        self.add_many([prompt], [text], scope=scope)
+
+    def add_many(self, prompts: Sequence[str], texts: Sequence[str], scope: str = "") -> None:
+        """Guarda varias respuestas con un solo llamado al embedder (omite prompts largos)."""
+        pairs = [
+            (prompt, text) for prompt, text in zip(prompts, texts, strict=True) if self.fits(prompt)
+        ]
+        if not pairs:
+            return
+        prompts, texts = [p for p, _ in pairs], [t for _, t in pairs]
+        new_embeddings = np.asarray(self._embed(list(prompts)), dtype=np.float32)
+        with self._lock:
+            self._embeddings = (
+                new_embeddings
+                if self._embeddings is None
+                else np.vstack([self._embeddings, new_embeddings])
+            )
+            self._entries.extend(
+                {"prompt": prompt, "text": text, "scope": scope}
+                for prompt, text in zip(prompts, texts, strict=True)
+            )
+            if self.persist_path:
+                self._save()
+
+    def _save(self) -> None:
+        """Persiste embeddings y textos (llamar con el lock tomado)."""
+        if not self._persist_dir_ready:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            self._persist_dir_ready = True
+        np.save(self.persist_path.with_suffix(".npy"), self._embeddings)
+        self.persist_path.with_suffix(".json").write_text(
+            json.dumps(self._entries, ensure_ascii=False), encoding="utf-8"
+        )
+
+    def _load(self) -> None:
+        """Carga el índice persistido si existe."""
+        npy_path = self.persist_path.with_suffix(".npy")
+        json_path = self.persist_path.with_suffix(".json")
+        if not (npy_path.exists() and json_path.exists()):
+            return
+        try:
+            self._embeddings = np.load(npy_path)
+            self._entries = json.loads(json_path.read_text(encoding="utf-8"))
+            logger.info(f"Cache semántico cargado: {len(self._entries)} entradas")
+        except Exception as e:
+            logger.warning(f"No se pudo cargar el cache semántico: {e}")
+            self._embeddings, self._entries = None, []
@@ -9,10 +9,14 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from src.logger import get_logger
-from supabase import Client, create_client
+
+if TYPE_CHECKING:
+    # supabase (postgrest, gotrue, httpx...) tarda ~0.5 s en importarse: se
+    # importa al crear el primer cliente
+    from supabase import Client
 
 logger = get_logger(__name__)
 
@@ -89,6 +93,8 @@ class TokenTracker:
                 raise ValueError(
                     "Las variables de entorno SUPABASE_URL y SUPABASE_KEY son requeridas."
                 )
+            from supabase import create_client
+
             TokenTracker._client = create_client(url, key)
         self.client: Client = TokenTracker._client
 
@@ -494,7 +494,7 @@ class YAMLGenerator:
         from src.cv_parser import CVData
         cv_data = CVData(
             raw_text=cv_text,
-            sections={},
+            sections_mask=0,
             metadata={"format": "text"}
         )
 
@@ -615,7 +615,7 @@ class YAMLGenerator:
         from src.cv_parser import CVData
         cv_data = CVData(
             raw_text="",
-            sections={},
+            sections_mask=0,
             metadata={"format": "structured"}
         )
 
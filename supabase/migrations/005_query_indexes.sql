@@ -0,0 +1,30 @@
+-- ============================================================
+-- CV-App: Índices para los ORDER BY / WHERE de CVDatabase
+-- ============================================================
+-- cv_history ya tiene (user_id, created_at DESC) para el listado de
+-- un usuario; faltaban los accesos sin filtro de usuario (admin) y
+-- el filtro por CV de interview_sessions.
+-- ============================================================
+
+-- --------------------------------------------------------
+-- 1. cv_history: get_all_cvs() sin user_id
+-- --------------------------------------------------------
+-- ORDER BY created_at DESC se resuelve recorriendo el índice en
+-- vez de ordenar toda la tabla; id desempata filas con la misma fecha.
+CREATE INDEX IF NOT EXISTS idx_cv_history_created
+    ON cv_history (created_at DESC, id DESC);
+
+-- --------------------------------------------------------
+-- 2. interview_sessions: get_interview_sessions(cv_id=...)
+-- --------------------------------------------------------
+-- Filtro por cv_id + ORDER BY created_at DESC + LIMIT sin sort.
+-- También cubre el ON DELETE CASCADE desde cv_history, que sin
+-- índice recorre toda la tabla por cada CV borrado.
+CREATE INDEX IF NOT EXISTS idx_interview_sessions_cv_created
+    ON interview_sessions (cv_id, created_at DESC);
+
+-- --------------------------------------------------------
+-- 3. Estadísticas para el planner
+-- --------------------------------------------------------
+ANALYZE cv_history;
+ANALYZE interview_sessions;
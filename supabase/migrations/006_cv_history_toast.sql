@@ -0,0 +1,17 @@
+-- ============================================================
+-- CV-App: Textos grandes de cv_history fuera de la fila (TOAST)
+-- ============================================================
+-- yaml_content, original_cv, job_description, gap_analysis y
+-- questions_asked pueden ocupar varios KB. PostgreSQL solo los
+-- mueve a la tabla TOAST cuando la fila supera ~2 KB
+-- (toast_tuple_target por defecto), así que los CVs medianos
+-- quedan dentro del heap y el listado de get_all_cvs(), que solo
+-- lee metadatos, recorre más páginas de las necesarias.
+--
+-- Con un target bajo los textos se comprimen / sacan de la fila
+-- y el heap queda con filas de metadatos pequeñas. Aplica a las
+-- filas escritas desde ahora (las existentes se reescriben al
+-- actualizarse o con VACUUM FULL cv_history).
+-- ============================================================
+
+ALTER TABLE cv_history SET (toast_tuple_target = 256);
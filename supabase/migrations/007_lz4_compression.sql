@@ -0,0 +1,21 @@
+-- ============================================================
+-- CV-App: Compresión lz4 para los textos grandes
+-- ============================================================
+-- PostgreSQL comprime los valores TOAST con pglz por defecto.
+-- lz4 (PostgreSQL 14+) comprime y sobre todo descomprime bastante
+-- más rápido con un ratio similar en texto como YAML / CVs.
+-- Aplica a los valores escritos desde ahora; los existentes
+-- siguen siendo legibles con pglz.
+-- ============================================================
+
+ALTER TABLE cv_history
+    ALTER COLUMN yaml_content    SET COMPRESSION lz4,
+    ALTER COLUMN original_cv     SET COMPRESSION lz4,
+    ALTER COLUMN job_description SET COMPRESSION lz4,
+    ALTER COLUMN gap_analysis    SET COMPRESSION lz4;
+
+ALTER TABLE base_cv
+    ALTER COLUMN cv_text SET COMPRESSION lz4;
+
+ALTER TABLE interview_sessions
+    ALTER COLUMN generated_answer SET COMPRESSION lz4;
@@ -0,0 +1,39 @@
+-- ============================================================
+-- CV-App: Ajustes de autovacuum / estadísticas por tabla
+-- ============================================================
+-- Con los valores por defecto (20% de filas muertas para VACUUM,
+-- 10% de cambios para ANALYZE) las tablas que crecen poco a poco
+-- tardan mucho en refrescar estadísticas y las que se actualizan
+-- en cada guardado acumulan filas muertas.
+-- ============================================================
+
+-- --------------------------------------------------------
+-- 1. Tablas actualizadas en cada guardado (upsert)
+-- --------------------------------------------------------
+-- save_skill_answer / save_base_cv reescriben la fila entera. Con
+-- espacio libre en la página (fillfactor) las actualizaciones son
+-- HOT: no tocan los índices, porque ninguna columna modificada
+-- (answer_text, cv_text, updated_at, usage_count) está indexada.
+ALTER TABLE skill_memory SET (
+    fillfactor = 80,
+    autovacuum_vacuum_scale_factor = 0.05,
+    autovacuum_analyze_scale_factor = 0.05
+);
+
+ALTER TABLE base_cv SET (
+    fillfactor = 70,
+    autovacuum_vacuum_scale_factor = 0.05
+);
+
+-- --------------------------------------------------------
+-- 2. Tablas de solo inserción que crecen con el historial
+-- --------------------------------------------------------
+-- Estadísticas frescas para que el planner siga eligiendo los
+-- índices de created_at / cv_id a medida que crece el historial.
+ALTER TABLE cv_history SET (
+    autovacuum_analyze_scale_factor = 0.02
+);
+
+ALTER TABLE interview_sessions SET (
+    autovacuum_analyze_scale_factor = 0.02
+);
@@ -0,0 +1,30 @@
+-- ============================================================
+-- CV-App: Upsert atómico de skill_memory
+-- ============================================================
+-- save_skill_answer() leía usage_count y luego hacía el upsert:
+-- dos peticiones HTTP y una carrera (dos guardados simultáneos
+-- perdían un incremento). Esta función hace ambas cosas en un
+-- solo INSERT ... ON CONFLICT.
+--
+-- SECURITY INVOKER (por defecto): las políticas RLS de
+-- skill_memory siguen aplicando a quien la llama.
+-- El conflicto usa UNIQUE NULLS NOT DISTINCT (user_id, skill_name),
+-- así que también funciona con p_user_id NULL.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION public.upsert_skill_answer(
+    p_user_id UUID,
+    p_skill   TEXT,
+    p_answer  TEXT
+)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    INSERT INTO skill_memory (user_id, skill_name, answer_text, usage_count, updated_at)
+    VALUES (p_user_id, lower(btrim(p_skill)), p_answer, 1, NOW())
+    ON CONFLICT (user_id, skill_name) DO UPDATE
+        SET answer_text = EXCLUDED.answer_text,
+            usage_count = skill_memory.usage_count + 1,
+            updated_at  = NOW()
+    RETURNING id;
+$$;
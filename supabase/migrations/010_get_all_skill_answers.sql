@@ -0,0 +1,21 @@
+-- ============================================================
+-- CV-App: Memoria de skills como un solo objeto JSON
+-- ============================================================
+-- get_all_skill_answers() recibía una fila JSON por skill y
+-- armaba el diccionario en Python. Esta función devuelve
+-- directamente {skill_name: answer_text} en una sola respuesta.
+--
+-- Misma semántica que la consulta anterior: con p_user_id NULL
+-- no se filtra por usuario (RLS sigue restringiendo las filas,
+-- la función es SECURITY INVOKER).
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION public.get_all_skill_answers(p_user_id UUID)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT coalesce(jsonb_object_agg(skill_name, answer_text), '{}'::jsonb)
+    FROM skill_memory
+    WHERE p_user_id IS NULL OR user_id = p_user_id;
+$$;
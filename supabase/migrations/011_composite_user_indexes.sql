@@ -0,0 +1,38 @@
+-- ============================================================
+-- CV-App: Índices compuestos por usuario
+-- ============================================================
+-- Las lecturas de CVDatabase filtran por user_id (explícito o vía
+-- RLS) y además por cv_id / created_at. Ya existían:
+--   * cv_history (user_id, created_at DESC)   -> 001
+--   * skill_memory UNIQUE (user_id, skill_name) -> 001 (on_conflict)
+--   * base_cv UNIQUE (user_id)                -> 001 (on_conflict)
+-- Faltaba el equivalente en interview_sessions, que solo tenía
+-- (user_id) y obligaba a ordenar por created_at tras el filtro.
+--
+-- Sin CONCURRENTLY: las migraciones se aplican dentro de una
+-- transacción y CREATE INDEX CONCURRENTLY no lo admite. Las tablas
+-- son pequeñas, el bloqueo de escritura dura poco.
+-- ============================================================
+
+-- --------------------------------------------------------
+-- 1. interview_sessions: get_interview_sessions(user_id, cv_id)
+-- --------------------------------------------------------
+-- WHERE user_id = $1 AND cv_id = $2 ORDER BY created_at DESC LIMIT n
+-- se resuelve recorriendo el índice, sin sort.
+CREATE INDEX IF NOT EXISTS idx_interview_sessions_user_cv_created
+    ON interview_sessions (user_id, cv_id, created_at DESC);
+
+-- Historial de entrevistas de un usuario sin filtro de CV.
+CREATE INDEX IF NOT EXISTS idx_interview_sessions_user_created
+    ON interview_sessions (user_id, created_at DESC);
+
+-- --------------------------------------------------------
+-- 2. Índices de una columna ya cubiertos por un prefijo
+-- --------------------------------------------------------
+-- (user_id) es prefijo de los índices compuestos; mantenerlos solo
+-- añade coste a cada INSERT / UPDATE.
+DROP INDEX IF EXISTS idx_interview_sessions_user;
+DROP INDEX IF EXISTS idx_skill_memory_user;
+
+ANALYZE interview_sessions;
+ANALYZE skill_memory;
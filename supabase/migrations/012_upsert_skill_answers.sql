@@ -0,0 +1,31 @@
+-- ============================================================
+-- CV-App: Upsert atómico de varias respuestas de skill_memory
+-- ============================================================
+-- save_skill_answers_bulk() leía usage_count y luego hacía el
+-- upsert con usage_count + 1 calculado en Python: la misma carrera
+-- que la migración 009 quitó de save_skill_answer(). Esta función
+-- aplica el mismo ON CONFLICT a todos los pares en un solo INSERT.
+--
+-- p_skills y p_answers van en paralelo (misma posición = mismo
+-- par) y no deben repetir skill: un INSERT ... ON CONFLICT no
+-- puede actualizar la misma fila dos veces. La app ya los
+-- deduplica antes de llamar.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION public.upsert_skill_answers(
+    p_user_id UUID,
+    p_skills  TEXT[],
+    p_answers TEXT[]
+)
+RETURNS SETOF INTEGER
+LANGUAGE sql
+AS $$
+    INSERT INTO skill_memory (user_id, skill_name, answer_text, usage_count, updated_at)
+    SELECT p_user_id, lower(btrim(skill)), answer, 1, NOW()
+    FROM unnest(p_skills, p_answers) AS pairs(skill, answer)
+    ON CONFLICT (user_id, skill_name) DO UPDATE
+        SET answer_text = EXCLUDED.answer_text,
+            usage_count = skill_memory.usage_count + 1,
+            updated_at  = NOW()
+    RETURNING id;
+$$;
@@ -0,0 +1,15 @@
+"""
+Fixtures compartidas por los tests.
+"""
+
+import pytest
+
+from src.ai_backend import GeminiClient
+
+
+@pytest.fixture(autouse=True)
+def _reset_genai_clients():
+    """Resetea los clientes google.genai compartidos de GeminiClient entre tests."""
+    GeminiClient._clients.clear()
+    yield
+    GeminiClient._clients.clear()
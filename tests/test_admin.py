@@ -51,7 +51,7 @@ def mock_supabase_client():
 class TestAuthManagerAdmin:
     """Tests for admin-facing AuthManager methods."""
 
-    @patch("src.auth.create_client")
+    @patch("supabase.create_client")
     def test_get_all_profiles(self, mock_create):
         mock_client = MagicMock()
         mock_create.return_value = mock_client
@@ -76,7 +76,7 @@ class TestAuthManagerAdmin:
         assert result[0]["email"] == "a@a.com"
         mock_client.table.assert_called_with("user_profiles")
 
-    @patch("src.auth.create_client")
+    @patch("supabase.create_client")
     def test_get_all_profiles_empty(self, mock_create):
         mock_client = MagicMock()
         mock_create.return_value = mock_client
@@ -95,7 +95,7 @@ class TestAuthManagerAdmin:
 
         assert result == []
 
-    @patch("src.auth.create_client")
+    @patch("supabase.create_client")
     def test_get_all_profiles_error(self, mock_create):
         mock_client = MagicMock()
         mock_create.return_value = mock_client
@@ -107,7 +107,7 @@ class TestAuthManagerAdmin:
 
         assert result == []
 
-    @patch("src.auth.create_client")
+    @patch("supabase.create_client")
     def test_set_user_active_true(self, mock_create):
         mock_client = MagicMock()
         mock_create.return_value = mock_client
@@ -126,7 +126,7 @@ class TestAuthManagerAdmin:
         mock_client.table.assert_called_with("user_profiles")
         query.update.assert_called_once_with({"is_active": True})
 
-    @patch("src.auth.create_client")
+    @patch("supabase.create_client")
     def test_set_user_active_false(self, mock_create):
         mock_client = MagicMock()
         mock_create.return_value = mock_client
@@ -144,7 +144,7 @@ class TestAuthManagerAdmin:
         assert result is True
         query.update.assert_called_once_with({"is_active": False})
 
-    @patch("src.auth.create_client")
+    @patch("supabase.create_client")
     def test_set_user_active_error(self, mock_create):
         mock_client = MagicMock()
         mock_create.return_value = mock_client
@@ -165,7 +165,7 @@ class TestAuthManagerAdmin:
 class TestAdminActivateWorkflow:
     """Simulates the full activate/deactivate workflow."""
 
-    @patch("src.token_tracker.create_client")
+    @patch("supabase.create_client")
     def test_activate_user_resets_tokens(self, mock_create):
         """Activar usuario debe resetear tokens."""
         mock_client = MagicMock()
@@ -187,7 +187,7 @@ class TestAdminActivateWorkflow:
         assert count == 3
         mock_client.table.assert_called_with("token_usage")
 
-    @patch("src.token_tracker.create_client")
+    @patch("supabase.create_client")
     def test_deactivate_logs_audit(self, mock_create):
         """Desactivar usuario debe crear registro de auditoria."""
         mock_client = MagicMock()
@@ -218,7 +218,7 @@ class TestAdminActivateWorkflow:
         assert call_args["cost_at_action_cop"] == 42.0
         assert call_args["notes"] == "Demo limit reached"
 
-    @patch("src.token_tracker.create_client")
+    @patch("supabase.create_client")
     def test_activate_logs_audit(self, mock_create):
         """Activar usuario debe crear registro de auditoria."""
         mock_client = MagicMock()
@@ -243,7 +243,7 @@ class TestAdminActivateWorkflow:
         assert call_args["action"] == "activate"
         assert "notes" not in call_args  # No notes means key not present
 
-    @patch("src.token_tracker.create_client")
+    @patch("supabase.create_client")
     def test_get_audit_log_filtered(self, mock_create):
         """Obtener audit log con filtros."""
         mock_client = MagicMock()
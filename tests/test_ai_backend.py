@@ -2,8 +2,14 @@
 Tests unitarios para el cliente de Gemini AI (usando nueva API google.genai).
 """
 
+import asyncio
+import threading
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
+
+import httpx
+from google.genai import errors as genai_errors
 from src.ai_backend import (
     GeminiClient,
     CareerStrategist,
@@ -11,6 +17,8 @@ from src.ai_backend import (
     GeminiClientError,
     GeminiRateLimitError,
     GeminiConnectionError,
+    ResponseCache,
+    _classify_error,
 )
 
 
@@ -91,6 +99,47 @@ class TestGeminiClient:
         # El contenido debe incluir ambas partes
         assert call_args is not None
 
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_generate_caches_long_system_instruction(self, mock_client_class):
+        """Test que una instrucción de sistema larga se sube una sola vez como contexto cacheado."""
+        mock_client = Mock()
+        mock_client.models.generate_content.return_value = Mock(text="ok")
+        mock_client.caches.create.return_value = Mock()
+        mock_client.caches.create.return_value.name = "cachedContents/abc"
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+        system = "x" * GeminiClient.CONTEXT_CACHE_MIN_CHARS
+        client.generate("Prompt 1", system_instruction=system)
+        client.generate("Prompt 2", system_instruction=system)
+
+        mock_client.caches.create.assert_called_once()
+        config = mock_client.models.generate_content.call_args.kwargs["config"]
+        assert config.cached_content == "cachedContents/abc"
+        assert config.system_instruction is None
+        assert mock_client.models.generate_content.call_args.kwargs["contents"] == "Prompt 2"
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_generate_falls_back_when_context_cache_fails(self, mock_client_class):
+        """Test que si falla el cache de contexto la instrucción se envía en la config."""
+        mock_client = Mock()
+        mock_client.models.generate_content.return_value = Mock(text="ok")
+        mock_client.caches.create.side_effect = Exception("too few tokens")
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+        system = "x" * GeminiClient.CONTEXT_CACHE_MIN_CHARS
+        response = client.generate("Prompt", system_instruction=system)
+        client.generate("Prompt", system_instruction=system)
+
+        assert response.success
+        mock_client.caches.create.assert_called_once()
+        config = mock_client.models.generate_content.call_args.kwargs["config"]
+        assert config.system_instruction == system
+        assert config.cached_content is None
+
     @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
     @patch("src.ai_backend.genai.Client")
     def test_generate_empty_response(self, mock_client_class):
@@ -130,6 +179,24 @@ class TestGeminiClient:
         assert mock_client.models.generate_content.call_count == 2
         mock_sleep.assert_called()
 
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    @patch("src.ai_backend.time.sleep")
+    def test_generate_retries_server_unavailable(self, mock_sleep, mock_client_class):
+        """Test retry ante un 503 de la API aunque el mensaje no diga 'connection'."""
+        mock_client = Mock()
+        mock_client.models.generate_content.side_effect = [
+            genai_errors.ServerError(503, {"error": {"message": "No disponible"}}),
+            Mock(text="Success after retry"),
+        ]
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+        response = client.generate("Test prompt", retry=True)
+
+        assert response.success
+        assert mock_client.models.generate_content.call_count == 2
+
     @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
     @patch("src.ai_backend.genai.Client")
     def test_generate_rate_limit_without_retry(self, mock_client_class):
@@ -159,6 +226,188 @@ class TestGeminiClient:
         assert not response.success
         assert mock_client.models.generate_content.call_count == 3  # MAX_RETRIES
 
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_generate_batch_preserves_order(self, mock_client_class):
+        """Test que generate_batch devuelve las respuestas en el orden de los prompts."""
+        mock_client = Mock()
+        mock_client.aio.models.generate_content = AsyncMock(
+            side_effect=lambda model, contents, config: Mock(text=f"echo {contents}")
+        )
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+        responses = client.generate_batch(["a", "b", "c"])
+
+        assert [r.text for r in responses] == ["echo a", "echo b", "echo c"]
+        assert all(r.success for r in responses)
+        assert mock_client.aio.models.generate_content.await_count == 3
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_generate_batch_reuses_one_event_loop(self, mock_client_class):
+        """Test que lotes sucesivos corren en el mismo loop (el cliente aio queda atado a él)."""
+        loops = []
+
+        async def fake_generate(model, contents, config):
+            loops.append(asyncio.get_running_loop())
+            return Mock(text=contents, usage_metadata=None)
+
+        mock_client = Mock()
+        mock_client.aio.models.generate_content = fake_generate
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+        client.generate_batch(["a", "b"])
+        client.generate_batch(["c"])
+
+        assert len(loops) == 3
+        assert len(set(map(id, loops))) == 1
+        assert loops[0].is_running()
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_agenerate_runs_blocking_work_off_the_loop(self, mock_client_class):
+        """Test que caches y contexto cacheado no bloquean el event loop."""
+        mock_client = Mock()
+        mock_client.aio.models.generate_content = AsyncMock(
+            return_value=Mock(text="ok", usage_metadata=None)
+        )
+        mock_client_class.return_value = mock_client
+        client = GeminiClient()
+        threads = {}
+
+        def record(name, result):
+            def wrapper(*args):
+                threads[name] = threading.current_thread()
+                return result
+            return wrapper
+
+        client._lookup_caches = record("lookup", (None, None, None))
+        client._build_config = record("config", None)
+
+        async def run():
+            threads["loop"] = threading.current_thread()
+            return await client.agenerate("prompt")
+
+        assert asyncio.run(run()).text == "ok"
+        assert threads["lookup"] is not threads["loop"]
+        assert threads["config"] is not threads["loop"]
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    @patch("src.ai_backend.asyncio.sleep", new_callable=AsyncMock)
+    def test_agenerate_rate_limit_with_retry(self, mock_sleep, mock_client_class):
+        """Test que agenerate reintenta con asyncio.sleep ante un rate limit."""
+        mock_client = Mock()
+        mock_client.aio.models.generate_content = AsyncMock(
+            side_effect=[Exception("quota exceeded"), Mock(text="Success after retry")]
+        )
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+        response = asyncio.run(client.agenerate("Test prompt"))
+
+        assert response.success
+        assert response.text == "Success after retry"
+        mock_sleep.assert_awaited_once_with(GeminiClient.RETRY_DELAY)
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_generate_batch_empty(self, mock_client_class):
+        """Test lote vacío sin llamadas al modelo."""
+        mock_client = Mock()
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+
+        assert client.generate_batch([]) == []
+        mock_client.models.generate_content.assert_not_called()
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_semantic_cache_only_when_requested(self, mock_client_class):
+        """Test que el cache semántico solo se consulta en llamadas con semantic=True."""
+        mock_client = Mock()
+        mock_client.models.generate_content.return_value = Mock(text="nuevo", usage_metadata=None)
+        mock_client_class.return_value = mock_client
+        semantic_cache = Mock()
+        semantic_cache.fits.return_value = True
+        semantic_cache.lookup.return_value = "cacheado"
+
+        client = GeminiClient(semantic_cache=semantic_cache)
+
+        assert client.generate("prompt largo").text == "nuevo"
+        semantic_cache.lookup.assert_not_called()
+        semantic_cache.add.assert_not_called()
+        assert client.generate("prompt corto", semantic=True).text == "cacheado"
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_semantic_cache_skips_prompts_longer_than_embedder(self, mock_client_class):
+        """Test que un prompt que el embedder truncaría no se busca ni se guarda."""
+        mock_client = Mock()
+        mock_client.models.generate_content.return_value = Mock(text="nuevo", usage_metadata=None)
+        mock_client_class.return_value = mock_client
+        semantic_cache = Mock()
+        semantic_cache.fits.return_value = False
+
+        client = GeminiClient(semantic_cache=semantic_cache)
+        response = client.generate("prompt", semantic=True)
+
+        assert response.text == "nuevo"
+        semantic_cache.lookup.assert_not_called()
+        semantic_cache.add.assert_not_called()
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_confirm_equivalent_without_thinking_and_tracks_usage(self, mock_client_class):
+        """Test que la verificación usa el modelo barato sin razonamiento y suma tokens."""
+        mock_client = Mock()
+        mock_client.models.generate_content.return_value = Mock(
+            text="SI", usage_metadata=Mock(prompt_token_count=40, candidates_token_count=1)
+        )
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+
+        assert client._confirm_equivalent("prompt", "prompt cacheado")
+        kwargs = mock_client.models.generate_content.call_args.kwargs
+        assert kwargs["model"] == GeminiClient.SEMANTIC_VERIFY_MODEL
+        assert kwargs["config"].thinking_config.thinking_budget == 0
+        assert client.drain_usage() == (40, 1)
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_generate_stream_yields_chunks(self, mock_client_class):
+        """Test streaming: entrega los fragmentos y registra los tokens al final."""
+        usage = Mock(prompt_token_count=10, candidates_token_count=5)
+        mock_client = Mock()
+        mock_client.models.generate_content_stream.return_value = [
+            Mock(text="Hola ", usage_metadata=None),
+            Mock(text="mundo", usage_metadata=usage),
+        ]
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+        chunks = list(client.generate_stream("Test prompt"))
+
+        assert chunks == ["Hola ", "mundo"]
+        assert client.drain_usage() == (10, 5)
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_generate_stream_error(self, mock_client_class):
+        """Test que un error en streaming se propaga como GeminiClientError."""
+        mock_client = Mock()
+        mock_client.models.generate_content_stream.side_effect = Exception("boom")
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient()
+
+        with pytest.raises(GeminiClientError, match="boom"):
+            list(client.generate_stream("Test prompt"))
+
     @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
     @patch("src.ai_backend.genai.Client")
     def test_generate_content_alias(self, mock_client_class):
@@ -205,6 +454,87 @@ class TestGeminiClient:
         assert result is False
 
 
+class TestClassifyError:
+    """Tests para la clasificación de errores del retry."""
+
+    @pytest.mark.parametrize(
+        "error, expected",
+        [
+            (genai_errors.ClientError(429, {"error": {"message": "Cuota agotada"}}), "rate"),
+            (genai_errors.ServerError(503, {"error": {"message": "No disponible"}}), "connection"),
+            (genai_errors.ClientError(400, {"error": {"message": "Bad request"}}), "other"),
+            (httpx.ConnectTimeout("timed out"), "connection"),
+            (Exception("Quota exceeded"), "rate"),
+            (Exception("Connection reset"), "connection"),
+            (ValueError("boom"), "other"),
+        ],
+    )
+    def test_classify_error(self, error, expected):
+        """Test clasificación por tipo, código HTTP y mensaje."""
+        assert _classify_error(error) == expected
+
+
+class TestSharedGenaiClient:
+    """Tests para el cliente google.genai compartido por API key."""
+
+    @patch("src.ai_backend.genai.Client")
+    def test_same_api_key_reuses_client(self, mock_client_class):
+        """Test que dos GeminiClient con la misma key comparten el cliente HTTP."""
+        mock_client_class.side_effect = lambda api_key: Mock()
+        first = GeminiClient(api_key="key_a")
+        second = GeminiClient(api_key="key_a")
+        other = GeminiClient(api_key="key_b")
+
+        assert first.client is second.client
+        assert other.client is not first.client
+        assert mock_client_class.call_count == 2
+
+
+class TestResponseCache:
+    """Tests para el cache exacto de respuestas."""
+
+    def test_set_and_get(self, tmp_path):
+        """Test guardar y recuperar una respuesta."""
+        cache = ResponseCache(str(tmp_path / "cache.db"))
+        cache.set("k", "texto")
+
+        assert cache.get("k") == "texto"
+        assert cache.get("otra") is None
+
+    def test_expired_entry_is_miss(self, tmp_path):
+        """Test que una entrada vencida no se devuelve."""
+        cache = ResponseCache(str(tmp_path / "cache.db"), ttl_seconds=60)
+        cache.set("k", "texto")
+
+        with patch("src.ai_backend.time.time", return_value=10**12):
+            assert cache.get("k") is None
+
+    def test_make_key_normalizes_whitespace(self):
+        """Test que la key ignora espacios en los extremos."""
+        key_a = ResponseCache.make_key("m", 0.7, 100, None, "prompt")
+        key_b = ResponseCache.make_key("m", 0.7, 100, None, "  prompt\n")
+        key_c = ResponseCache.make_key("m", 0.2, 100, None, "prompt")
+
+        assert key_a == key_b
+        assert key_a != key_c
+
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_generate_uses_cache(self, mock_client_class, tmp_path):
+        """Test que un prompt repetido no vuelve a llamar al modelo."""
+        mock_client = Mock()
+        mock_client.models.generate_content.return_value = Mock(text="Cached response")
+        mock_client_class.return_value = mock_client
+
+        client = GeminiClient(response_cache=ResponseCache(str(tmp_path / "cache.db")))
+        first = client.generate("Test prompt")
+        second = client.generate("Test prompt")
+
+        assert first.text == second.text == "Cached response"
+        assert second.success
+        mock_client.models.generate_content.assert_called_once()
+
+
 class TestCareerStrategist:
     """Tests para la clase CareerStrategist."""
 
@@ -276,6 +606,24 @@ class TestCareerStrategist:
         assert "cv:" in response.text
         assert "```" not in response.text
 
+    @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
+    @patch("src.ai_backend.genai.Client")
+    def test_continue_conversation_history(self, mock_client_class):
+        """Test que el historial se envía con saltos de línea reales y roles."""
+        mock_client = Mock()
+        mock_client.models.generate_content.return_value = Mock(text="Respuesta")
+        mock_client_class.return_value = mock_client
+
+        strategist = CareerStrategist()
+        response = strategist.continue_conversation(
+            [{"role": "user", "text": "Hola"}, {"role": "model", "text": "¿Qué tal?"}],
+            yaml_template="template",
+        )
+
+        assert response.success
+        contents = mock_client.models.generate_content.call_args.kwargs["contents"]
+        assert contents == "Usuario: Hola\n\nAsistente: ¿Qué tal?"
+
     @patch.dict("os.environ", {"GOOGLE_API_KEY": "test_key"})
     @patch("src.ai_backend.genai.Client")
     def test_extract_yaml_with_markers(self, mock_client_class):
@@ -0,0 +1,255 @@
+"""
+Tests unitarios para el proxy de entrevistas.
+"""
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.ai_backend import GeminiResponse, run_coroutine
+from src.ai_proxy import (
+    INTERVIEW_CACHE_HIT_THRESHOLD,
+    INTERVIEW_CACHE_VERIFY_THRESHOLD,
+    InterviewProxy,
+)
+from src.semantic_cache import SemanticCache
+
+# Embeddings normalizados fijos por pregunta (evita cargar un modelo real)
+_VECTORS = {
+    "¿Por qué quieres este puesto?": [1.0, 0.0, 0.0],
+    "¿Por qué te interesa este puesto?": [0.95, 0.312, 0.0],  # coseno ~0.95
+    "¿Qué te motiva del puesto?": [0.85, 0.527, 0.0],  # coseno ~0.85 (zona gris)
+    "¿Cuál es tu mayor debilidad?": [0.0, 1.0, 0.0],
+}
+
+
+def fake_embed(texts):
+    vectors = np.array([_VECTORS[t] for t in texts], dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def ai_client():
+    client = Mock()
+    client.generate.side_effect = lambda prompt: GeminiResponse(
+        text=f" respuesta {client.generate.call_count} ", success=True
+    )
+    return client
+
+
+@pytest.fixture
+def db():
+    db = Mock()
+    db.get_all_skill_answers.return_value = {"python": "5 años en producción"}
+    db.cache_generation.return_value = 0
+    return db
+
+
+def _ask(proxy, question, **overrides):
+    kwargs = {"cv_text": "CV", "job_description": "Vacante", "tone": "Profesional"}
+    kwargs.update(overrides)
+    return proxy.answer_question(question=question, **kwargs)
+
+
+class TestInterviewProxyCache:
+    """Tests para el cache de respuestas de InterviewProxy."""
+
+    def test_exact_prompt_is_cached(self, ai_client, db):
+        """Test que un prompt idéntico no vuelve a llamar al LLM."""
+        proxy = InterviewProxy(ai_client, db)
+
+        first = _ask(proxy, "¿Por qué quieres este puesto?")
+        second = _ask(proxy, "¿Por qué quieres este puesto?")
+
+        assert first == second == "respuesta 1"
+        assert ai_client.generate.call_count == 1
+
+    def test_answer_cache_is_bounded(self, ai_client, db):
+        """Test que el cache exacto descarta la entrada menos usada al llenarse."""
+        proxy = InterviewProxy(ai_client, db)
+        proxy.ANSWER_CACHE_MAXSIZE = 2
+
+        _ask(proxy, "¿Por qué quieres este puesto?")
+        _ask(proxy, "¿Cuál es tu mayor debilidad?")
+        _ask(proxy, "¿Por qué quieres este puesto?")  # hit: pasa a ser la más reciente
+        _ask(proxy, "¿Qué te motiva del puesto?")  # desaloja "debilidad"
+
+        assert len(proxy._answer_cache) == 2
+        assert ai_client.generate.call_count == 3
+        _ask(proxy, "¿Cuál es tu mayor debilidad?")
+        assert ai_client.generate.call_count == 4
+
+    def test_answer_cache_expires(self, ai_client, db):
+        """Test que una respuesta cacheada vence tras ANSWER_CACHE_TTL."""
+        proxy = InterviewProxy(ai_client, db)
+
+        with patch("src.ai_proxy.time.monotonic", return_value=100.0):
+            _ask(proxy, "¿Por qué quieres este puesto?")
+        later = 100.0 + InterviewProxy.ANSWER_CACHE_TTL
+        with patch("src.ai_proxy.time.monotonic", return_value=later):
+            _ask(proxy, "¿Por qué quieres este puesto?")
+
+        assert ai_client.generate.call_count == 2
+
+    def test_context_change_is_miss(self, ai_client, db):
+        """Test que cambiar el tono regenera la respuesta."""
+        proxy = InterviewProxy(ai_client, db)
+
+        _ask(proxy, "¿Por qué quieres este puesto?")
+        _ask(proxy, "¿Por qué quieres este puesto?", tone="Conciso")
+
+        assert ai_client.generate.call_count == 2
+
+    def test_semantic_hit_and_gray_zone(self, ai_client, db):
+        """Test hit semántico por pregunta; la zona gris vuelve al LLM."""
+        cache = SemanticCache(
+            embed_fn=fake_embed,
+            hit_threshold=INTERVIEW_CACHE_HIT_THRESHOLD,
+            verify_threshold=INTERVIEW_CACHE_VERIFY_THRESHOLD,
+        )
+        proxy = InterviewProxy(ai_client, db, semantic_cache=cache)
+
+        _ask(proxy, "¿Por qué quieres este puesto?")
+        assert _ask(proxy, "¿Por qué te interesa este puesto?") == "respuesta 1"
+        assert ai_client.generate.call_count == 1
+
+        assert _ask(proxy, "¿Qué te motiva del puesto?") == "respuesta 2"
+        assert _ask(proxy, "¿Cuál es tu mayor debilidad?") == "respuesta 3"
+
+    def test_semantic_cache_scoped_by_context(self, ai_client, db):
+        """Test que una pregunta equivalente con otra vacante no reutiliza respuesta."""
+        cache = SemanticCache(embed_fn=fake_embed)
+        proxy = InterviewProxy(ai_client, db, semantic_cache=cache)
+
+        _ask(proxy, "¿Por qué quieres este puesto?")
+        _ask(proxy, "¿Por qué quieres este puesto?", job_description="Otra vacante")
+
+        assert ai_client.generate.call_count == 2
+
+
+class TestInterviewProxyStream:
+    """Tests para answer_question_stream."""
+
+    def test_stream_yields_chunks_and_caches(self, ai_client, db):
+        """Test que el streaming entrega fragmentos y guarda la respuesta completa."""
+        ai_client.generate_stream.return_value = iter(["Hola, ", "soy ", "candidato. "])
+        proxy = InterviewProxy(ai_client, db)
+
+        chunks = list(proxy.answer_question_stream("¿Quién eres?", "CV", "Vacante"))
+
+        assert chunks == ["Hola, ", "soy ", "candidato. "]
+        assert proxy.answer_question("¿Quién eres?", "CV", "Vacante") == "Hola, soy candidato."
+        ai_client.generate.assert_not_called()
+
+    def test_stream_serves_cached_answer_whole(self, ai_client, db):
+        """Test que una respuesta cacheada llega en un solo fragmento."""
+        proxy = InterviewProxy(ai_client, db)
+        proxy.answer_question("¿Quién eres?", "CV", "Vacante")
+
+        chunks = list(proxy.answer_question_stream("¿Quién eres?", "CV", "Vacante"))
+
+        assert chunks == ["respuesta 1"]
+        ai_client.generate_stream.assert_not_called()
+
+
+class TestInterviewProxySkillMemory:
+    """Tests para la memoria de skills reutilizada entre preguntas."""
+
+    def test_skill_memory_read_once_within_ttl(self, ai_client, db):
+        """Test que varias preguntas seguidas leen la memoria de skills una vez."""
+        proxy = InterviewProxy(ai_client, db)
+
+        _ask(proxy, "¿Por qué quieres este puesto?")
+        _ask(proxy, "¿Cuál es tu mayor debilidad?")
+
+        assert db.get_all_skill_answers.call_count == 1
+        prompt = ai_client.generate.call_args.args[0]
+        assert "- **Python:** 5 años en producción" in prompt
+
+    def test_invalidate_rereads_skill_memory(self, ai_client, db):
+        """Test que invalidar la memoria incorpora skills nuevas al prompt."""
+        proxy = InterviewProxy(ai_client, db)
+        _ask(proxy, "¿Por qué quieres este puesto?")
+
+        db.get_all_skill_answers.return_value = {"docker": "Uso diario"}
+        proxy.invalidate_skill_memory()
+        _ask(proxy, "¿Cuál es tu mayor debilidad?")
+
+        assert "- **Docker:** Uso diario" in ai_client.generate.call_args.args[0]
+
+    def test_database_write_rereads_skill_memory(self, ai_client, db):
+        """Test que una escritura en CVDatabase (nueva generación) invalida la memoria."""
+        proxy = InterviewProxy(ai_client, db)
+        _ask(proxy, "¿Por qué quieres este puesto?")
+
+        db.get_all_skill_answers.return_value = {"docker": "Uso diario"}
+        db.cache_generation.return_value = 1
+        _ask(proxy, "¿Cuál es tu mayor debilidad?")
+
+        assert db.get_all_skill_answers.call_count == 2
+        assert "- **Docker:** Uso diario" in ai_client.generate.call_args.args[0]
+
+
+class TestInterviewProxyBatch:
+    """Tests para answer_questions_batch."""
+
+    def test_batch_uses_caches_and_generates_misses(self, ai_client, db):
+        """Test que el lote responde en orden, con caches y generación concurrente."""
+        embed = Mock(side_effect=fake_embed)
+        cache = SemanticCache(
+            embed_fn=embed,
+            hit_threshold=INTERVIEW_CACHE_HIT_THRESHOLD,
+            verify_threshold=INTERVIEW_CACHE_VERIFY_THRESHOLD,
+        )
+        proxy = InterviewProxy(ai_client, db, semantic_cache=cache)
+        _ask(proxy, "¿Por qué quieres este puesto?")
+        embed.reset_mock()
+
+        async def agenerate(prompt):
+            return GeminiResponse(text=f" nueva {len(prompt)} ", success=True)
+
+        ai_client.agenerate.side_effect = agenerate
+        answers = proxy.answer_questions_batch(
+            ["¿Por qué te interesa este puesto?", "¿Cuál es tu mayor debilidad?"],
+            cv_text="CV",
+            job_description="Vacante",
+            tone="Profesional",
+        )
+
+        assert answers[0] == "respuesta 1"
+        assert answers[1].startswith("nueva ")
+        assert ai_client.agenerate.call_count == 1
+        # Un llamado al embedder para la búsqueda y otro para guardar lo generado
+        assert embed.call_count == 2
+        assert len(cache) == 2
+
+    def test_batch_failure_returns_empty_answer(self, ai_client, db):
+        """Test que una pregunta fallida no descarta el resto del lote."""
+        async def agenerate(prompt):
+            if "debilidad" in prompt:
+                raise RuntimeError("rate limit")
+            return GeminiResponse(text="ok", success=True)
+
+        ai_client.agenerate.side_effect = agenerate
+        proxy = InterviewProxy(ai_client, db)
+
+        answers = proxy.answer_questions_batch(
+            ["¿Por qué quieres este puesto?", "¿Cuál es tu mayor debilidad?"], "CV", "Vacante"
+        )
+
+        assert answers == ["ok", ""]
+
+    def test_batch_runs_on_shared_event_loop(self, ai_client, db):
+        """Test que el lote usa el loop de fondo de ai_backend y no un asyncio.run propio."""
+        async def agenerate(prompt):
+            return GeminiResponse(text="ok", success=True)
+
+        ai_client.agenerate.side_effect = agenerate
+        proxy = InterviewProxy(ai_client, db)
+
+        with patch("src.ai_proxy.run_coroutine", side_effect=run_coroutine) as mock_run:
+            answers = proxy.answer_questions_batch(["¿Por qué quieres este puesto?"], "CV", "Vacante")
+
+        assert answers == ["ok"]
+        mock_run.assert_called_once()
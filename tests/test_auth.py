@@ -4,13 +4,15 @@ Tests para el modulo de autenticacion (src/auth.py).
 Todos los tests usan mocks del cliente Supabase.
 """
 
+import asyncio
 import os
+from concurrent.futures import Future
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.auth import AuthManager, AuthResult, _translate_error
+from src.auth import AuthManager, AuthResult, _translate_error, _user_to_dict
 
 # ------------------------------------------------------------------
 # Helpers
@@ -42,8 +44,10 @@ def _mock_session(
 def _reset_singleton():
     """Reset singleton antes y despues de cada test."""
     AuthManager._client = None
+    AuthManager.invalidate_profile()
     yield
     AuthManager._client = None
+    AuthManager.invalidate_profile()
 
 
 @pytest.fixture()
@@ -57,7 +61,7 @@ def mock_client():
                 "SUPABASE_KEY": "test-anon-key-1234567890",
             },
         ),
-        patch("src.auth.create_client") as mock_create,
+        patch("supabase.create_client") as mock_create,
     ):
         client = MagicMock()
         mock_create.return_value = client
@@ -87,6 +91,12 @@ class TestAuthResult:
         assert result.user is None
         assert result.error == "Algo salio mal"
 
+    def test_slots_no_instance_dict(self):
+        result = AuthResult(success=True)
+        assert not hasattr(result, "__dict__")
+        with pytest.raises(AttributeError):
+            result.extra = "x"  # type: ignore[attr-defined]
+
     def test_defaults(self):
         result = AuthResult(success=True)
         assert result.user is None
@@ -463,3 +473,102 @@ class TestGetUserProfile:
         result = manager.get_user_profile("uid-123")
 
         assert result is None
+
+
+# ------------------------------------------------------------------
+# Cache de perfiles
+# ------------------------------------------------------------------
+
+
+class TestProfileCache:
+    def _setup_profile_query(self, mock_client: MagicMock, data: list[dict]) -> MagicMock:
+        chain = MagicMock()
+        mock_client.table.return_value = chain
+        chain.select.return_value = chain
+        chain.eq.return_value = chain
+        chain.update.return_value = chain
+        chain.execute.return_value = SimpleNamespace(data=data)
+        return chain
+
+    def test_checks_share_one_query(self, mock_client: MagicMock):
+        chain = self._setup_profile_query(mock_client, [{"role": "admin", "is_active": True}])
+
+        manager = AuthManager()
+        assert manager.is_user_active("uid-123") is True
+        assert manager.is_admin("uid-123") is True
+        assert AuthManager().get_user_profile("uid-123") == {"role": "admin", "is_active": True}
+
+        assert chain.execute.call_count == 1
+
+    def test_cache_expires(self, mock_client: MagicMock):
+        chain = self._setup_profile_query(mock_client, [{"role": "user", "is_active": True}])
+
+        manager = AuthManager()
+        manager.is_admin("uid-123")
+        with patch("src.auth.time.monotonic", return_value=10**9):
+            manager.is_admin("uid-123")
+
+        assert chain.execute.call_count == 2
+
+    def test_set_user_active_invalidates(self, mock_client: MagicMock):
+        chain = self._setup_profile_query(mock_client, [{"role": "user", "is_active": True}])
+
+        manager = AuthManager()
+        assert manager.is_user_active("uid-123") is True
+        manager.set_user_active("uid-123", False)
+        chain.execute.return_value = SimpleNamespace(data=[{"role": "user", "is_active": False}])
+
+        assert manager.is_user_active("uid-123") is False
+
+    def test_async_checks(self, mock_client: MagicMock):
+        self._setup_profile_query(mock_client, [{"role": "admin", "is_active": False}])
+
+        async def run():
+            manager = AuthManager()
+            return await asyncio.gather(
+                manager.a_is_admin("uid-123"), manager.a_is_user_active("uid-123")
+            )
+
+        assert asyncio.run(run()) == [True, False]
+
+    def test_sign_in_prefetches_profile(self, mock_client: MagicMock):
+        chain = self._setup_profile_query(mock_client, [{"role": "admin", "is_active": True}])
+        mock_client.auth.sign_in_with_password.return_value = SimpleNamespace(
+            user=_mock_user(user_id="uid-123"), session=None
+        )
+
+        manager = AuthManager()
+        assert manager.sign_in("test@example.com", "secret").success is True
+        assert "uid-123" in AuthManager._profile_futures
+
+        assert manager.is_user_active("uid-123") is True
+        assert manager.is_admin("uid-123") is True
+        assert chain.execute.call_count == 1
+        assert not AuthManager._profile_futures
+
+    def test_failed_prefetch_falls_back_to_query(self, mock_client: MagicMock):
+        self._setup_profile_query(mock_client, [{"role": "user", "is_active": False}])
+        failed: Future = Future()
+        failed.set_exception(RuntimeError("timeout"))
+        AuthManager._profile_futures["uid-123"] = failed
+
+        assert AuthManager().is_user_active("uid-123") is False
+
+
+# ------------------------------------------------------------------
+# _user_to_dict
+# ------------------------------------------------------------------
+
+
+class TestUserToDict:
+    def test_str_id_is_kept(self):
+        assert _user_to_dict(_mock_user(user_id="uid-1")) == {
+            "id": "uid-1",
+            "email": "test@example.com",
+        }
+
+    def test_uuid_id_is_stringified(self):
+        import uuid
+
+        user_id = uuid.uuid4()
+        assert _user_to_dict(_mock_user(user_id=user_id))["id"] == str(user_id)
@@ -1,11 +1,12 @@
 """
 Tests unitarios para el procesador de CVs.
 """
+import io
 import pytest
 import tempfile
 from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
-import PyPDF2
+from unittest.mock import patch, MagicMock
+import pypdfium2 as pdfium
 from src.cv_parser import (
     CVParser,
     CVData,
@@ -14,22 +15,36 @@ from src.cv_parser import (
 )
 
 
+def _mock_pdf(*page_texts, metadata=None):
+    """Crea un mock de pypdfium2.PdfDocument con el texto de cada página."""
+    pages = []
+    for text in page_texts:
+        page = MagicMock()
+        page.get_textpage.return_value.get_text_range.return_value = text
+        pages.append(page)
+    pdf = MagicMock()
+    pdf.__len__.return_value = len(pages)
+    pdf.__getitem__.side_effect = lambda i: pages[i]
+    pdf.get_metadata_dict.return_value = metadata or {}
+    return pdf
+
+
 class TestCVData:
     """Tests para la dataclass CVData."""
     
     def test_is_empty_with_empty_text(self):
         """Test is_empty con texto vacío."""
-        cv_data = CVData(raw_text="", sections={}, metadata={})
+        cv_data = CVData(raw_text="", sections_mask=0, metadata={})
         assert cv_data.is_empty
     
     def test_is_empty_with_whitespace(self):
         """Test is_empty con solo espacios."""
-        cv_data = CVData(raw_text="   \n\t  ", sections={}, metadata={})
+        cv_data = CVData(raw_text="   \n\t  ", sections_mask=0, metadata={})
         assert cv_data.is_empty
     
     def test_is_not_empty(self):
         """Test is_empty con contenido."""
-        cv_data = CVData(raw_text="John Doe CV", sections={}, metadata={})
+        cv_data = CVData(raw_text="John Doe CV", sections_mask=0, metadata={})
         assert not cv_data.is_empty
 
 
@@ -106,17 +121,12 @@ class TestCVParser:
         # Crear un PDF de prueba simple
         pdf_path = tmp_path / "test_cv.pdf"
         
-        # Mock de PyPDF2
-        with patch('src.cv_parser.PyPDF2.PdfReader') as mock_reader_class:
-            mock_reader = Mock()
-            mock_page = Mock()
-            mock_page.extract_text.return_value = "John Doe\nSoftware Engineer\nExperience: 5 years"
-            mock_reader.pages = [mock_page]
-            mock_reader.metadata = {
-                '/Title': 'My CV',
-                '/Author': 'John Doe'
-            }
-            mock_reader_class.return_value = mock_reader
+        # Mock de PDFium
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.return_value = _mock_pdf(
+                "John Doe\r\nSoftware Engineer\r\nExperience: 5 years",
+                metadata={'Title': 'My CV', 'Author': 'John Doe'},
+            )
             
             # Crear archivo dummy
             pdf_path.write_bytes(b'dummy pdf content')
@@ -129,24 +139,35 @@ class TestCVParser:
             assert cv_data.metadata['format'] == 'pdf'
             assert cv_data.metadata['num_pages'] == 1
             assert cv_data.metadata['source'] == str(pdf_path)
+            assert cv_data.metadata['pdf_metadata']['title'] == 'My CV'
+            assert "\r" not in cv_data.raw_text
     
     def test_parse_pdf_with_bytes(self):
         """Test parseo de PDF desde bytes."""
         pdf_bytes = b'dummy pdf content'
         
-        with patch('src.cv_parser.PyPDF2.PdfReader') as mock_reader_class:
-            mock_reader = Mock()
-            mock_page = Mock()
-            mock_page.extract_text.return_value = "Maria Garcia\nData Scientist"
-            mock_reader.pages = [mock_page]
-            mock_reader.metadata = None
-            mock_reader_class.return_value = mock_reader
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.return_value = _mock_pdf("Maria Garcia\r\nData Scientist")
             
             parser = CVParser()
             cv_data = parser.parse_pdf(file_bytes=pdf_bytes)
             
             assert "Maria Garcia" in cv_data.raw_text
             assert cv_data.metadata['source'] == 'bytes'
+
+    def test_parse_pdf_with_file_obj(self):
+        """Test parseo de PDF desde un stream abierto, sin copiarlo."""
+        stream = io.BytesIO(b'dummy pdf content')
+
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.return_value = _mock_pdf("Maria Garcia\r\nData Scientist")
+
+            parser = CVParser()
+            cv_data = parser.parse_pdf(file_obj=stream)
+
+            mock_pdf_class.assert_called_once_with(stream)
+            assert "Maria Garcia" in cv_data.raw_text
+            assert cv_data.metadata['source'] == 'stream'
     
     def test_parse_pdf_without_path_or_bytes_raises_error(self):
         """Test que falla sin path ni bytes."""
@@ -157,12 +178,8 @@ class TestCVParser:
     
     def test_parse_pdf_empty_text_raises_error(self):
         """Test que falla cuando PDF no tiene texto extraíble."""
-        with patch('src.cv_parser.PyPDF2.PdfReader') as mock_reader_class:
-            mock_reader = Mock()
-            mock_page = Mock()
-            mock_page.extract_text.return_value = ""
-            mock_reader.pages = [mock_page]
-            mock_reader_class.return_value = mock_reader
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.return_value = _mock_pdf("")
             
             parser = CVParser()
             
@@ -181,8 +198,8 @@ class TestCVParser:
         pdf_path = tmp_path / "corrupted.pdf"
         pdf_path.write_bytes(b'not a valid pdf')
         
-        with patch('src.cv_parser.PyPDF2.PdfReader') as mock_reader_class:
-            mock_reader_class.side_effect = PyPDF2.errors.PdfReadError("Invalid PDF")
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.side_effect = pdfium.PdfiumError("Invalid PDF")
             
             parser = CVParser()
             
@@ -191,22 +208,11 @@ class TestCVParser:
     
     def test_parse_pdf_multipage(self):
         """Test parseo de PDF con múltiples páginas."""
-        with patch('src.cv_parser.PyPDF2.PdfReader') as mock_reader_class:
-            mock_reader = Mock()
-            
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
             # Crear 3 páginas
-            mock_page1 = Mock()
-            mock_page1.extract_text.return_value = "Page 1: John Doe"
-            
-            mock_page2 = Mock()
-            mock_page2.extract_text.return_value = "Page 2: Experience"
-            
-            mock_page3 = Mock()
-            mock_page3.extract_text.return_value = "Page 3: Education"
-            
-            mock_reader.pages = [mock_page1, mock_page2, mock_page3]
-            mock_reader.metadata = None
-            mock_reader_class.return_value = mock_reader
+            mock_pdf_class.return_value = _mock_pdf(
+                "Page 1: John Doe", "Page 2: Experience", "Page 3: Education"
+            )
             
             parser = CVParser()
             cv_data = parser.parse_pdf(file_bytes=b'dummy')
@@ -216,18 +222,119 @@ class TestCVParser:
             assert "Page 2" in cv_data.raw_text
             assert "Page 3" in cv_data.raw_text
     
+    def test_parse_pdf_skips_unreadable_page(self, caplog):
+        """Test que una página ilegible se omite y se registra en el logger."""
+        pdf = _mock_pdf("Page 1: John Doe", "Page 2", "Page 3: Education")
+        pages = [pdf[i] for i in range(3)]
+        pages[1].get_textpage.side_effect = RuntimeError("página dañada")
+        pdf.__getitem__.side_effect = lambda i: pages[i]
+
+        with patch('pypdfium2.PdfDocument', return_value=pdf):
+            cv_data = CVParser().parse_pdf(file_bytes=b'dummy')
+
+        assert cv_data.raw_text == "Page 1: John Doe\n\nPage 3: Education"
+        assert "Error extrayendo página 2" in caplog.text
+
+    def test_parse_pdf_parallel_keeps_page_order(self):
+        """Test extracción por rangos de páginas en paralelo, en orden."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        pages = [f"Page {i}" for i in range(5)]
+        with (
+            patch('pypdfium2.PdfDocument') as mock_pdf_class,
+            patch('src.cv_parser.PARALLEL_MIN_PAGES', 2),
+            patch('src.cv_parser.os.cpu_count', return_value=2),
+            ThreadPoolExecutor(max_workers=2) as pool,
+            patch('src.cv_parser._get_process_pool', return_value=pool),
+        ):
+            mock_pdf_class.side_effect = lambda source: _mock_pdf(*pages)
+
+            cv_data = CVParser().parse_pdf(file_bytes=b'dummy')
+
+            # Documento principal + un documento por cada rango
+            assert mock_pdf_class.call_count == 3
+            assert cv_data.raw_text == "\n\n".join(pages)
+
+    def test_process_pool_is_shared_and_not_forked(self):
+        """Test que el pool se crea una vez y sin fork (el servidor tiene varios hilos)."""
+        from src import cv_parser
+
+        with (
+            patch.object(cv_parser, '_process_pool', None),
+            patch('src.cv_parser.ProcessPoolExecutor') as mock_pool_class,
+        ):
+            pool = cv_parser._get_process_pool()
+
+            assert cv_parser._get_process_pool() is pool
+            mock_pool_class.assert_called_once()
+            mp_context = mock_pool_class.call_args.kwargs['mp_context']
+            assert mp_context.get_start_method() in ('forkserver', 'spawn')
+
+    def test_parse_pdf_stream_is_not_parallelized(self):
+        """Test que un stream abierto se extrae en serie (no se puede reabrir)."""
+        with (
+            patch('pypdfium2.PdfDocument') as mock_pdf_class,
+            patch('src.cv_parser.PARALLEL_MIN_PAGES', 2),
+            patch('src.cv_parser.os.cpu_count', return_value=2),
+        ):
+            mock_pdf_class.return_value = _mock_pdf("Page 0", "Page 1", "Page 2")
+
+            CVParser().parse_pdf(file_obj=io.BytesIO(b'dummy'))
+
+            mock_pdf_class.assert_called_once()
+    
+    def test_parse_pdf_disk_cache_hit(self, tmp_path):
+        """Test que un PDF ya parseado se sirve desde el cache en disco."""
+        parser = CVParser(cache_dir=tmp_path / "cache")
+
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.return_value = _mock_pdf("Maria Garcia\r\nSkills: Python")
+            first = parser.parse_pdf(file_bytes=b'same pdf')
+            second = CVParser(cache_dir=tmp_path / "cache").parse_pdf(
+                file_obj=io.BytesIO(b'same pdf')
+            )
+
+        mock_pdf_class.assert_called_once()
+        assert second.raw_text == first.raw_text
+        assert second.sections == first.sections
+        assert second.metadata['source'] == 'stream'
+
+    def test_parse_pdf_disk_cache_ignores_corrupt_entry(self, tmp_path):
+        """Test que una entrada corrupta se trata como miss y se reescribe."""
+        parser = CVParser(cache_dir=tmp_path)
+
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.return_value = _mock_pdf("Test CV")
+            parser.parse_pdf(file_bytes=b'pdf')
+            cache_file = next(tmp_path.glob('*.json'))
+            cache_file.write_bytes(b'{not json')
+            parser.parse_pdf(file_bytes=b'pdf')
+
+        assert mock_pdf_class.call_count == 2
+        assert parser._load_cached(cache_file) is not None
+
+    def test_parse_pdf_disk_cache_evicts_oldest(self, tmp_path):
+        """Test que al pasar el tope se borran las entradas menos usadas."""
+        parser = CVParser(cache_dir=tmp_path)
+        parser.CACHE_MAX_BYTES = 1
+
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.return_value = _mock_pdf("Test CV")
+            parser.parse_pdf(file_bytes=b'pdf 1')
+            parser.parse_pdf(file_bytes=b'pdf 2')
+
+        # Sobrevive solo la entrada recién escrita
+        assert [path.name for path in tmp_path.glob('*.json')] == [
+            parser._cache_path(None, b'pdf 2', None).name
+        ]
+    
     def test_parse_file_pdf(self, tmp_path):
         """Test parse_file con PDF."""
         pdf_path = tmp_path / "cv.pdf"
         pdf_path.write_bytes(b'dummy')
         
-        with patch('src.cv_parser.PyPDF2.PdfReader') as mock_reader_class:
-            mock_reader = Mock()
-            mock_page = Mock()
-            mock_page.extract_text.return_value = "Test CV"
-            mock_reader.pages = [mock_page]
-            mock_reader.metadata = None
-            mock_reader_class.return_value = mock_reader
+        with patch('pypdfium2.PdfDocument') as mock_pdf_class:
+            mock_pdf_class.return_value = _mock_pdf("Test CV")
             
             parser = CVParser()
             cv_data = parser.parse_file(str(pdf_path))
@@ -267,7 +374,7 @@ class TestCVParser:
         parser = CVParser()
         cv_data = CVData(
             raw_text="Short CV",
-            sections={},
+            sections_mask=0,
             metadata={}
         )
         
@@ -281,7 +388,7 @@ class TestCVParser:
         long_text = "A" * 1000
         cv_data = CVData(
             raw_text=long_text,
-            sections={},
+            sections_mask=0,
             metadata={}
         )
         
@@ -300,7 +407,7 @@ class TestCVParser:
         """
         cv_data = CVData(
             raw_text=text,
-            sections={'experience': 'detected'},
+            sections_mask=0b0001,
             metadata={'format': 'text'}
         )
         
@@ -321,7 +428,7 @@ class TestCVParser:
         sections = parser._extract_basic_sections(text)
         
         # Puede estar vacío o no, depende del texto
-        assert isinstance(sections, dict)
+        assert isinstance(sections, int)
     
     def test_extract_basic_sections_with_summary(self):
         """Test detección de sección summary/perfil."""
@@ -334,5 +441,42 @@ class TestCVParser:
         ]
         
         for text in texts:
-            sections = parser._extract_basic_sections(text)
-            assert 'summary' in sections
+            cv_data = parser.parse_text(text)
+            assert 'summary' in cv_data.sections
+            assert cv_data.has_section('summary')
+
+    def test_extract_basic_sections_matches_substring_scan(self):
+        """Test que la pasada única detecta lo mismo que buscar cada palabra clave."""
+        from src.cv_parser import _SECTION_KEYWORDS
+
+        parser = CVParser()
+        texts = [
+            "EXPERIENCIA LABORAL\nEDUCACIÓN\nHabilidades",
+            "Information systems, roundabout frameworks",
+            "Résumé — Compétences et Formation",
+            "Sin nada relevante",
+        ]
+
+        for text in texts:
+            expected = {
+                section
+                for section, keywords in _SECTION_KEYWORDS.items()
+                if any(keyword in text.lower() for keyword in keywords)
+            }
+            assert set(parser.parse_text(text).sections) == expected
+
+    def test_count_lines_matches_splitlines(self):
+        """Test que el conteo de líneas sin lista equivale a splitlines."""
+        from src.cv_parser import _count_lines
+
+        for text in ["", "una", "una\ndos", "una\ndos\n", "\n\n", "a\r\nb\r\n"]:
+            assert _count_lines(text) == len(text.splitlines())
+
+    def test_extract_basic_sections_unicode_case_variants(self):
+        """Test que variantes Unicode de mayúsculas ("SKİLLS", "ſkills") no rompen el parseo."""
+        parser = CVParser()
+
+        for text in ["SKİLLS: Python", "ſkills: Python", "EXPERİENCE"]:
+            cv_data = parser.parse_text(text)
+
+            assert 'education' not in cv_data.sections
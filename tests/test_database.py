@@ -5,8 +5,11 @@ Todas las interacciones con Supabase se mockean para que los tests
 no requieran una instancia real de base de datos.
 """
 
+import asyncio
 import json
 import os
+import threading
+import time
 from unittest.mock import MagicMock, call, patch
 
 import pytest
@@ -19,8 +22,8 @@ from src.database import CVDatabase
 class MockResponse:
     """Simula la respuesta del SDK de Supabase (postgrest.APIResponse)."""
 
-    def __init__(self, data: list | None = None):
-        self.data: list = data if data is not None else []
+    def __init__(self, data: list | dict | None = None):
+        self.data: list | dict = data if data is not None else []
 
 
 def _make_chain(response_data: list | None = None) -> MagicMock:
@@ -36,9 +39,11 @@ def _make_chain(response_data: list | None = None) -> MagicMock:
         "delete",
         "eq",
         "gte",
+        "in_",
         "is_",
         "order",
         "limit",
+        "range",
     ):
         getattr(chain, method).return_value = chain
     chain.execute.return_value = MockResponse(response_data)
@@ -52,8 +57,10 @@ def _make_chain(response_data: list | None = None) -> MagicMock:
 def _reset_singleton():
     """Resetea el cliente singleton de CVDatabase entre tests."""
     CVDatabase._client = None
+    CVDatabase.invalidate_cache()
     yield
     CVDatabase._client = None
+    CVDatabase.invalidate_cache()
 
 
 @pytest.fixture
@@ -67,7 +74,7 @@ def mock_client():
                 "SUPABASE_KEY": "test-anon-key-1234567890",
             },
         ),
-        patch("src.database.create_client") as mock_create,
+        patch("supabase.create_client") as mock_create,
     ):
         client = MagicMock()
         mock_create.return_value = client
@@ -121,15 +128,20 @@ def test_init_creates_client():
                 "SUPABASE_KEY": "my-anon-key",
             },
         ),
-        patch("src.database.create_client") as mock_create,
+        patch("supabase.create_client") as mock_create,
     ):
         mock_create.return_value = MagicMock()
         CVDatabase()
 
-        mock_create.assert_called_once_with(
-            "https://my-project.supabase.co",
-            "my-anon-key",
-        )
+        mock_create.assert_called_once()
+        args, kwargs = mock_create.call_args
+        assert args == ("https://my-project.supabase.co", "my-anon-key")
+        http_client = kwargs["options"].httpx_client
+        assert http_client.timeout.read == 30.0
+        assert http_client.timeout.connect == 5.0
+        pool = http_client._transport._pool
+        assert pool._max_connections == 10
+        assert pool._max_keepalive_connections == 5
 
 
 def test_init_missing_env_vars():
@@ -151,7 +163,7 @@ def test_init_singleton_reuses_client():
                 "SUPABASE_KEY": "key",
             },
         ),
-        patch("src.database.create_client") as mock_create,
+        patch("supabase.create_client") as mock_create,
     ):
         client = MagicMock()
         mock_create.return_value = client
@@ -163,6 +175,69 @@ def test_init_singleton_reuses_client():
         mock_create.assert_called_once()
 
 
+def test_init_concurrent_creates_single_client():
+    """Test que varios hilos creando CVDatabase a la vez comparten un solo cliente."""
+    barrier = threading.Barrier(8)
+
+    def slow_create(*args, **kwargs):
+        time.sleep(0.05)
+        return MagicMock()
+
+    with (
+        patch.dict(
+            os.environ,
+            {
+                "SUPABASE_URL": "https://test.supabase.co",
+                "SUPABASE_KEY": "key",
+            },
+        ),
+        patch("supabase.create_client", side_effect=slow_create) as mock_create,
+    ):
+        clients = []
+
+        def worker():
+            barrier.wait()
+            clients.append(CVDatabase().client)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        mock_create.assert_called_once()
+        assert all(c is clients[0] for c in clients)
+
+
+def test_close_releases_client():
+    """Test que close() cierra el pool HTTP y fuerza crear un cliente nuevo."""
+    with (
+        patch.dict(
+            os.environ,
+            {
+                "SUPABASE_URL": "https://test.supabase.co",
+                "SUPABASE_KEY": "key",
+            },
+        ),
+        patch("supabase.create_client") as mock_create,
+    ):
+        mock_create.side_effect = [MagicMock(), MagicMock()]
+
+        first = CVDatabase().client
+        CVDatabase.close()
+        second = CVDatabase().client
+
+        first.options.httpx_client.close.assert_called_once()
+        assert first is not second
+        assert mock_create.call_count == 2
+
+
+def test_close_without_client():
+    """Test que close() sin cliente creado no falla."""
+    CVDatabase.close()
+    assert CVDatabase._client is None
+
+
 # ==================== Tests de Creación (save_cv) ====================
 
 
@@ -230,6 +305,17 @@ def test_save_cv_returns_incremental_ids(cv_database: CVDatabase, mock_client: M
     assert id2 > id1
 
 
+def test_save_cv_returns_only_id(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que el insert pide solo el id de vuelta (no la fila completa)."""
+    chain = _make_chain([{"id": 1}])
+    mock_client.table.return_value = chain
+    params = chain.request.params
+
+    cv_database.save_cv(job_title="Dev", yaml_content="cv: {}")
+
+    params.set.assert_called_once_with("select", "id")
+
+
 def test_save_cv_with_user_id(cv_database: CVDatabase, mock_client: MagicMock):
     """Test que user_id se incluye en los datos de insert."""
     chain = _make_chain([{"id": 1}])
@@ -330,6 +416,52 @@ def test_save_cv_requires_yaml_content(cv_database: CVDatabase):
         cv_database.save_cv(job_title="Developer")  # type: ignore[call-arg]
 
 
+def test_save_cvs_bulk(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test guardar varios CVs en un solo insert."""
+    chain = _make_chain([{"id": 1}, {"id": 2}])
+    mock_client.table.return_value = chain
+
+    ids = cv_database.save_cvs_bulk(
+        [
+            {"job_title": "Dev", "yaml_content": "cv: 1"},
+            {"job_title": "QA", "yaml_content": "cv: 2", "user_id": "user-xyz"},
+        ],
+        user_id="user-abc",
+    )
+
+    assert ids == [1, 2]
+    chain.insert.assert_called_once()
+    rows = chain.insert.call_args[0][0]
+    assert [row["job_title"] for row in rows] == ["Dev", "QA"]
+    assert [row["user_id"] for row in rows] == ["user-abc", "user-xyz"]
+    assert rows[0]["language"] == "es"
+    assert rows[0]["theme"] == "classic"
+
+
+def test_save_cvs_bulk_chunks_large_batches(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que los lotes grandes se parten en inserts de BULK_INSERT_CHUNK_SIZE filas."""
+    chain = _make_chain()
+    mock_client.table.return_value = chain
+    chain.execute.side_effect = [
+        MockResponse([{"id": 1}, {"id": 2}]),
+        MockResponse([{"id": 3}]),
+    ]
+
+    with patch("src.database.BULK_INSERT_CHUNK_SIZE", 2):
+        ids = cv_database.save_cvs_bulk(
+            [{"job_title": f"Job {i}", "yaml_content": "c"} for i in range(3)]
+        )
+
+    assert ids == [1, 2, 3]
+    assert [len(c.args[0]) for c in chain.insert.call_args_list] == [2, 1]
+
+
+def test_save_cvs_bulk_empty(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que una lista vacía no hace peticiones."""
+    assert cv_database.save_cvs_bulk([]) == []
+    mock_client.table.assert_not_called()
+
+
 # ==================== Tests de Lectura (get_all_cvs) ====================
 
 
@@ -380,7 +512,38 @@ def test_get_all_cvs_calls_order_desc(cv_database: CVDatabase, mock_client: Magi
 
     cv_database.get_all_cvs()
 
-    chain.order.assert_called_once_with("created_at", desc=True)
+    assert chain.order.call_args_list == [
+        call("created_at", desc=True),
+        call("id", desc=True),
+    ]
+
+
+def test_get_all_cvs_paginates(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que get_all_cvs pide páginas con range hasta una página incompleta."""
+    chain = _make_chain()
+    mock_client.table.return_value = chain
+    chain.execute.side_effect = [
+        MockResponse([{"id": 5}, {"id": 4}]),
+        MockResponse([{"id": 3}, {"id": 2}]),
+        MockResponse([{"id": 1}]),
+    ]
+
+    result = list(cv_database.iter_all_cvs(page_size=2))
+
+    assert [row["id"] for row in result] == [5, 4, 3, 2, 1]
+    assert chain.range.call_args_list == [call(0, 1), call(2, 3), call(4, 5)]
+
+
+def test_iter_all_cvs_is_lazy(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que iter_all_cvs no pide la siguiente página hasta consumir la actual."""
+    chain = _make_chain([{"id": 2}, {"id": 1}])
+    mock_client.table.return_value = chain
+
+    rows = cv_database.iter_all_cvs(page_size=2)
+    assert next(rows)["id"] == 2
+    assert next(rows)["id"] == 1
+
+    assert chain.execute.call_count == 1
 
 
 def test_get_all_cvs_selects_subset_of_fields(cv_database: CVDatabase, mock_client: MagicMock):
@@ -493,6 +656,61 @@ def test_get_cv_by_id_requires_integer(cv_database: CVDatabase, mock_client: Mag
     assert cv is None or isinstance(cv, dict)
 
 
+def test_get_cv_by_id_selects_explicit_columns(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que get_cv_by_id lista las columnas en vez de usar '*'."""
+    chain = _make_chain([])
+    mock_client.table.return_value = chain
+
+    cv_database.get_cv_by_id(1)
+
+    columns = [c.strip() for c in chain.select.call_args[0][0].split(",")]
+    assert "*" not in columns
+    assert "yaml_content" in columns
+    assert "questions_asked" in columns
+
+
+def test_get_cv_metadata_skips_large_fields(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que get_cv_metadata no pide los textos grandes del CV."""
+    chain = _make_chain([{"id": 1, "job_title": "Dev"}])
+    mock_client.table.return_value = chain
+
+    cv = cv_database.get_cv_metadata(1, user_id="user-abc")
+
+    assert cv == {"id": 1, "job_title": "Dev"}
+    columns = [c.strip() for c in chain.select.call_args[0][0].split(",")]
+    for field in ("yaml_content", "original_cv", "job_description", "gap_analysis"):
+        assert field not in columns
+    assert call("user_id", "user-abc") in chain.eq.call_args_list
+
+
+def test_get_cv_with_sessions(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que el CV y sus sesiones llegan en una sola petición."""
+    sessions = [
+        {"id": 8, "question": "¿P2?", "generated_answer": "R2", "created_at": "2024-01-02"},
+        {"id": 7, "question": "¿P1?", "generated_answer": "R1", "created_at": "2024-01-01"},
+    ]
+    chain = _make_chain([{"id": 3, "job_title": "Dev", "interview_sessions": sessions}])
+    mock_client.table.return_value = chain
+
+    result = cv_database.get_cv_with_sessions(3, user_id="user-abc")
+
+    assert result == {"cv": {"id": 3, "job_title": "Dev"}, "sessions": sessions}
+    mock_client.table.assert_called_once_with("cv_history")
+    assert "interview_sessions(" in chain.select.call_args[0][0]
+    assert call("user_id", "user-abc") in chain.eq.call_args_list
+    chain.order.assert_called_once_with(
+        "created_at", desc=True, foreign_table="interview_sessions"
+    )
+    chain.execute.assert_called_once()
+
+
+def test_get_cv_with_sessions_not_exists(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que devuelve None si el CV no existe."""
+    mock_client.table.return_value = _make_chain([])
+
+    assert cv_database.get_cv_with_sessions(999) is None
+
+
 # ==================== Tests de Eliminación (delete_cv) ====================
 
 
@@ -530,6 +748,17 @@ def test_delete_cv_with_user_id(cv_database: CVDatabase, mock_client: MagicMock)
     assert call("user_id", "user-xyz") in eq_calls
 
 
+def test_delete_cv_returns_only_id(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que el delete no trae de vuelta el contenido de los CVs borrados."""
+    chain = _make_chain([{"id": 1}])
+    mock_client.table.return_value = chain
+    params = chain.request.params
+
+    cv_database.delete_cv(1)
+
+    params.set.assert_called_once_with("select", "id")
+
+
 # ==================== Tests de clear_all ====================
 
 
@@ -586,53 +815,93 @@ def test_clear_all_without_user_id_uses_gte(cv_database: CVDatabase, mock_client
 # ==================== Tests de Skill Memory ====================
 
 
-def test_save_skill_answer_new(cv_database: CVDatabase, mock_client: MagicMock):
-    """Test guardar nueva respuesta de skill (usage_count=1)."""
-    chain = _make_chain()
-    mock_client.table.return_value = chain
-    chain.execute.side_effect = [
-        MockResponse([]),  # select: skill no existe
-        MockResponse([{"id": 1}]),  # upsert OK
-    ]
+def test_save_skill_answer_uses_rpc(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que guardar una skill es una sola llamada a la función upsert_skill_answer."""
+    chain = _make_chain([1])
+    mock_client.rpc.return_value = chain
 
-    cv_database.save_skill_answer("Python", "5 a\u00f1os de experiencia")
+    cv_database.save_skill_answer("Python", "5 a\u00f1os de experiencia", user_id="user-abc")
 
-    upsert_data = chain.upsert.call_args[0][0]
-    assert upsert_data["skill_name"] == "python"
-    assert upsert_data["answer_text"] == "5 a\u00f1os de experiencia"
-    assert upsert_data["usage_count"] == 1
+    mock_client.rpc.assert_called_once_with(
+        "upsert_skill_answer",
+        {
+            "p_user_id": "user-abc",
+            "p_skill": "python",
+            "p_answer": "5 a\u00f1os de experiencia",
+        },
+    )
+    chain.execute.assert_called_once()
+    mock_client.table.assert_not_called()
 
 
-def test_save_skill_answer_update(cv_database: CVDatabase, mock_client: MagicMock):
-    """Test actualizar respuesta existente (incrementa usage_count)."""
-    chain = _make_chain()
-    mock_client.table.return_value = chain
-    chain.execute.side_effect = [
-        MockResponse([{"usage_count": 3}]),  # select: existe con count=3
-        MockResponse([{"id": 1}]),  # upsert
-    ]
+def test_save_skill_answer_without_user_id(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que sin user_id se pasa NULL a la función."""
+    mock_client.rpc.return_value = _make_chain([1])
 
     cv_database.save_skill_answer("Docker", "Respuesta v2 mejorada")
 
-    upsert_data = chain.upsert.call_args[0][0]
-    assert upsert_data["skill_name"] == "docker"
-    assert upsert_data["answer_text"] == "Respuesta v2 mejorada"
-    assert upsert_data["usage_count"] == 4  # 3 + 1
+    params = mock_client.rpc.call_args[0][1]
+    assert params["p_user_id"] is None
+    assert params["p_skill"] == "docker"
 
 
 def test_skill_normalization(cv_database: CVDatabase, mock_client: MagicMock):
     """Test que las skills se normalizan a minúsculas y se limpian."""
-    chain = _make_chain()
-    mock_client.table.return_value = chain
-    chain.execute.side_effect = [
-        MockResponse([]),
-        MockResponse([{"id": 1}]),
-    ]
+    mock_client.rpc.return_value = _make_chain([1])
 
     cv_database.save_skill_answer("  React JS  ", "Frontend experience")
 
-    upsert_data = chain.upsert.call_args[0][0]
-    assert upsert_data["skill_name"] == "react js"
+    assert mock_client.rpc.call_args[0][1]["p_skill"] == "react js"
+
+
+def test_save_skill_answer_error_is_logged(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que un error de la RPC no se propaga."""
+    chain = _make_chain()
+    chain.execute.side_effect = Exception("boom")
+    mock_client.rpc.return_value = chain
+
+    cv_database.save_skill_answer("Docker", "Respuesta")
+
+
+def test_save_skill_answers_bulk(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test guardar varias skills con una sola llamada atómica a upsert_skill_answers."""
+    chain = _make_chain([1, 2])
+    mock_client.rpc.return_value = chain
+
+    saved = cv_database.save_skill_answers_bulk(
+        [("Docker", "v1"), ("  Python ", "Respuesta"), ("docker", "v2")],
+        user_id="user-abc",
+    )
+
+    assert saved == 2
+    mock_client.rpc.assert_called_once_with(
+        "upsert_skill_answers",
+        {
+            "p_user_id": "user-abc",
+            "p_skills": ["docker", "python"],
+            "p_answers": ["v2", "Respuesta"],
+        },
+    )
+    # Sin leer usage_count antes: el incremento lo hace Postgres
+    mock_client.table.assert_not_called()
+
+
+def test_save_skill_answers_bulk_empty(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que una lista vacía no hace peticiones."""
+    assert cv_database.save_skill_answers_bulk([]) == 0
+    mock_client.rpc.assert_not_called()
+    mock_client.table.assert_not_called()
+
+
+def test_save_skill_answers_bulk_error_returns_zero(
+    cv_database: CVDatabase, mock_client: MagicMock
+):
+    """Test que un error de Supabase se registra y devuelve 0."""
+    chain = _make_chain()
+    mock_client.rpc.return_value = chain
+    chain.execute.side_effect = Exception("boom")
+
+    assert cv_database.save_skill_answers_bulk([("Docker", "v1")]) == 0
 
 
 def test_get_skill_answer_exists(cv_database: CVDatabase, mock_client: MagicMock):
@@ -666,25 +935,89 @@ def test_get_skill_answer_with_user_id(cv_database: CVDatabase, mock_client: Mag
     assert call("user_id", "user-abc") in eq_calls
 
 
-def test_get_all_skill_answers(cv_database: CVDatabase, mock_client: MagicMock):
-    """Test recuperar todas las respuestas de skills."""
-    chain = _make_chain(
-        [
-            {"skill_name": "python", "answer_text": "5 a\u00f1os"},
-            {"skill_name": "docker", "answer_text": "2 a\u00f1os"},
-        ]
-    )
+def test_get_skill_answer_cached(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que la misma skill (normalizada) se lee una sola vez de Supabase."""
+    chain = _make_chain([{"answer_text": "5 años"}])
+    mock_client.table.return_value = chain
+
+    assert cv_database.get_skill_answer("Docker", user_id="user-abc") == "5 años"
+    assert CVDatabase().get_skill_answer("  docker ", user_id="user-abc") == "5 años"
+
+    assert chain.execute.call_count == 1
+
+
+def test_get_skill_answer_caches_missing(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que "no existe" también se cachea."""
+    chain = _make_chain([])
+    mock_client.table.return_value = chain
+
+    assert cv_database.get_skill_answer("Kotlin") is None
+    assert cv_database.get_skill_answer("Kotlin") is None
+
+    assert chain.execute.call_count == 1
+
+
+def test_get_skill_answer_invalidated_by_save(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que guardar una skill descarta la lectura cacheada."""
+    chain = _make_chain()
+    mock_client.table.return_value = chain
+    mock_client.rpc.return_value = chain
+    chain.execute.side_effect = [
+        MockResponse([]),  # get: no existe
+        MockResponse([1]),  # save: rpc upsert_skill_answer
+        MockResponse([{"answer_text": "Nueva"}]),  # get tras guardar
+    ]
+
+    assert cv_database.get_skill_answer("Docker") is None
+    cv_database.save_skill_answer("Docker", "Nueva")
+
+    assert cv_database.get_skill_answer("Docker") == "Nueva"
+
+
+def test_get_skill_answer_lru_evicts_oldest(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que el cache de lecturas está acotado a READ_CACHE_MAXSIZE entradas."""
+    chain = _make_chain([{"answer_text": "x"}])
+    mock_client.table.return_value = chain
+
+    with patch.object(CVDatabase, "READ_CACHE_MAXSIZE", 2):
+        cv_database.get_skill_answer("a")
+        cv_database.get_skill_answer("b")
+        cv_database.get_skill_answer("a")  # hit: "a" pasa a ser la más reciente
+        cv_database.get_skill_answer("c")  # desaloja "b"
+        cv_database.get_skill_answer("a")  # hit
+        cv_database.get_skill_answer("b")  # miss
+
+    assert chain.execute.call_count == 4
+
+
+def test_get_skill_answer_error_not_cached(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que un error devuelve None sin quedar cacheado."""
+    chain = _make_chain()
     mock_client.table.return_value = chain
+    chain.execute.side_effect = [Exception("boom"), MockResponse([{"answer_text": "Sí"}])]
+
+    assert cv_database.get_skill_answer("Docker") is None
+    assert cv_database.get_skill_answer("Docker") == "Sí"
+
+
+def test_get_all_skill_answers(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test recuperar todas las respuestas de skills (dict armado en Postgres)."""
+    chain = _make_chain()
+    chain.execute.return_value = MockResponse({"python": "5 a\u00f1os", "docker": "2 a\u00f1os"})
+    mock_client.rpc.return_value = chain
 
     answers = cv_database.get_all_skill_answers()
 
     assert answers == {"python": "5 a\u00f1os", "docker": "2 a\u00f1os"}
+    mock_client.rpc.assert_called_once_with("get_all_skill_answers", {"p_user_id": None})
+    mock_client.table.assert_not_called()
 
 
 def test_get_all_skill_answers_empty(cv_database: CVDatabase, mock_client: MagicMock):
     """Test recuperar skills cuando no hay datos."""
-    chain = _make_chain([])
-    mock_client.table.return_value = chain
+    chain = _make_chain()
+    chain.execute.return_value = MockResponse({})
+    mock_client.rpc.return_value = chain
 
     answers = cv_database.get_all_skill_answers()
 
@@ -693,12 +1026,100 @@ def test_get_all_skill_answers_empty(cv_database: CVDatabase, mock_client: Magic
 
 def test_get_all_skill_answers_with_user_id(cv_database: CVDatabase, mock_client: MagicMock):
     """Test que get_all_skill_answers filtra por user_id."""
+    mock_client.rpc.return_value = _make_chain([])
+
+    cv_database.get_all_skill_answers(user_id="user-xyz")
+
+    mock_client.rpc.assert_called_once_with("get_all_skill_answers", {"p_user_id": "user-xyz"})
+
+
+def test_get_all_skill_answers_cached(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que lecturas repetidas dentro del TTL no consultan Supabase."""
+    chain = _make_chain()
+    chain.execute.return_value = MockResponse({"docker": "Sí"})
+    mock_client.rpc.return_value = chain
+
+    first = cv_database.get_all_skill_answers(user_id="user-abc")
+    first["python"] = "mutado por el llamador"
+    second = CVDatabase().get_all_skill_answers(user_id="user-abc")
+
+    assert second == {"docker": "Sí"}
+    assert chain.execute.call_count == 1
+
+
+def test_get_all_skill_answers_cache_per_user(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que el cache distingue usuarios."""
+    chain = _make_chain([])
+    mock_client.rpc.return_value = chain
+
+    cv_database.get_all_skill_answers(user_id="user-a")
+    cv_database.get_all_skill_answers(user_id="user-b")
+
+    assert chain.execute.call_count == 2
+
+
+def test_get_all_skill_answers_cache_expires(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que la lectura cacheada expira tras SKILL_CACHE_TTL."""
+    chain = _make_chain([])
+    mock_client.rpc.return_value = chain
+
+    with patch("src.database.time.monotonic", side_effect=[100.0, 200.0, 200.0]):
+        cv_database.get_all_skill_answers()
+        cv_database.get_all_skill_answers()
+
+    assert chain.execute.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda db: db.save_skill_answer("Docker", "Nueva"),
+        lambda db: db.save_skill_answers_bulk([("Docker", "Nueva")]),
+        lambda db: db.delete_skill_answer("Docker"),
+    ],
+)
+def test_skill_writes_invalidate_cache(cv_database: CVDatabase, mock_client: MagicMock, write):
+    """Test que guardar o borrar skills descarta la lectura cacheada."""
     chain = _make_chain([])
     mock_client.table.return_value = chain
+    mock_client.rpc.return_value = chain
 
-    cv_database.get_all_skill_answers(user_id="user-xyz")
+    cv_database.get_all_skill_answers()
+    generation = CVDatabase.cache_generation()
+    write(cv_database)
+    calls_before = chain.execute.call_count
+    cv_database.get_all_skill_answers()
 
-    chain.eq.assert_called_once_with("user_id", "user-xyz")
+    assert chain.execute.call_count == calls_before + 1
+    assert CVDatabase.cache_generation() > generation
+
+
+def test_get_all_skill_answers_write_during_read_not_cached(
+    cv_database: CVDatabase, mock_client: MagicMock
+):
+    """Test que una lectura solapada con una escritura no queda en cache."""
+    chain = _make_chain()
+    mock_client.rpc.return_value = chain
+
+    def execute_with_concurrent_write():
+        CVDatabase.invalidate_cache()
+        return MockResponse({"docker": "Vieja"})
+
+    chain.execute.side_effect = execute_with_concurrent_write
+    cv_database.get_all_skill_answers()
+    cv_database.get_all_skill_answers()
+
+    assert chain.execute.call_count == 2
+
+
+def test_get_all_skill_answers_error_not_cached(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que un error no deja un dict vacío en cache."""
+    chain = _make_chain()
+    mock_client.rpc.return_value = chain
+    chain.execute.side_effect = [Exception("boom"), MockResponse({"docker": "Sí"})]
+
+    assert cv_database.get_all_skill_answers() == {}
+    assert cv_database.get_all_skill_answers() == {"docker": "Sí"}
 
 
 def test_delete_skill_answer_exists(cv_database: CVDatabase, mock_client: MagicMock):
@@ -780,6 +1201,7 @@ def test_save_base_cv_uses_user_id_conflict(cv_database: CVDatabase, mock_client
 
     _, kwargs = chain.upsert.call_args
     assert kwargs["on_conflict"] == "user_id"
+    assert kwargs["returning"] == "minimal"
 
 
 def test_get_base_cv_exists(cv_database: CVDatabase, mock_client: MagicMock):
@@ -812,6 +1234,24 @@ def test_get_base_cv_with_user_id(cv_database: CVDatabase, mock_client: MagicMoc
     chain.eq.assert_called_once_with("user_id", "user-xyz")
 
 
+def test_get_base_cv_cached_until_save(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que get_base_cv se cachea por usuario y save_base_cv lo invalida."""
+    chain = _make_chain()
+    mock_client.table.return_value = chain
+    chain.execute.side_effect = [
+        MockResponse([{"cv_text": "CV v1"}]),  # get
+        MockResponse([]),  # upsert
+        MockResponse([{"cv_text": "CV v2"}]),  # get tras guardar
+    ]
+
+    assert cv_database.get_base_cv(user_id="user-abc") == "CV v1"
+    assert cv_database.get_base_cv(user_id="user-abc") == "CV v1"
+    cv_database.save_base_cv("CV v2", user_id="user-abc")
+
+    assert cv_database.get_base_cv(user_id="user-abc") == "CV v2"
+    assert chain.execute.call_count == 3
+
+
 # ==================== Tests de Interview Sessions ====================
 
 
@@ -866,6 +1306,30 @@ def test_save_interview_session_with_user_id(cv_database: CVDatabase, mock_clien
     assert inserted["user_id"] == "user-abc"
 
 
+def test_save_interview_sessions_bulk(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test guardar varias preguntas/respuestas en un solo insert."""
+    chain = _make_chain([{"id": 7}, {"id": 8}])
+    mock_client.table.return_value = chain
+
+    ids = cv_database.save_interview_sessions_bulk(
+        3, [("¿P1?", "R1"), ("¿P2?", "R2")], user_id="user-abc"
+    )
+
+    assert ids == [7, 8]
+    chain.insert.assert_called_once_with(
+        [
+            {"cv_id": 3, "question": "¿P1?", "generated_answer": "R1", "user_id": "user-abc"},
+            {"cv_id": 3, "question": "¿P2?", "generated_answer": "R2", "user_id": "user-abc"},
+        ]
+    )
+
+
+def test_save_interview_sessions_bulk_empty(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que una lista vacía no hace peticiones."""
+    assert cv_database.save_interview_sessions_bulk(None, []) == []
+    mock_client.table.assert_not_called()
+
+
 def test_get_interview_sessions_all(cv_database: CVDatabase, mock_client: MagicMock):
     """Test recuperar todas las sesiones de entrevista."""
     sessions = [
@@ -912,6 +1376,27 @@ def test_get_interview_sessions_with_user_id(cv_database: CVDatabase, mock_clien
     chain.eq.assert_called_once_with("user_id", "user-123")
 
 
+def test_get_interview_sessions_default_columns(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que por defecto no se transfiere la respuesta generada."""
+    chain = _make_chain([])
+    mock_client.table.return_value = chain
+
+    cv_database.get_interview_sessions()
+
+    columns = [c.strip() for c in chain.select.call_args[0][0].split(",")]
+    assert columns == ["id", "created_at", "cv_id", "question"]
+
+
+def test_get_interview_sessions_custom_columns(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que se puede pedir la fila completa."""
+    chain = _make_chain([])
+    mock_client.table.return_value = chain
+
+    cv_database.get_interview_sessions(cv_id=3, columns="*")
+
+    chain.select.assert_called_once_with("*")
+
+
 # ==================== Tests de Múltiples Operaciones ====================
 
 
@@ -931,3 +1416,41 @@ def test_multiple_saves_unique_ids(cv_database: CVDatabase, mock_client: MagicMo
 
     assert len(ids) == len(set(ids))
     assert ids == list(range(1, 11))
+
+
+# ==================== Tests de Variantes Async ====================
+
+
+def test_async_reads_run_concurrently(cv_database: CVDatabase, mock_client: MagicMock):
+    """Test que las lecturas async delegan en las síncronas y corren en paralelo."""
+    barrier = threading.Barrier(4, timeout=5)
+
+    def table(name):
+        data = {
+            "cv_history": [{"id": 1}],
+            "interview_sessions": [{"id": 2}],
+            "skill_memory": [{"answer_text": "Sí"}],
+            "base_cv": [{"cv_text": "CV"}],
+        }[name]
+        chain = _make_chain()
+
+        def execute():
+            # Solo pasan si las cuatro consultas están en vuelo a la vez
+            barrier.wait()
+            return MockResponse(data)
+
+        chain.execute.side_effect = execute
+        return chain
+
+    mock_client.table.side_effect = table
+
+    async def run():
+        return await asyncio.gather(
+            cv_database.a_get_all_cvs(user_id="user-abc"),
+            cv_database.a_get_interview_sessions(limit=10),
+            cv_database.a_get_skill_answer("Docker"),
+            cv_database.a_get_base_cv(),
+        )
+
+    assert asyncio.run(run()) == [[{"id": 1}], [{"id": 2}], "Sí", "CV"]
+
@@ -39,7 +39,7 @@ def sample_cv_data():
     """CV de ejemplo con experiencias."""
     cv = CVData(
         raw_text="Test CV",
-        sections={},
+        sections_mask=0,
         metadata={},
     )
 
@@ -373,7 +373,7 @@ def test_extract_experiences_from_dict():
     """Test: extracción de experiencias de diccionarios."""
     rewriter = ExperienceRewriter()
 
-    cv_data = CVData(raw_text="Test", sections={}, metadata={})
+    cv_data = CVData(raw_text="Test", sections_mask=0, metadata={})
     cv_data.work_experience = [
         {
             "company": "TestCorp",
@@ -398,7 +398,7 @@ def test_extract_experiences_fallback_to_text():
     - Developed web applications
     - Worked with Python
     """,
-        sections={},
+        sections_mask=0,
         metadata={},
     )
 
@@ -549,7 +549,7 @@ def test_empty_cv_data():
     """Test: manejo de CV vacío."""
     rewriter = ExperienceRewriter()
 
-    empty_cv = CVData(raw_text="", sections={}, metadata={})
+    empty_cv = CVData(raw_text="", sections_mask=0, metadata={})
     job_req = JobRequirements()
     gap_analysis = GapAnalysisResult(cv_data=empty_cv, job_requirements=job_req)
 
@@ -568,7 +568,7 @@ def test_user_answers_with_negations():
     rewriter = ExperienceRewriter()
 
     gap_analysis = GapAnalysisResult(
-        cv_data=CVData(raw_text="Test", sections={}, metadata={}),
+        cv_data=CVData(raw_text="Test", sections_mask=0, metadata={}),
         job_requirements=JobRequirements(),
     )
 
@@ -150,7 +150,7 @@ class TestGapAnalyzer:
         mock_parser = Mock()
         mock_parser.parse_text.return_value = CVData(
             raw_text="Python developer with 3 years experience",
-            sections={'experience': 'detected'},
+            sections_mask=0b0001,
             metadata={}
         )
         
@@ -362,7 +362,7 @@ class TestGapAnalyzer:
         mock_parser = Mock()
         mock_parser.parse_text.return_value = CVData(
             raw_text=cv_text,
-            sections={'experience': 'detected', 'skills': 'detected'},
+            sections_mask=0b0101,
             metadata={}
         )
         
@@ -10,6 +10,7 @@ import tempfile
 import os
 from pathlib import Path
 import shutil
+from unittest.mock import patch
 
 from src.pdf_renderer import PDFRenderer, PDFRenderError
 
@@ -191,6 +192,50 @@ def test_render_returns_absolute_path(pdf_renderer, sample_yaml_content):
     assert Path(pdf_path).is_absolute()
 
 
+def test_render_from_string_cached_reuses_pdf(pdf_renderer, sample_yaml_content):
+    """Test que el mismo YAML reutiliza el PDF ya renderizado."""
+    first_path = pdf_renderer.render_from_string_cached(sample_yaml_content)
+    first_mtime = os.path.getmtime(first_path)
+
+    second_path = pdf_renderer.render_from_string_cached(sample_yaml_content)
+
+    assert second_path == first_path
+    assert os.path.getmtime(second_path) == first_mtime
+
+
+def test_render_from_string_cached_distinct_content(pdf_renderer, sample_yaml_content):
+    """Test que contenidos distintos generan PDFs distintos."""
+    first_path = pdf_renderer.render_from_string_cached(sample_yaml_content)
+    second_path = pdf_renderer.render_from_string_cached(
+        sample_yaml_content.replace("Test User", "Other User")
+    )
+
+    assert first_path != second_path
+    assert os.path.exists(second_path)
+
+
+def test_render_from_string_cached_interrupted_render_not_reused(
+    pdf_renderer, sample_yaml_content
+):
+    """Test que un render interrumpido no deja un PDF a medias con el nombre final."""
+
+    def partial_render(yaml_content, output_filename):
+        (pdf_renderer.output_dir / f"{output_filename}.pdf").write_bytes(b"%PDF-1.7 parcial")
+        raise PDFRenderError("Typst interrumpido")
+
+    with patch.object(pdf_renderer, "render", side_effect=partial_render):
+        with pytest.raises(PDFRenderError):
+            pdf_renderer.render_from_string_cached(sample_yaml_content)
+
+    # Ni el PDF definitivo ni el temporal parcial quedan en el directorio
+    assert not list(pdf_renderer.output_dir.glob("cv_*.pdf"))
+
+    pdf_path = pdf_renderer.render_from_string_cached(sample_yaml_content)
+
+    assert Path(pdf_path).stat().st_size > 0
+    assert ".tmp-" not in Path(pdf_path).name
+
+
 # ==================== Tests de Renderizado desde Archivo ====================
 
 
@@ -63,3 +63,77 @@ def test_get_data_structuring_prompt():
     assert cv_text in prompt
     assert "JSON Schema requerido" in prompt
     assert "education" in prompt
+
+
+def test_get_combined_structuring_and_classification_prompt():
+    """Test que el prompt combinado incluye el CV, las respuestas y el formato unificado."""
+    cv_text = "John Doe\nDeveloper"
+    answers = [{"skill": "Docker", "answer": "Lo usé en ACME"}]
+    prompt = PromptManager.get_combined_structuring_and_classification_prompt(
+        cv_text, answers, language="English"
+    )
+
+    assert cv_text in prompt
+    assert "JSON Schema requerido" in prompt
+    assert "Lo usé en ACME" in prompt
+    assert '"structured"' in prompt
+    assert '"classifications"' in prompt
+    assert prompt.count("Retorna SOLO el JSON válido") == 1
+
+
+def test_render_matches_str_format():
+    """Test que render() con templates precompilados equivale a str.format."""
+    from src.prompts import PromptTemplates
+
+    values = {
+        "cv_text": "Juan {Pérez}",
+        "language": "Español",
+    }
+    expected = PromptTemplates.DATA_STRUCTURING.format(**values)
+
+    assert PromptManager.render("DATA_STRUCTURING", **values) == expected
+    # Las llaves escapadas del ejemplo JSON quedan como llaves simples
+    assert '"name": "Nombre completo"' in expected
+
+
+def test_render_missing_variable_raises():
+    """Test que render() falla igual que format si falta una variable."""
+    with pytest.raises(KeyError):
+        PromptManager.render("DATA_STRUCTURING", cv_text="John Doe")
+
+
+def test_get_summary_and_skill_prioritization_prompt():
+    """Test que el prompt combinado de resumen y skills incluye ambos contextos."""
+    prompt = PromptManager.get_summary_and_skill_prioritization_prompt(
+        job_description="Backend role",
+        education_summary="Ingeniería en UNAL",
+        experience_summary="Dev en Corp",
+        skills_summary="Python, SQL",
+        years_experience="5 años",
+        must_have_skills="- Docker",
+        current_skills='[{"label": "Lenguajes", "details": "Python"}]',
+        job_title="Desarrollador",
+        language="Español"
+    )
+
+    assert "Backend role" in prompt
+    assert "- Docker" in prompt
+    assert '"details": "Python"' in prompt
+    assert '"summary"' in prompt
+    assert '"skills"' in prompt
+
+
+def test_get_interview_answer_prompt_matches_str_format():
+    """Test que el prompt de entrevista con contexto cacheado equivale a str.format."""
+    from src.prompts import PromptTemplates
+
+    values = {
+        "user_name": "Ana",
+        "cv_context": "CV con {llaves}",
+        "skill_memory_context": "- **Python:** 5 años",
+        "job_description": "Backend developer",
+        "tone": "Conciso",
+    }
+    for question in ["¿Por qué este puesto?", "¿Tu mayor logro?"]:
+        expected = PromptTemplates.INTERVIEW_ANSWER_GENERATION.format(question=question, **values)
+        assert PromptManager.get_interview_answer_prompt(question=question, **values) == expected
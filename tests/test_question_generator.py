@@ -57,7 +57,7 @@ def sample_gaps():
 @pytest.fixture
 def sample_gap_analysis(sample_gaps):
     """GapAnalysisResult simplificado."""
-    cv_data = CVData(raw_text="Test CV", sections={}, metadata={})
+    cv_data = CVData(raw_text="Test CV", sections_mask=0, metadata={})
     job_req = JobRequirements()
 
     gap_analysis = GapAnalysisResult(cv_data=cv_data, job_requirements=job_req)
@@ -135,7 +135,7 @@ def test_generate_questions_empty_gaps():
     generator = QuestionGenerator()
 
     empty_gap_analysis = GapAnalysisResult(
-        cv_data=CVData(raw_text="Test", sections={}, metadata={}),
+        cv_data=CVData(raw_text="Test", sections_mask=0, metadata={}),
         job_requirements=JobRequirements(),
     )
 
@@ -381,7 +381,7 @@ def test_no_experience_question_when_no_gap():
     generator = QuestionGenerator()
 
     gap_analysis = GapAnalysisResult(
-        cv_data=CVData(raw_text="Test", sections={}, metadata={}),
+        cv_data=CVData(raw_text="Test", sections_mask=0, metadata={}),
         job_requirements=JobRequirements(),
     )
     gap_analysis.experience_gap = 0
@@ -428,7 +428,7 @@ def test_parse_ai_response_numbered_list(sample_gaps):
     generator = QuestionGenerator()
 
     gap_analysis = GapAnalysisResult(
-        cv_data=CVData(raw_text="Test", sections={}, metadata={}),
+        cv_data=CVData(raw_text="Test", sections_mask=0, metadata={}),
         job_requirements=JobRequirements(),
     )
     gap_analysis.technical_gaps = sample_gaps
@@ -448,7 +448,7 @@ def test_parse_ai_response_empty():
     generator = QuestionGenerator()
 
     gap_analysis = GapAnalysisResult(
-        cv_data=CVData(raw_text="Test", sections={}, metadata={}),
+        cv_data=CVData(raw_text="Test", sections_mask=0, metadata={}),
         job_requirements=JobRequirements(),
     )
 
@@ -0,0 +1,131 @@
+"""
+Tests unitarios para el cache semántico de respuestas.
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from src.semantic_cache import SemanticCache
+
+# Embeddings normalizados fijos por texto (evita cargar un modelo real)
+_VECTORS = {
+    "original": [1.0, 0.0, 0.0],
+    "casi igual": [0.99, 0.141, 0.0],  # coseno ~0.99
+    "parecido": [0.92, 0.392, 0.0],  # coseno ~0.92 (zona gris)
+    "distinto": [0.0, 1.0, 0.0],
+}
+
+
+def fake_embed(texts):
+    vectors = np.array([_VECTORS[t] for t in texts], dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestSemanticCache:
+    """Tests para la clase SemanticCache."""
+
+    def test_empty_cache_is_miss(self):
+        """Test que un cache vacío no devuelve nada."""
+        cache = SemanticCache(embed_fn=fake_embed)
+
+        assert cache.lookup("original") is None
+
+    def test_direct_hit_above_threshold(self):
+        """Test hit directo con similitud alta."""
+        cache = SemanticCache(embed_fn=fake_embed)
+        cache.add("original", "respuesta")
+
+        assert cache.lookup("casi igual") == "respuesta"
+
+    def test_dissimilar_prompt_is_miss(self):
+        """Test miss con prompts no relacionados."""
+        cache = SemanticCache(embed_fn=fake_embed)
+        cache.add("original", "respuesta")
+
+        assert cache.lookup("distinto") is None
+
+    def test_gray_zone_requires_verification(self):
+        """Test que la zona gris solo es hit si verify lo confirma."""
+        cache = SemanticCache(embed_fn=fake_embed)
+        cache.add("original", "respuesta")
+
+        assert cache.lookup("parecido") is None
+        assert cache.lookup("parecido", verify=lambda a, b: False) is None
+        assert cache.lookup("parecido", verify=lambda a, b: b == "original") == "respuesta"
+
+    def test_gray_zone_stops_after_failed_verification(self):
+        """Test que tras una verificación negativa no se verifican más candidatos."""
+        cache = SemanticCache(embed_fn=fake_embed)
+        cache.add_many(["original", "casi igual"], ["r1", "r2"], scope="a")
+        calls = []
+
+        def verify(prompt, cached_prompt):
+            calls.append(cached_prompt)
+            return False
+
+        cache.hit_threshold = 1.01  # todo en zona gris
+
+        assert cache.lookup("parecido", scope="a", verify=verify) is None
+        assert len(calls) == 1
+
+    def test_prompts_longer_than_max_tokens_are_not_cached(self):
+        """Test que los prompts que el embedder truncaría no se guardan ni se buscan."""
+        calls = []
+
+        def counting_embed(texts):
+            calls.append(list(texts))
+            return fake_embed(texts)
+
+        cache = SemanticCache(embed_fn=counting_embed, count_tokens=len, max_tokens=8)
+        cache.add_many(["original", "casi igual"], ["r1", "r2"])
+
+        assert len(cache) == 1
+        assert cache.lookup_many(["casi igual", "original"]) == [None, "r1"]
+        assert calls == [["original"], ["original"]]
+
+    def test_scope_isolation(self):
+        """Test que no se mezclan entradas de distinto scope."""
+        cache = SemanticCache(embed_fn=fake_embed)
+        cache.add("original", "respuesta", scope="modelo-a")
+
+        assert cache.lookup("original", scope="modelo-b") is None
+        assert cache.lookup("original", scope="modelo-a") == "respuesta"
+
+    def test_persistence(self, tmp_path):
+        """Test que el índice se recarga desde disco."""
+        path = tmp_path / "semantic_cache"
+        SemanticCache(embed_fn=fake_embed, persist_path=path).add("original", "respuesta")
+
+        reloaded = SemanticCache(embed_fn=fake_embed, persist_path=path)
+
+        assert len(reloaded) == 1
+        assert reloaded.lookup("original") == "respuesta"
+
+    def test_persistence_creates_directory_once(self, tmp_path):
+        """Test que el directorio de persistencia se crea solo en el primer guardado."""
+        path = tmp_path / "nested" / "semantic_cache"
+        cache = SemanticCache(embed_fn=fake_embed, persist_path=path)
+
+        with patch("pathlib.Path.mkdir", autospec=True, side_effect=Path.mkdir) as mkdir:
+            cache.add("original", "r1")
+            cache.add("distinto", "r2")
+
+        assert mkdir.call_count == 1
+        assert len(SemanticCache(embed_fn=fake_embed, persist_path=path)) == 2
+
+    def test_lookup_many_and_add_many(self):
+        """Test búsqueda y alta en lote con un solo llamado al embedder."""
+        calls = []
+
+        def counting_embed(texts):
+            calls.append(list(texts))
+            return fake_embed(texts)
+
+        cache = SemanticCache(embed_fn=counting_embed)
+        cache.add_many(["original", "distinto"], ["r1", "r2"])
+
+        assert cache.lookup_many(["casi igual", "distinto", "parecido"]) == ["r1", "r2", None]
+        assert len(calls) == 2
+        assert len(cache) == 2
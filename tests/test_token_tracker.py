@@ -66,7 +66,7 @@ def mock_client():
                 "SUPABASE_KEY": "test-anon-key-1234567890",
             },
         ),
-        patch("src.token_tracker.create_client") as mock_create,
+        patch("supabase.create_client") as mock_create,
     ):
         client = MagicMock()
         mock_create.return_value = client
@@ -152,7 +152,7 @@ class TestYAMLGeneratorGenerate:
         """CVData de ejemplo."""
         return CVData(
             raw_text="Sample CV text",
-            sections={"experience": "detected"},
+            sections_mask=0b0001,
             metadata={"format": "text"}
         )
 
@@ -517,7 +517,7 @@ cv:
     def test_validate_generated_yaml(self):
         """Test que YAML generado pasa validación."""
         generator = YAMLGenerator()
-        cv_data = CVData(raw_text="test", sections={}, metadata={})
+        cv_data = CVData(raw_text="test", sections_mask=0, metadata={})
         contact = ContactInfo(name="Test User")
 
         yaml_str = generator.generate(cv_data=cv_data, contact_info=contact)
@@ -620,7 +620,7 @@ class TestYAMLGeneratorEdgeCases:
     def test_generate_with_empty_lists(self):
         """Test generación con listas vacías."""
         generator = YAMLGenerator()
-        cv_data = CVData(raw_text="test", sections={}, metadata={})
+        cv_data = CVData(raw_text="test", sections_mask=0, metadata={})
         contact = ContactInfo(name="Test User")
 
         yaml_str = generator.generate(
@@ -638,7 +638,7 @@ class TestYAMLGeneratorEdgeCases:
     def test_generate_with_none_optional_fields(self):
         """Test generación con campos opcionales None."""
         generator = YAMLGenerator()
-        cv_data = CVData(raw_text="test", sections={}, metadata={})
+        cv_data = CVData(raw_text="test", sections_mask=0, metadata={})
         contact = ContactInfo(name="Test User")
 
         # Esto no debería fallar
@@ -658,7 +658,7 @@ class TestYAMLGeneratorEdgeCases:
     def test_generate_with_very_long_text(self):
         """Test generación con texto muy largo."""
         generator = YAMLGenerator()
-        cv_data = CVData(raw_text="x" * 10000, sections={}, metadata={})
+        cv_data = CVData(raw_text="x" * 10000, sections_mask=0, metadata={})
         contact = ContactInfo(name="Test User")
 
         long_summary = "A" * 5000
@@ -387,7 +387,7 @@ class TestYAMLValidatorIntegration:
         from src.yaml_generator import ContactInfo, YAMLGenerator
 
         generator = YAMLGenerator()
-        cv_data = CVData(raw_text="test", sections={}, metadata={})
+        cv_data = CVData(raw_text="test", sections_mask=0, metadata={})
         contact = ContactInfo(
             name="Integration Test User",
             email="integration@test.com"